@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+"""
+Arm GNU Toolchain (arm-none-eabi-gcc) packaged for Python.
+
+The toolchain paths are read from an index generated when the package is
+built, so finding the executables never runs them or searches the file system:
+
+    >>> import arm_none_eabi_gcc_toolchain as toolchain
+    >>> toolchain.get_tool_path("gcc")
+    '/.../arm_none_eabi_gcc_toolchain/arm-gnu-toolchain-.../bin/arm-none-eabi-gcc'
+"""
+import os
+import csv
+import shutil
+from typing import Dict, List, Optional
+
+__all__ = [
+    "get_toolchain_dir",
+    "get_bin_dir",
+    "get_gcc_version",
+    "get_tools",
+    "get_tool_path",
+    "restore_duplicates",
+]
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+PACKAGE_NAME = os.path.basename(PACKAGE_DIR)
+TOOL_PREFIX = "arm-none-eabi-"
+# Created once the duplicated files left out of the wheel have been restored,
+# with the DUPLICATES_HASH of the index they were restored from
+DUPLICATES_MARKER = ".duplicates-restored"
+RESTORE_ERROR = (
+    "Could not create the toolchain files left out of the package ({error}).\n"
+    "Run `python -m arm_none_eabi_gcc_toolchain restore-duplicates` with "
+    "write permissions to the package folder:\n    {package_dir}"
+)
+
+_tools = None  # type: Optional[Dict[str, str]]
+_restore_error = None  # type: Optional[OSError]
+
+
+def _find_record() -> Optional[str]:
+    """
+    :return: Path to the RECORD file of the installed distribution, or None
+        if the package wasn't installed from a wheel, e.g. in a source tree.
+    """
+    site_dir = os.path.dirname(PACKAGE_DIR)
+    index_record = f"{PACKAGE_NAME}/_index.py,"
+    for name in os.listdir(site_dir):
+        # Each profile is its own distribution, with the profile in the name
+        if not (name.startswith(PACKAGE_NAME) and name.endswith(".dist-info")):
+            continue
+        record_path = os.path.join(site_dir, name, "RECORD")
+        try:
+            with open(record_path, newline="") as record_file:
+                if index_record in record_file.read():
+                    return record_path
+        except OSError:
+            continue
+    return None
+
+
+def _record_restored(paths: List[str]) -> None:
+    """
+    Add the files about to be restored to the RECORD of the installed
+    distribution, with the hash and size of the file they are restored from,
+    so they are removed with the rest of the package on uninstall or upgrade.
+
+    :param paths: Paths relative to the package folder.
+    """
+    from arm_none_eabi_gcc_toolchain import _index
+
+    record_path = _find_record()
+    if record_path is None:
+        return
+    with open(record_path, newline="") as record_file:
+        contents = record_file.read()
+    records = {row[0]: row for row in csv.reader(contents.splitlines()) if row}
+    rows = []
+    for path in paths:
+        record_name = f"{PACKAGE_NAME}/{path}"
+        if record_name in records:
+            continue
+        source = _index.DUPLICATES.get(path)
+        source_row = records.get(f"{PACKAGE_NAME}/{source}", [])
+        rows.append([record_name] + (source_row[1:3] or ["", ""]))
+    if rows:
+        with open(record_path, "a", newline="") as record_file:
+            if contents and not contents.endswith("\n"):
+                record_file.write("\n")
+            csv.writer(record_file, lineterminator="\n").writerows(rows)
+
+
+def restore_duplicates() -> int:
+    """
+    Create the toolchain files that were identical to another file and left
+    out of the package to reduce its size, as hard links (or copies if the
+    file system doesn't support them). It only does anything the first time
+    for each installed package version, and it's called before running or
+    returning the path of any executable.
+
+    The restored files are added to the package RECORD, so `pip uninstall`
+    removes them too.
+
+    :raises OSError: If the files can't be created, e.g. the package folder
+        is read only.
+    :return: Number of files restored.
+    """
+    from arm_none_eabi_gcc_toolchain import _index
+
+    if not _index.DUPLICATES:
+        return 0
+    # The marker is only valid for its index, in case it's left behind by a
+    # previous version installed without a RECORD to remove it
+    marker_path = os.path.join(PACKAGE_DIR, DUPLICATES_MARKER)
+    try:
+        with open(marker_path) as marker_file:
+            if marker_file.read() == _index.DUPLICATES_HASH:
+                return 0
+    except OSError:
+        pass
+    missing = [
+        path
+        for path in _index.DUPLICATES
+        if not os.path.exists(os.path.join(PACKAGE_DIR, path))
+    ]
+    # Recorded before they are created, so an interrupted restore doesn't
+    # leave files pip doesn't know about
+    _record_restored(missing + [DUPLICATES_MARKER])
+    restored = 0
+    for relative_path in missing:
+        path = os.path.join(PACKAGE_DIR, relative_path)
+        source = os.path.join(PACKAGE_DIR, _index.DUPLICATES[relative_path])
+        # Folders with only duplicated files are not in the package either
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            os.link(source, path)
+        except FileExistsError:
+            # Restored by another process at the same time
+            continue
+        except OSError:
+            # Copied with a temporary name, so a partial file is never used
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            shutil.copy2(source, tmp_path)
+            os.replace(tmp_path, path)
+        restored += 1
+    with open(marker_path, "w") as marker_file:
+        marker_file.write(_index.DUPLICATES_HASH)
+    return restored
+
+
+def _try_restore_duplicates() -> Optional[OSError]:
+    """
+    Restore the duplicated files without failing, so the toolchain paths can
+    still be used from a read only installation if they were already restored
+    (or the executables needed are not duplicates).
+
+    :return: The error that stopped the restore, or None if it succeeded.
+    """
+    global _restore_error
+    try:
+        restore_duplicates()
+        _restore_error = None
+    except OSError as e:
+        _restore_error = e
+    return _restore_error
+
+
+def _get_restore_error_message(error: OSError) -> str:
+    """
+    :param error: The error raised by restore_duplicates().
+    :return: Message explaining how to restore the duplicated files.
+    """
+    return RESTORE_ERROR.format(error=error, package_dir=PACKAGE_DIR)
+
+
+def get_toolchain_dir() -> str:
+    """
+    :return: Absolute path to the packaged toolchain root folder.
+    """
+    from arm_none_eabi_gcc_toolchain import _index
+
+    _try_restore_duplicates()
+    return os.path.join(PACKAGE_DIR, _index.GCC_FOLDER)
+
+
+def get_bin_dir() -> str:
+    """
+    :return: Absolute path to the packaged toolchain bin folder, e.g. to set
+        a build system toolchain path or to add to the PATH.
+    """
+    from arm_none_eabi_gcc_toolchain import _index
+
+    _try_restore_duplicates()
+    return os.path.join(PACKAGE_DIR, _index.BIN_FOLDER)
+
+
+def get_gcc_version() -> Optional[str]:
+    """
+    :return: The packaged GCC version, e.g. "13.3.1", or None if unknown.
+    """
+    from arm_none_eabi_gcc_toolchain import _index
+
+    return _index.GCC_VERSION
+
+
+def get_tools() -> Dict[str, str]:
+    """
+    :return: Dictionary of each executable name (without ".exe"), e.g.
+        "arm-none-eabi-gcc", to its absolute path.
+    """
+    global _tools
+    if _tools is None:
+        from arm_none_eabi_gcc_toolchain import _index
+
+        _try_restore_duplicates()
+        _tools = {
+            name: os.path.join(PACKAGE_DIR, path) for name, path in _index.TOOLS.items()
+        }
+    return dict(_tools)
+
+
+def get_tool_path(tool: str) -> str:
+    """
+    Get the absolute path to a toolchain executable.
+
+    :param tool: Executable name, with or without the "arm-none-eabi-" prefix,
+        e.g. "gcc", "arm-none-eabi-objcopy" or "arm-none-eabi-g++.exe".
+    :return: Absolute path to the executable.
+    """
+    tools = get_tools()
+    name = tool[: -len(".exe")] if tool.endswith(".exe") else tool
+    for candidate in (name, TOOL_PREFIX + name):
+        if candidate in tools:
+            if _restore_error and not os.path.exists(tools[candidate]):
+                raise FileNotFoundError(_get_restore_error_message(_restore_error))
+            return tools[candidate]
+    raise ValueError(f"Unknown toolchain executable: {tool}")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+import sys
+import argparse
+
+from arm_none_eabi_gcc_toolchain import bin_links, compile_cache, restore_duplicates
+
+
+def main(args=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m arm_none_eabi_gcc_toolchain",
+        description="Utilities for the installed Arm GNU Toolchain.",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    for command, help_text in (
+        ("link-bin", "Replace the Python launchers with symlinks to the executables"),
+        ("unlink-bin", "Remove the symlinks and restore the Python launchers"),
+        ("verify-bin", "Check the executables are linked"),
+    ):
+        subparser = subparsers.add_parser(command, help=help_text)
+        subparser.add_argument(
+            "--dest",
+            help=f"Folder for the symlinks (default: {bin_links.get_default_dest_dir()})",
+        )
+    subparsers.add_parser(
+        "restore-duplicates",
+        help="Create the duplicated toolchain files left out of the package",
+    )
+    cache_help = f"(default: {compile_cache.get_cache_dir()})"
+    subparser = subparsers.add_parser(
+        "cache-stats", help="Show compilation cache stats"
+    )
+    subparser.add_argument("--cache-dir", help=f"Compilation cache folder {cache_help}")
+    subparser = subparsers.add_parser("cache-clean", help="Empty the compilation cache")
+    subparser.add_argument("--cache-dir", help=f"Compilation cache folder {cache_help}")
+    subparser.add_argument(
+        "--max-size",
+        type=int,
+        help="Only evict the least recently used entries down to this size in MB",
+    )
+    args = parser.parse_args(args)
+
+    if args.command == "link-bin":
+        links = bin_links.link_bin(args.dest)
+        for link in links:
+            print(f"Linked: {link}")
+        print(f"Created {len(links)} symlinks.")
+    elif args.command == "unlink-bin":
+        removed = bin_links.unlink_bin(args.dest)
+        for link in removed:
+            print(f"Removed: {link}")
+        print(f"Removed {len(removed)} symlinks.")
+    elif args.command == "verify-bin":
+        states = bin_links.verify_bin(args.dest)
+        for name, state in states.items():
+            print(f"{state:>10}: {name}")
+        if any(state != "linked" for state in states.values()):
+            return 1
+    elif args.command == "restore-duplicates":
+        try:
+            restored = restore_duplicates()
+        except OSError as e:
+            print(f"Could not restore the duplicated files: {e}", file=sys.stderr)
+            return 1
+        print(f"Restored {restored} duplicated files.")
+    elif args.command == "cache-stats":
+        stats = compile_cache.get_stats(args.cache_dir)
+        lookups = stats["hits"] + stats["misses"]
+        hit_rate = 100 * stats["hits"] / lookups if lookups else 0
+        print(f"Cache folder: {args.cache_dir or compile_cache.get_cache_dir()}")
+        print(f"Hits:         {stats['hits']} ({hit_rate:.1f}%)")
+        print(f"Misses:       {stats['misses']}")
+        print(f"Uncacheable:  {stats['uncacheable']}")
+        print(f"Entries:      {stats['entries']}")
+        print(f"Size:         {stats['size'] / (1024 * 1024):.1f} MB")
+    elif args.command == "cache-clean":
+        cache_dir = args.cache_dir or compile_cache.get_cache_dir()
+        if args.max_size is None:
+            compile_cache.clean_cache(cache_dir)
+            print(f"Emptied the compilation cache: {cache_dir}")
+        else:
+            max_size = args.max_size * 1024 * 1024
+            evicted = compile_cache.prune_cache(cache_dir, max_size)
+            print(f"Evicted {evicted} compilation cache entries.")
+    else:
+        parser.print_help()
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
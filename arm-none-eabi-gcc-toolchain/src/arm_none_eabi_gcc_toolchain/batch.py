@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+"""
+Run many toolchain invocations in parallel, calling the executables directly
+instead of going through the console script launchers.
+
+    >>> from arm_none_eabi_gcc_toolchain.batch import Job, run_jobs
+    >>> jobs = [Job("gcc", ["-c", src, "-o", src + ".o"]) for src in sources]
+    >>> for result in run_jobs(jobs):
+    ...     print(result.job.args[1], result.returncode, result.stderr)
+"""
+import os
+import locale
+import asyncio
+import subprocess
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import AsyncIterator, Iterable, Iterator, List, Optional, Union
+
+from arm_none_eabi_gcc_toolchain import get_tool_path
+
+# NamedTuple for a toolchain invocation, the tool name can be with or without
+# the "arm-none-eabi-" prefix, and cwd/env are passed to subprocess
+Job = namedtuple("Job", ["tool", "args", "cwd", "env"])
+Job.__new__.__defaults__ = (None, None)
+# NamedTuple with the result of a Job, index is the job position in the input
+JobResult = namedtuple("JobResult", ["index", "job", "returncode", "stdout", "stderr"])
+
+JobLike = Union[Job, tuple]
+
+
+def _to_job(job: JobLike) -> Job:
+    return job if isinstance(job, Job) else Job(*job)
+
+
+def _run_job(index: int, job: Job, text: bool) -> JobResult:
+    process = subprocess.run(
+        [get_tool_path(job.tool)] + list(job.args),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        cwd=job.cwd,
+        env=job.env,
+        universal_newlines=text,
+    )
+    return JobResult(index, job, process.returncode, process.stdout, process.stderr)
+
+
+def run_jobs(
+    jobs: Iterable[JobLike], max_workers: Optional[int] = None, text: bool = True
+) -> Iterator[JobResult]:
+    """
+    Run the toolchain jobs in parallel, yielding each result as it finishes.
+
+    :param jobs: Job tuples, or plain (tool, args) tuples.
+    :param max_workers: Maximum jobs running at the same time, defaults to
+        the number of CPUs.
+    :param text: Decode the captured stdout/stderr as text, otherwise bytes.
+    :return: Iterator of job results, in completion order.
+    """
+    job_list = [_to_job(job) for job in jobs]  # type: List[Job]
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        futures = [
+            executor.submit(_run_job, index, job, text)
+            for index, job in enumerate(job_list)
+        ]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def run_jobs_all(
+    jobs: Iterable[JobLike], max_workers: Optional[int] = None, text: bool = True
+) -> List[JobResult]:
+    """
+    Run the toolchain jobs in parallel and wait for all of them.
+
+    :param jobs: Job tuples, or plain (tool, args) tuples.
+    :param max_workers: Maximum jobs running at the same time.
+    :param text: Decode the captured stdout/stderr as text, otherwise bytes.
+    :return: List of job results, in the same order as the jobs.
+    """
+    return sorted(run_jobs(jobs, max_workers, text), key=lambda result: result.index)
+
+
+async def run_jobs_async(
+    jobs: Iterable[JobLike], max_workers: Optional[int] = None, text: bool = True
+) -> AsyncIterator[JobResult]:
+    """
+    asyncio version of run_jobs(), yielding each result as it finishes.
+    On Windows with Python < 3.8 it needs the ProactorEventLoop.
+
+    :param jobs: Job tuples, or plain (tool, args) tuples.
+    :param max_workers: Maximum jobs running at the same time, defaults to
+        the number of CPUs.
+    :param text: Decode the captured stdout/stderr as text, otherwise bytes.
+    :return: Async iterator of job results, in completion order.
+    """
+    semaphore = asyncio.Semaphore(max_workers or os.cpu_count() or 1)
+    encoding = locale.getpreferredencoding(False)
+
+    async def run_job(index: int, job: Job) -> JobResult:
+        async with semaphore:
+            process = await asyncio.create_subprocess_exec(
+                get_tool_path(job.tool),
+                *job.args,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=job.cwd,
+                env=job.env,
+            )
+            stdout_data, stderr_data = await process.communicate()
+        if text:
+            stdout = stdout_data.decode(encoding, errors="replace")
+            stderr = stderr_data.decode(encoding, errors="replace")
+            return JobResult(index, job, process.returncode, stdout, stderr)
+        return JobResult(index, job, process.returncode, stdout_data, stderr_data)
+
+    tasks = [
+        asyncio.ensure_future(run_job(index, _to_job(job)))
+        for index, job in enumerate(jobs)
+    ]
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            yield await next_result
+    finally:
+        for task in tasks:
+            task.cancel()
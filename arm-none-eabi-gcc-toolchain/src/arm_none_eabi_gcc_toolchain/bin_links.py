@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+"""
+Replace the Python console script launchers with symlinks to the toolchain
+executables, so invoking them doesn't start a Python interpreter at all.
+"""
+import os
+import shutil
+import sysconfig
+from typing import Dict, List, Optional
+
+from arm_none_eabi_gcc_toolchain import get_tools
+
+# The replaced console scripts are kept here, inside the scripts folder
+BACKUP_DIR_NAME = ".arm-none-eabi-gcc-toolchain-launchers"
+
+
+def get_default_dest_dir() -> str:
+    """
+    :return: The scripts folder of the running Python environment, where pip
+        installs the console script launchers.
+    """
+    return sysconfig.get_path("scripts")
+
+
+def link_bin(dest_dir: Optional[str] = None) -> List[str]:
+    """
+    Create a symlink to each toolchain executable in the destination folder,
+    moving any existing console script launchers out of the way.
+
+    :param dest_dir: Folder for the links, defaults to the environment scripts.
+    :return: List of the created symlink paths.
+    """
+    if os.name != "posix":
+        raise OSError("Linking the toolchain executables is only supported on POSIX")
+    dest_dir = dest_dir or get_default_dest_dir()
+    backup_dir = os.path.join(dest_dir, BACKUP_DIR_NAME)
+    os.makedirs(dest_dir, exist_ok=True)
+    links = []
+    for name, bin_path in get_tools().items():
+        link_path = os.path.join(dest_dir, name)
+        if os.path.islink(link_path):
+            if os.readlink(link_path) == bin_path:
+                continue
+            os.unlink(link_path)
+        elif os.path.exists(link_path):
+            os.makedirs(backup_dir, exist_ok=True)
+            shutil.move(link_path, os.path.join(backup_dir, name))
+        os.symlink(bin_path, link_path)
+        links.append(link_path)
+    return links
+
+
+def unlink_bin(dest_dir: Optional[str] = None) -> List[str]:
+    """
+    Remove the symlinks created by link_bin() and restore the console script
+    launchers that were replaced.
+
+    :param dest_dir: Folder with the links, defaults to the environment scripts.
+    :return: List of the removed symlink paths.
+    """
+    dest_dir = dest_dir or get_default_dest_dir()
+    backup_dir = os.path.join(dest_dir, BACKUP_DIR_NAME)
+    removed = []
+    for name, bin_path in get_tools().items():
+        link_path = os.path.join(dest_dir, name)
+        if os.path.islink(link_path) and os.readlink(link_path) == bin_path:
+            os.unlink(link_path)
+            removed.append(link_path)
+        backup_path = os.path.join(backup_dir, name)
+        if os.path.exists(backup_path) and not os.path.lexists(link_path):
+            shutil.move(backup_path, link_path)
+    if os.path.isdir(backup_dir) and not os.listdir(backup_dir):
+        os.rmdir(backup_dir)
+    return removed
+
+
+def verify_bin(dest_dir: Optional[str] = None) -> Dict[str, str]:
+    """
+    Check the state of each toolchain executable in the destination folder.
+
+    :param dest_dir: Folder with the links, defaults to the environment scripts.
+    :return: Dictionary of executable name to its state, one of "linked",
+        "launcher" (a console script), "missing", "broken" (a symlink to a
+        file that doesn't exist) or "other" (a symlink to a different file).
+    """
+    dest_dir = dest_dir or get_default_dest_dir()
+    states = {}
+    for name, bin_path in get_tools().items():
+        link_path = os.path.join(dest_dir, name)
+        if os.path.islink(link_path):
+            if not os.path.exists(link_path):
+                states[name] = "broken"
+            elif os.readlink(link_path) == bin_path:
+                states[name] = "linked"
+            else:
+                states[name] = "other"
+        elif os.path.exists(link_path):
+            states[name] = "launcher"
+        else:
+            states[name] = "missing"
+    return states
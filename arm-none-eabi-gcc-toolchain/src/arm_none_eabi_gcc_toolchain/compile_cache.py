@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+"""
+Optional compilation cache for the packaged gcc/g++, similar to ccache.
+
+When enabled with ARM_NONE_EABI_GCC_CACHE=1, the launchers hash the
+preprocessed source, the compiler flags and the toolchain version of each
+single source "-c" compilation, and reuse the object file from a previous
+compilation with the same hash instead of compiling it again.
+Anything else (linking, multiple sources, unsupported flags) runs normally.
+"""
+import os
+import re
+import sys
+import time
+import uuid
+import shutil
+import hashlib
+import subprocess
+from collections import namedtuple
+from typing import Dict, List, Optional, Tuple
+
+ENABLE_ENV_VAR = "ARM_NONE_EABI_GCC_CACHE"
+CACHE_DIR_ENV_VAR = "ARM_NONE_EABI_GCC_CACHE_DIR"
+MAX_SIZE_ENV_VAR = "ARM_NONE_EABI_GCC_CACHE_MAX_SIZE_MB"
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "arm-none-eabi-gcc-toolchain", "compile"
+)
+DEFAULT_MAX_SIZE_MB = 5 * 1024
+# Checking the cache size walks all the entries, so only do it every N misses
+PRUNE_EVERY_MISSES = 100
+# Bump it if the cache entries format or the hashed inputs change
+CACHE_FORMAT = "1"
+
+OBJECT_FILE = "object"
+STDERR_FILE = "stderr"
+DEP_FILE = "dep"
+STATS_DIR = "stats"
+TMP_DIR = "tmp"
+STATS = ("hits", "misses", "uncacheable")
+
+# The compiler drivers that can use the cache, with or without the version
+# suffix, but not the other tools with the same prefix like gcc-ar or c++filt
+CACHEABLE_TOOL_RE = re.compile(r"arm-none-eabi-(gcc|g\+\+|c\+\+)(-\d+(\.\d+)*)?")
+# Options with their value in the next argument
+OPTIONS_WITH_VALUE = {
+    "-o",
+    "-x",
+    "-I",
+    "-D",
+    "-U",
+    "-L",
+    "-T",
+    "-u",
+    "-A",
+    "-include",
+    "-imacros",
+    "-isystem",
+    "-iquote",
+    "-idirafter",
+    "-iprefix",
+    "-iwithprefix",
+    "-iwithprefixbefore",
+    "-isysroot",
+    "-MF",
+    "-MT",
+    "-MQ",
+    "-Xassembler",
+    "-Xpreprocessor",
+    "-Xlinker",
+    "--param",
+    "-aux-info",
+}
+# Options with outputs or inputs the cache doesn't know how to handle
+UNCACHEABLE_OPTIONS = ("-E", "-S", "-M", "-MM", "--coverage", "-ftest-coverage")
+UNCACHEABLE_PREFIXES = ("-save-temps", "-fprofile-", "-fdump-", "-Wp,", "-specs")
+DEP_OPTIONS = ("-MD", "-MMD")
+DEP_OPTIONS_WITH_VALUE = ("-MF", "-MT", "-MQ")
+
+# NamedTuple with the parsed arguments of a cacheable compilation, dep_file is
+# the dependency file path if -MD/-MMD are used, None otherwise
+CompileArgs = namedtuple(
+    "CompileArgs", ["source", "output", "dep_file", "preprocess_args"]
+)
+
+
+def get_cache_dir() -> str:
+    return os.environ.get(CACHE_DIR_ENV_VAR) or DEFAULT_CACHE_DIR
+
+
+def get_max_size() -> int:
+    """:return: Maximum cache size in bytes."""
+    return int(os.environ.get(MAX_SIZE_ENV_VAR, DEFAULT_MAX_SIZE_MB)) * 1024 * 1024
+
+
+def is_cacheable_tool(script_name: str) -> bool:
+    """
+    :param script_name: Executable name without ".exe", e.g. "arm-none-eabi-gcc".
+    :return: True if it's a compiler driver that can use the cache.
+    """
+    return CACHEABLE_TOOL_RE.fullmatch(script_name) is not None
+
+
+def parse_compile_args(args: List[str]) -> Optional[CompileArgs]:
+    """
+    Parse the compiler arguments of a single source compilation to an object.
+
+    :param args: The compiler arguments (without the executable).
+    :return: The parsed arguments, or None if the invocation is not cacheable.
+    """
+    if "-c" not in args:
+        return None
+    sources = []
+    output = None
+    dep_file = None
+    has_dep_option = False
+    preprocess_args = []
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        value = args[i + 1] if i + 1 < len(args) else None
+        if arg.startswith("@") or arg == "-":
+            return None
+        if arg in UNCACHEABLE_OPTIONS or arg.startswith(UNCACHEABLE_PREFIXES):
+            return None
+        if arg in OPTIONS_WITH_VALUE:
+            if value is None:
+                return None
+            i += 1
+        if arg == "-o":
+            output = value
+        elif arg.startswith("-o"):
+            output = arg[2:]
+        elif arg in DEP_OPTIONS:
+            has_dep_option = True
+        elif arg == "-MF":
+            dep_file = value
+        elif arg in DEP_OPTIONS_WITH_VALUE or arg in ("-MP", "-c"):
+            pass
+        elif arg.startswith("-MF"):
+            dep_file = arg[3:]
+        elif not arg.startswith("-"):
+            sources.append(arg)
+            preprocess_args.append(arg)
+        else:
+            preprocess_args.append(arg)
+            if arg in OPTIONS_WITH_VALUE and value is not None:
+                preprocess_args.append(value)
+        i += 1
+    if len(sources) != 1:
+        return None
+    source = sources[0]
+    if output is None:
+        output = os.path.splitext(os.path.basename(source))[0] + ".o"
+    if has_dep_option:
+        dep_file = dep_file or os.path.splitext(output)[0] + ".d"
+    else:
+        dep_file = None
+    return CompileArgs(source, output, dep_file, preprocess_args)
+
+
+def _add_stat(cache_dir: str, stat: str) -> int:
+    """
+    Count a stat by appending a byte to its file, which is safe with many
+    compilations running at the same time without any locking.
+
+    :return: The new stat count.
+    """
+    stats_dir = os.path.join(cache_dir, STATS_DIR)
+    os.makedirs(stats_dir, exist_ok=True)
+    with open(os.path.join(stats_dir, stat), "ab") as stat_file:
+        stat_file.write(b".")
+        return stat_file.tell()
+
+
+def _hash_compilation(bin_path: str, args: List[str], compile_args: CompileArgs):
+    """
+    :return: The cache key, or None if the source can't be preprocessed.
+    """
+    from arm_none_eabi_gcc_toolchain import _index
+
+    process = subprocess.run(
+        [bin_path, "-E"] + compile_args.preprocess_args,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    if process.returncode != 0:
+        return None
+    bin_stat = os.stat(bin_path)
+    hasher = hashlib.sha256()
+    identity = [
+        CACHE_FORMAT,
+        os.path.basename(bin_path),
+        str(_index.GCC_VERSION),
+        str(bin_stat.st_size),
+        str(bin_stat.st_mtime_ns),
+        os.getcwd(),
+    ]
+    # The object file path only matters if it's written in the dependency file
+    hashed_args = args if compile_args.dep_file else compile_args.preprocess_args
+    for item in identity + hashed_args:
+        hasher.update(item.encode("utf-8", "surrogateescape") + b"\0")
+    hasher.update(process.stdout)
+    return hasher.hexdigest()
+
+
+def _copy_file(src: str, dst: str) -> None:
+    """Copy a file replacing the destination atomically."""
+    tmp_dst = f"{dst}.{uuid.uuid4().hex}.tmp"
+    try:
+        shutil.copyfile(src, tmp_dst)
+        os.replace(tmp_dst, dst)
+    except OSError:
+        if os.path.exists(tmp_dst):
+            os.remove(tmp_dst)
+        raise
+
+
+def _restore(entry_dir: str, compile_args: CompileArgs) -> Optional[bytes]:
+    """
+    Copy the outputs saved in a cache entry to the compilation output paths.
+
+    :return: The compiler stderr saved in the entry, or None if the entry
+        doesn't exist, or it was evicted by another compilation while it was
+        being restored.
+    """
+    try:
+        with open(os.path.join(entry_dir, STDERR_FILE), "rb") as stderr_file:
+            stderr = stderr_file.read()
+        _copy_file(os.path.join(entry_dir, OBJECT_FILE), compile_args.output)
+        if compile_args.dep_file:
+            _copy_file(os.path.join(entry_dir, DEP_FILE), compile_args.dep_file)
+        # The entry folder mtime is the last time it was used, for the LRU
+        os.utime(entry_dir)
+    except OSError:
+        return None
+    return stderr
+
+
+def _store(cache_dir: str, entry_dir: str, compile_args: CompileArgs, stderr: bytes):
+    """Add the compilation outputs to the cache, all at once."""
+    tmp_dir = os.path.join(cache_dir, TMP_DIR, uuid.uuid4().hex)
+    os.makedirs(tmp_dir)
+    try:
+        shutil.copyfile(compile_args.output, os.path.join(tmp_dir, OBJECT_FILE))
+        if compile_args.dep_file:
+            shutil.copyfile(compile_args.dep_file, os.path.join(tmp_dir, DEP_FILE))
+        with open(os.path.join(tmp_dir, STDERR_FILE), "wb") as stderr_file:
+            stderr_file.write(stderr)
+        os.makedirs(os.path.dirname(entry_dir), exist_ok=True)
+        os.rename(tmp_dir, entry_dir)
+    except OSError:
+        # E.g. another compilation stored the same entry first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def run_cached(bin_path: str, args: List[str]) -> Optional[int]:
+    """
+    Run a compilation through the cache.
+
+    :param bin_path: Path to the compiler executable.
+    :param args: The compiler arguments (without the executable).
+    :return: The compiler exit code, or None if the compilation can't be
+        cached, or the cache can't be used (e.g. the folder is read only),
+        and it has to run normally.
+    """
+    cache_dir = get_cache_dir()
+    try:
+        compile_args = parse_compile_args(args)
+        key = None
+        if compile_args is not None:
+            key = _hash_compilation(bin_path, args, compile_args)
+        if compile_args is None or key is None:
+            _add_stat(cache_dir, "uncacheable")
+            return None
+
+        entry_dir = os.path.join(cache_dir, key[:2], key)
+        stderr = _restore(entry_dir, compile_args)
+        if stderr is not None:
+            if stderr:
+                sys.stderr.flush()
+                sys.stderr.buffer.write(stderr)
+                sys.stderr.flush()
+            _add_stat(cache_dir, "hits")
+            return 0
+    except OSError:
+        # E.g. the cache folder can't be written, the launcher runs it normally
+        return None
+
+    process = subprocess.run([bin_path] + args, stderr=subprocess.PIPE)
+    sys.stderr.flush()
+    sys.stderr.buffer.write(process.stderr)
+    sys.stderr.flush()
+    try:
+        if process.returncode == 0 and os.path.isfile(compile_args.output):
+            _store(cache_dir, entry_dir, compile_args, process.stderr)
+        if _add_stat(cache_dir, "misses") % PRUNE_EVERY_MISSES == 0:
+            prune_cache(cache_dir, get_max_size())
+    except (OSError, ValueError):
+        # The compilation already ran, only the cache couldn't be updated (or
+        # the maximum size environment variable is invalid)
+        pass
+    return process.returncode
+
+
+def _get_entries(cache_dir: str) -> List[Tuple[float, int, str]]:
+    """:return: List of (last used time, size, entry path), oldest first."""
+    entries = []  # type: List[Tuple[float, int, str]]
+    if not os.path.isdir(cache_dir):
+        return entries
+    for prefix in os.listdir(cache_dir):
+        prefix_dir = os.path.join(cache_dir, prefix)
+        if len(prefix) != 2 or not os.path.isdir(prefix_dir):
+            continue
+        for key in os.listdir(prefix_dir):
+            entry_dir = os.path.join(prefix_dir, key)
+            try:
+                size = sum(
+                    os.path.getsize(os.path.join(entry_dir, name))
+                    for name in os.listdir(entry_dir)
+                )
+                entries.append((os.path.getmtime(entry_dir), size, entry_dir))
+            except OSError:
+                # Evicted by another process while iterating
+                continue
+    return sorted(entries)
+
+
+def prune_cache(cache_dir: str, max_size: int) -> int:
+    """
+    Evict the least recently used entries until the cache fits in max_size.
+
+    :param cache_dir: Path to the cache directory.
+    :param max_size: Maximum size in bytes of all the cache entries.
+    :return: Number of evicted entries.
+    """
+    entries = _get_entries(cache_dir)
+    total_size = sum(size for _, size, _ in entries)
+    evicted = 0
+    for _, size, entry_dir in entries:
+        if total_size <= max_size:
+            break
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        total_size -= size
+        evicted += 1
+    # Leftovers from compilations that were interrupted while storing
+    tmp_dir = os.path.join(cache_dir, TMP_DIR)
+    if os.path.isdir(tmp_dir):
+        for item in os.listdir(tmp_dir):
+            item_path = os.path.join(tmp_dir, item)
+            if time.time() - os.path.getmtime(item_path) > 60 * 60:
+                shutil.rmtree(item_path, ignore_errors=True)
+    return evicted
+
+
+def get_stats(cache_dir: Optional[str] = None) -> Dict[str, int]:
+    """
+    :param cache_dir: Path to the cache directory, defaults to the configured.
+    :return: Dictionary with the hits, misses and uncacheable counts, and the
+        number of entries and their total size in bytes.
+    """
+    cache_dir = cache_dir or get_cache_dir()
+    stats = {}
+    for stat in STATS:
+        stat_path = os.path.join(cache_dir, STATS_DIR, stat)
+        stats[stat] = os.path.getsize(stat_path) if os.path.isfile(stat_path) else 0
+    entries = _get_entries(cache_dir)
+    stats["entries"] = len(entries)
+    stats["size"] = sum(size for _, size, _ in entries)
+    return stats
+
+
+def clean_cache(cache_dir: Optional[str] = None) -> None:
+    """
+    Delete all the cache entries and reset the stats.
+
+    :param cache_dir: Path to the cache directory, defaults to the configured.
+    """
+    cache_dir = cache_dir or get_cache_dir()
+    if os.path.isdir(cache_dir):
+        shutil.rmtree(cache_dir)
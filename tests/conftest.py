@@ -0,0 +1,104 @@
+import sys
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+
+# The runtime package is not installed, it's built into the wheels
+sys.path.insert(
+    0, str(Path(__file__).resolve().parents[1] / "arm-none-eabi-gcc-toolchain" / "src")
+)
+
+
+class StandInServer:
+    """
+    Local HTTP server serving files from memory, with range requests and
+    ETags, to stand in for the toolchain download host and the GitHub API.
+    """
+
+    def __init__(self) -> None:
+        # Path (with the query string) to the body and extra response headers
+        self.files = {}  # type: Dict[str, Tuple[bytes, Dict[str, str]]]
+        self.requests = []  # type: List[Tuple[str, str, Optional[str]]]
+        # Range requests starting at or after this offset fail with a 404
+        self.fail_ranges_from = None  # type: Optional[int]
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}{path}"
+
+    def add_file(self, path: str, body: bytes, headers=None) -> str:
+        self.files[path] = (body, headers or {})
+        return self.url(path)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_HEAD(self) -> None:
+                self._respond(send_body=False)
+
+            def do_GET(self) -> None:
+                self._respond(send_body=True)
+
+            def _respond(self, send_body: bool) -> None:
+                range_header = self.headers.get("Range")
+                server.requests.append((self.command, self.path, range_header))
+                if self.path not in server.files:
+                    self.send_error(404)
+                    return
+                body, headers = server.files[self.path]
+                etag = f'"{hash(body) & 0xFFFFFFFF:x}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                status = 200
+                if range_header and send_body:
+                    start_text, end_text = range_header[len("bytes=") :].split("-")
+                    start = int(start_text)
+                    end = min(int(end_text), len(body) - 1)
+                    if (
+                        server.fail_ranges_from is not None
+                        and start >= server.fail_ranges_from
+                    ):
+                        self.send_error(404)
+                        return
+                    body = body[start : end + 1]
+                    status = 206
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Accept-Ranges", "bytes")
+                self.send_header("ETag", etag)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(body)
+
+        return Handler
+
+
+@pytest.fixture
+def http_server():
+    server = StandInServer()
+    server.start()
+    yield server
+    server.stop()
@@ -0,0 +1,76 @@
+import sys
+import asyncio
+
+import pytest
+
+from arm_none_eabi_gcc_toolchain import batch
+from arm_none_eabi_gcc_toolchain.batch import Job, JobResult
+
+# Stands in for a toolchain executable: sleeps for the first argument seconds,
+# prints the second one to stdout and stderr and exits with the third one
+STUB_TOOL = """\
+#!{python}
+import sys
+import time
+
+time.sleep(float(sys.argv[1]))
+sys.stdout.write("out " + sys.argv[2])
+sys.stderr.write("err " + sys.argv[2])
+sys.exit(int(sys.argv[3]))
+"""
+
+# The first jobs take the longest, so they finish last
+JOBS = [
+    ("gcc", ["0.6", "first", "0"]),
+    ("arm-none-eabi-objcopy", ["0.3", "second", "1"]),
+    Job("size", ["0", "third", "0"], None, None),
+]
+
+
+@pytest.fixture
+def stub_tool(tmp_path, monkeypatch):
+    """Run every toolchain job with the stub tool."""
+    tool_path = tmp_path / "arm-none-eabi-stub"
+    tool_path.write_text(STUB_TOOL.format(python=sys.executable))
+    tool_path.chmod(0o755)
+    monkeypatch.setattr(batch, "get_tool_path", lambda tool: str(tool_path))
+    return tool_path
+
+
+def expected_result(index):
+    job = batch._to_job(JOBS[index])
+    _, name, returncode = job.args
+    return JobResult(index, job, int(returncode), f"out {name}", f"err {name}")
+
+
+def test_run_jobs_completion_order(stub_tool):
+    results = list(batch.run_jobs(JOBS, max_workers=3))
+
+    assert results == [expected_result(index) for index in (2, 1, 0)]
+
+
+def test_run_jobs_all_input_order(stub_tool):
+    results = batch.run_jobs_all(JOBS, max_workers=3, text=False)
+
+    assert [result.index for result in results] == [0, 1, 2]
+    assert results[0].stdout == b"out first"
+    assert results[1].returncode == 1
+
+
+def test_run_jobs_async(stub_tool):
+    async def collect(text):
+        return [result async for result in batch.run_jobs_async(JOBS, 3, text)]
+
+    loop = asyncio.new_event_loop()
+    try:
+        results = loop.run_until_complete(collect(text=True))
+        bytes_results = loop.run_until_complete(collect(text=False))
+    finally:
+        loop.close()
+
+    assert results == [expected_result(index) for index in (2, 1, 0)]
+    assert [result.stderr for result in bytes_results] == [
+        b"err third",
+        b"err second",
+        b"err first",
+    ]
@@ -0,0 +1,206 @@
+import sys
+import types
+
+import pytest
+
+import arm_none_eabi_gcc_toolchain
+from arm_none_eabi_gcc_toolchain import compile_cache
+from arm_none_eabi_gcc_toolchain.compile_cache import CompileArgs
+
+# Stands in for arm-none-eabi-gcc: "-E" outputs the defines and the source,
+# a compilation writes them to the object file, and every call is logged
+FAKE_GCC = """\
+#!{python}
+import os
+import sys
+
+args = sys.argv[1:]
+with open(os.path.join(os.path.dirname(__file__), "calls.log"), "a") as log:
+    log.write(" ".join(args) + "\\n")
+source = next(arg for arg in args if arg.endswith(".c"))
+with open(source) as source_file:
+    preprocessed = " ".join(a for a in args if a.startswith("-D")) + source_file.read()
+if "-E" in args:
+    sys.stdout.write(preprocessed)
+    sys.exit(0)
+if "#error" in preprocessed:
+    sys.stderr.write("error: " + source + "\\n")
+    sys.exit(1)
+sys.stderr.write("warning: " + source + "\\n")
+output = args[args.index("-o") + 1]
+with open(output, "w") as object_file:
+    object_file.write("object " + preprocessed)
+if "-MMD" in args:
+    with open(os.path.splitext(output)[0] + ".d", "w") as dep_file:
+        dep_file.write(output + ": " + source + "\\n")
+"""
+
+
+@pytest.fixture
+def fake_gcc(tmp_path, monkeypatch):
+    """
+    :return: Path to a fake compiler, run from a project folder with a
+        main.c source file and an empty compilation cache.
+    """
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    gcc_path = bin_dir / "arm-none-eabi-gcc"
+    gcc_path.write_text(FAKE_GCC.format(python=sys.executable))
+    gcc_path.chmod(0o755)
+    project_dir = tmp_path / "project"
+    project_dir.mkdir()
+    (project_dir / "main.c").write_text("int main(void) { return 0; }\n")
+    monkeypatch.chdir(project_dir)
+    monkeypatch.setenv(compile_cache.CACHE_DIR_ENV_VAR, str(tmp_path / "cache"))
+    # The index is generated when the package is built
+    index = types.ModuleType("arm_none_eabi_gcc_toolchain._index")
+    index.GCC_VERSION = "13.3.1"  # type: ignore[attr-defined]
+    monkeypatch.setitem(sys.modules, index.__name__, index)
+    monkeypatch.setattr(arm_none_eabi_gcc_toolchain, "_index", index, raising=False)
+    return str(gcc_path)
+
+
+def get_calls(gcc_path):
+    with open(gcc_path.replace("arm-none-eabi-gcc", "calls.log")) as log:
+        return log.read().splitlines()
+
+
+@pytest.mark.parametrize(
+    "script_name, cacheable",
+    [
+        ("arm-none-eabi-gcc", True),
+        ("arm-none-eabi-g++", True),
+        ("arm-none-eabi-c++", True),
+        ("arm-none-eabi-gcc-13.3.1", True),
+        ("arm-none-eabi-gcc-ar", False),
+        ("arm-none-eabi-gcc-nm", False),
+        ("arm-none-eabi-gcc-ranlib", False),
+        ("arm-none-eabi-c++filt", False),
+        ("arm-none-eabi-cpp", False),
+        ("arm-none-eabi-ld", False),
+    ],
+)
+def test_is_cacheable_tool(script_name, cacheable):
+    assert compile_cache.is_cacheable_tool(script_name) == cacheable
+
+
+def test_parse_compile_args():
+    args = "-mcpu=cortex-m4 -I inc -DDEBUG -c src/main.c -o build/main.o -MMD -MP"
+
+    compile_args = compile_cache.parse_compile_args(args.split())
+
+    assert compile_args == CompileArgs(
+        source="src/main.c",
+        output="build/main.o",
+        dep_file="build/main.d",
+        preprocess_args=["-mcpu=cortex-m4", "-I", "inc", "-DDEBUG", "src/main.c"],
+    )
+
+
+def test_parse_compile_args_defaults():
+    assert compile_cache.parse_compile_args(["-c", "src/main.c"]) == CompileArgs(
+        "src/main.c", "main.o", None, ["src/main.c"]
+    )
+    compile_args = compile_cache.parse_compile_args(
+        ["-c", "main.c", "-omain.o", "-MD", "-MFdeps/main.dep"]
+    )
+    assert compile_args.output == "main.o"
+    assert compile_args.dep_file == "deps/main.dep"
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        "main.c -o main.elf",
+        "-c main.c util.c",
+        "-c main.c -S",
+        "-c main.c -E",
+        "-c main.c -save-temps",
+        "-c main.c -fprofile-arcs",
+        "-c @args.rsp",
+        "-c - -x c",
+        "-c main.c -o",
+    ],
+)
+def test_parse_compile_args_uncacheable(args):
+    assert compile_cache.parse_compile_args(args.split()) is None
+
+
+def test_cache_key(fake_gcc):
+    def key(args):
+        args = args.split()
+        compile_args = compile_cache.parse_compile_args(args)
+        return compile_cache._hash_compilation(fake_gcc, args, compile_args)
+
+    assert key("-c main.c -o main.o") == key("-c main.c -o main.o")
+    # The flags and the preprocessed source change the key
+    assert key("-c main.c -o main.o") != key("-c main.c -o main.o -O2")
+    assert key("-c main.c -o main.o") != key("-c main.c -o main.o -DDEBUG")
+    # The object path is only in the key when it's written in a dependency file
+    assert key("-c main.c -o main.o") == key("-c main.c -o other.o")
+    assert key("-c main.c -o main.o -MMD") != key("-c main.c -o other.o -MMD")
+
+
+def test_run_cached_miss_then_hit(fake_gcc, tmp_path, capfd):
+    args = ["-c", "main.c", "-o", "main.o", "-MMD"]
+
+    assert compile_cache.run_cached(fake_gcc, args) == 0
+    object_data = (tmp_path / "project" / "main.o").read_text()
+    (tmp_path / "project" / "main.o").unlink()
+    (tmp_path / "project" / "main.d").unlink()
+    assert compile_cache.run_cached(fake_gcc, args) == 0
+
+    assert (tmp_path / "project" / "main.o").read_text() == object_data
+    assert (tmp_path / "project" / "main.d").read_text() == "main.o: main.c\n"
+    # Preprocessed for both lookups, but only compiled for the miss
+    assert [call for call in get_calls(fake_gcc) if "-E" not in call] == [
+        " ".join(args)
+    ]
+    # The compiler warnings are shown again on a hit
+    assert capfd.readouterr().err == "warning: main.c\n" * 2
+    stats = compile_cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_run_cached_failure_not_stored(fake_gcc, tmp_path):
+    (tmp_path / "project" / "main.c").write_text("#error\n")
+
+    for _ in range(2):
+        assert compile_cache.run_cached(fake_gcc, ["-c", "main.c", "-o", "main.o"])
+
+    stats = compile_cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (0, 2, 0)
+
+
+def test_run_cached_uncacheable(fake_gcc, tmp_path):
+    assert compile_cache.run_cached(fake_gcc, ["main.c", "-o", "main.elf"]) is None
+
+    assert compile_cache.get_stats()["uncacheable"] == 1
+    # Left for the launcher to run normally
+    assert not (tmp_path / "bin" / "calls.log").exists()
+
+
+def test_run_cached_entry_evicted_while_restoring(fake_gcc, tmp_path):
+    args = ["-c", "main.c", "-o", "main.o"]
+    assert compile_cache.run_cached(fake_gcc, args) == 0
+    # Another compilation pruned the entry after it was found
+    (object_file,) = (tmp_path / "cache").glob(f"*/*/{compile_cache.OBJECT_FILE}")
+    object_file.unlink()
+
+    assert compile_cache.run_cached(fake_gcc, args) == 0
+
+    assert [call for call in get_calls(fake_gcc) if "-E" not in call] == [
+        " ".join(args)
+    ] * 2
+    assert not list((tmp_path / "project").glob("*.tmp"))
+
+
+def test_run_cached_unusable_cache_dir(fake_gcc, tmp_path, monkeypatch):
+    cache_file = tmp_path / "not-a-folder"
+    cache_file.write_text("")
+    monkeypatch.setenv(compile_cache.CACHE_DIR_ENV_VAR, str(cache_file))
+
+    # Compiled without storing it, or left for the launcher to run normally
+    assert compile_cache.run_cached(fake_gcc, ["-c", "main.c", "-o", "main.o"]) == 0
+    assert (tmp_path / "project" / "main.o").is_file()
+    assert compile_cache.run_cached(fake_gcc, ["main.c", "-o", "main.elf"]) is None
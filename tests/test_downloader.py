@@ -0,0 +1,108 @@
+import os
+import json
+import hashlib
+
+import pytest
+
+from tools_src import download_cache, downloader
+from tools_src.package_creator import download_to_cache
+
+RANGE_SIZE = 64 * 1024
+FILE_DATA = os.urandom(RANGE_SIZE * 10 + 1234)
+FILE_MD5 = hashlib.md5(FILE_DATA).hexdigest()
+
+
+def range_requests(http_server):
+    return [request for request in http_server.requests if request[2] is not None]
+
+
+def test_segmented_download(http_server, tmp_path):
+    url = http_server.add_file("/toolchain.tar.xz", FILE_DATA)
+    file_path = tmp_path / "toolchain.tar.xz"
+
+    digest = downloader.download_file(
+        url, file_path, FILE_MD5, segments=4, range_size=RANGE_SIZE
+    )
+
+    assert digest == FILE_MD5
+    assert file_path.read_bytes() == FILE_DATA
+    assert len(range_requests(http_server)) == 11
+    assert not (tmp_path / "toolchain.tar.xz.part").exists()
+    assert not (tmp_path / "toolchain.tar.xz.part.json").exists()
+
+
+def test_resume_after_truncation(http_server, tmp_path):
+    url = http_server.add_file("/toolchain.tar.xz", FILE_DATA)
+    file_path = tmp_path / "toolchain.tar.xz"
+    part_path = tmp_path / "toolchain.tar.xz.part"
+    http_server.fail_ranges_from = RANGE_SIZE * 4
+
+    with pytest.raises(Exception):
+        downloader.download_file(
+            url, file_path, FILE_MD5, segments=2, range_size=RANGE_SIZE
+        )
+    state = json.loads((tmp_path / "toolchain.tar.xz.part.json").read_text())
+    assert state["committed"] == RANGE_SIZE * 4
+    # Data written after the last committed range is discarded
+    with open(part_path, "ab") as part_file:
+        part_file.write(b"garbage")
+
+    http_server.fail_ranges_from = None
+    http_server.requests.clear()
+    digest = downloader.download_file(
+        url, file_path, FILE_MD5, segments=2, range_size=RANGE_SIZE
+    )
+
+    assert digest == FILE_MD5
+    assert file_path.read_bytes() == FILE_DATA
+    first_range = min(
+        int(r[2][len("bytes=") :].split("-")[0]) for r in range_requests(http_server)
+    )
+    assert first_range == RANGE_SIZE * 4
+
+
+def test_md5_mismatch(http_server, tmp_path):
+    url = http_server.add_file("/toolchain.tar.xz", FILE_DATA)
+    file_path = tmp_path / "toolchain.tar.xz"
+
+    with pytest.raises(ValueError, match="MD5 mismatch"):
+        downloader.download_file(url, file_path, "0" * 32, range_size=RANGE_SIZE)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_download_to_cache_resumes(http_server, tmp_path):
+    range_size = downloader.DEFAULT_RANGE_SIZE
+    data = os.urandom(range_size * 3 + 1234)
+    md5 = hashlib.md5(data).hexdigest()
+    url = http_server.add_file("/toolchain.tar.xz", data)
+    http_server.fail_ranges_from = range_size
+
+    with pytest.raises(Exception):
+        download_to_cache(url, md5, tmp_path, show_progress=False)
+
+    http_server.fail_ranges_from = None
+    http_server.requests.clear()
+    cached_file = download_to_cache(url, md5, tmp_path, show_progress=False)
+
+    assert cached_file.read_bytes() == data
+    assert cached_file == download_cache.get_cached_toolchain(url, md5, tmp_path)
+    # Only the ranges after the first one are downloaded again
+    assert len(range_requests(http_server)) == 3
+    # The download folder became the cache entry and the lock was released
+    assert [path.name for path in tmp_path.iterdir()] == [
+        download_cache.cache_key(url, md5)
+    ]
+
+
+def test_claim_download_dir_stale_lock(tmp_path):
+    url, md5 = "http://127.0.0.1/toolchain.tar.xz", FILE_MD5
+    with download_cache.claim_download_dir(url, md5, tmp_path) as download_dir:
+        lock_path = tmp_path / f"{download_dir.name}.lock"
+        assert lock_path.read_text() == str(os.getpid())
+    assert not lock_path.exists()
+
+    # Left behind by a process that doesn't exist anymore
+    lock_path.write_text(str(2**22 + 1))
+    with download_cache.claim_download_dir(url, md5, tmp_path) as same_dir:
+        assert same_dir == download_dir
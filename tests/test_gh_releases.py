@@ -0,0 +1,117 @@
+import os
+import json
+import hashlib
+
+from tools_src.release_cache import load_release_cache
+from tools_src.simple_repository_generator import WheelData, get_gh_releases_wheel_urls
+
+REPO_NAME = "owner/repo"
+RELEASES_PATH = f"/repos/{REPO_NAME}/releases?per_page=100"
+WHEEL_NAME = "arm_none_eabi_gcc_toolchain-{}-py3-none-{}.whl"
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def add_asset(http_server, release, name, data, digest=False):
+    """Serve a release asset and add it to the release object."""
+    url = http_server.add_file(f"/download/{release['tag_name']}/{name}", data)
+    release["assets"].append(
+        {
+            "id": len(http_server.files),
+            "name": name,
+            "size": len(data),
+            "updated_at": "2024-01-01T00:00:00Z",
+            "browser_download_url": url,
+            "digest": f"sha256:{sha256(data)}" if digest else None,
+        }
+    )
+    return url
+
+
+def add_releases(http_server):
+    """
+    Serve two pages of releases, the first one with a wheel with SHA-256 and
+    metadata files, and a wheel with only the GitHub digest, and the second
+    one with a wheel with a SHA-256 file for a different wheel.
+
+    :return: The expected wheels for each release tag.
+    """
+    new_release = {"id": 2, "tag_name": "v2", "assets": []}
+    old_release = {"id": 1, "tag_name": "v1", "assets": []}
+    expected = {"v2": [], "v1": []}
+
+    name = WHEEL_NAME.format("2.0.0", "manylinux_2_28_x86_64")
+    wheel, metadata = os.urandom(1000), b"Metadata-Version: 2.1\n"
+    url = add_asset(http_server, new_release, name, wheel)
+    add_asset(
+        http_server, new_release, f"{name}.sha256", f"{sha256(wheel)} {name}\n".encode()
+    )
+    metadata_url = add_asset(http_server, new_release, f"{name}.metadata", metadata)
+    add_asset(
+        http_server,
+        new_release,
+        f"{name}.metadata.sha256",
+        f"{sha256(metadata)} {name}.metadata\n".encode(),
+    )
+    expected["v2"].append(
+        WheelData(name, url, sha256(wheel), metadata_url, sha256(metadata))
+    )
+
+    name = WHEEL_NAME.format("2.0.0", "win_amd64")
+    wheel = os.urandom(2000)
+    url = add_asset(http_server, new_release, name, wheel, digest=True)
+    expected["v2"].append(WheelData(name, url, sha256(wheel)))
+
+    name = WHEEL_NAME.format("1.0.0", "win_amd64")
+    wheel = os.urandom(3000)
+    url = add_asset(http_server, old_release, name, wheel)
+    add_asset(
+        http_server, old_release, f"{name}.sha256", f"{'0' * 64} other.whl\n".encode()
+    )
+    expected["v1"].append(WheelData(name, url, sha256(wheel)))
+
+    next_url = http_server.url(f"{RELEASES_PATH}&page=2")
+    http_server.add_file(
+        RELEASES_PATH,
+        json.dumps([new_release]).encode(),
+        {"Link": f'<{next_url}>; rel="next", <{next_url}>; rel="last"'},
+    )
+    http_server.add_file(f"{RELEASES_PATH}&page=2", json.dumps([old_release]).encode())
+    return expected
+
+
+def test_gh_releases_wheel_urls(http_server, tmp_path):
+    expected = add_releases(http_server)
+
+    wheels = get_gh_releases_wheel_urls(
+        REPO_NAME, api_url=http_server.base_url, hash_cache_dir=tmp_path
+    )
+
+    assert wheels == expected
+    paths = [path for _, path, _ in http_server.requests]
+    assert paths.count(RELEASES_PATH) == paths.count(f"{RELEASES_PATH}&page=2") == 1
+    # Only the wheel without a matching SHA-256 file or digest is downloaded
+    downloaded = {path for path in paths if path.endswith(".whl")}
+    assert downloaded == {"/download/v1/" + WHEEL_NAME.format("1.0.0", "win_amd64")}
+
+
+def test_gh_releases_wheel_urls_cached(http_server, tmp_path):
+    expected = add_releases(http_server)
+    cache = load_release_cache(REPO_NAME, tmp_path)
+    get_gh_releases_wheel_urls(
+        REPO_NAME, api_url=http_server.base_url, cache=cache, hash_cache_dir=tmp_path
+    )
+    http_server.requests.clear()
+
+    wheels = get_gh_releases_wheel_urls(
+        REPO_NAME, api_url=http_server.base_url, cache=cache, hash_cache_dir=tmp_path
+    )
+
+    assert wheels == expected
+    # The unchanged pages are not downloaded again, and no assets are fetched
+    assert [path for _, path, _ in http_server.requests] == [
+        RELEASES_PATH,
+        f"{RELEASES_PATH}&page=2",
+    ]
@@ -0,0 +1,23 @@
+import os
+import hashlib
+
+from tools_src.hash_resolver import HashRequest, resolve_sha256s
+
+WHEEL_NAME = "arm_none_eabi_gcc_toolchain-1.0.0-py3-none-win_amd64.whl"
+
+
+def test_replaced_asset_hashed_again(http_server, tmp_path):
+    old_wheel, new_wheel = os.urandom(3000), os.urandom(3000)
+    url = http_server.add_file(f"/download/{WHEEL_NAME}", old_wheel)
+    request = HashRequest(url, WHEEL_NAME, 3000, 10, "2024-01-01T00:00:00Z")
+    resolve_sha256s([request], tmp_path)
+
+    # Uploaded again with the same name and size
+    http_server.add_file(f"/download/{WHEEL_NAME}", new_wheel)
+    cached = resolve_sha256s([request], tmp_path)
+    replaced = request._replace(asset_id=11, updated_at="2024-02-01T00:00:00Z")
+    sha256s = resolve_sha256s([replaced], tmp_path)
+
+    assert cached == {url: hashlib.sha256(old_wheel).hexdigest()}
+    assert sha256s == {url: hashlib.sha256(new_wheel).hexdigest()}
+    assert resolve_sha256s([replaced], tmp_path) == sha256s
@@ -0,0 +1,70 @@
+import sys
+import types
+
+import pytest
+
+import arm_none_eabi_gcc_toolchain as toolchain
+
+TOOLCHAIN = "arm-gnu-toolchain"
+GCC = f"{TOOLCHAIN}/bin/arm-none-eabi-gcc"
+GCC_RECORD = f"arm_none_eabi_gcc_toolchain/{GCC},sha256=abc,29"
+
+
+@pytest.fixture
+def site_dir(tmp_path, monkeypatch):
+    """
+    :return: Path to a site-packages folder with the package installed, with
+        its RECORD and an index with two duplicates of the gcc executable.
+    """
+    package_dir = tmp_path / "arm_none_eabi_gcc_toolchain"
+    (package_dir / TOOLCHAIN / "bin").mkdir(parents=True)
+    (package_dir / GCC).write_text("#!/bin/sh\n")
+    dist_info = tmp_path / "arm_none_eabi_gcc_toolchain-1.0.0.dist-info"
+    dist_info.mkdir()
+    (dist_info / "RECORD").write_text(
+        f"arm_none_eabi_gcc_toolchain/_index.py,sha256=def,100\n{GCC_RECORD}\n"
+    )
+    monkeypatch.setattr(toolchain, "PACKAGE_DIR", str(package_dir))
+    # The index is generated when the package is built
+    index = types.ModuleType("arm_none_eabi_gcc_toolchain._index")
+    index.DUPLICATES = {  # type: ignore[attr-defined]
+        f"{GCC}-13.3.1": GCC,
+        f"{TOOLCHAIN}/libexec/gcc": GCC,
+    }
+    index.DUPLICATES_HASH = "1111"  # type: ignore[attr-defined]
+    monkeypatch.setitem(sys.modules, index.__name__, index)
+    monkeypatch.setattr(toolchain, "_index", index, raising=False)
+    return tmp_path
+
+
+def test_restore_duplicates_recorded(site_dir):
+    package_dir = site_dir / "arm_none_eabi_gcc_toolchain"
+
+    assert toolchain.restore_duplicates() == 2
+    assert toolchain.restore_duplicates() == 0
+
+    assert (package_dir / f"{GCC}-13.3.1").read_text() == "#!/bin/sh\n"
+    assert (package_dir / TOOLCHAIN / "libexec" / "gcc").is_file()
+    assert (package_dir / toolchain.DUPLICATES_MARKER).read_text() == "1111"
+    # Listed with the source file hash, so pip uninstall removes them
+    record = site_dir / "arm_none_eabi_gcc_toolchain-1.0.0.dist-info" / "RECORD"
+    assert record.read_text().splitlines()[2:] == [
+        GCC_RECORD.replace(GCC, f"{GCC}-13.3.1"),
+        GCC_RECORD.replace(GCC, f"{TOOLCHAIN}/libexec/gcc"),
+        "arm_none_eabi_gcc_toolchain/.duplicates-restored,,",
+    ]
+
+
+def test_restore_duplicates_stale_marker(site_dir):
+    package_dir = site_dir / "arm_none_eabi_gcc_toolchain"
+    # Left by a previous version, which had other duplicates
+    (package_dir / toolchain.DUPLICATES_MARKER).write_text("0000")
+
+    assert toolchain.restore_duplicates() == 2
+    assert (package_dir / toolchain.DUPLICATES_MARKER).read_text() == "1111"
+
+
+def test_restore_duplicates_without_record(site_dir):
+    (site_dir / "arm_none_eabi_gcc_toolchain-1.0.0.dist-info" / "RECORD").unlink()
+
+    assert toolchain.restore_duplicates() == 2
@@ -1,31 +1,55 @@
 #!/usr/bin/env python3
 # -*- coding:utf-8 -*-
+import time
 import shutil
+import tempfile
 import itertools
 import platform as p
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 import typer
 from typing_extensions import Annotated
 from rich import print, console, panel
 
-from tools_src.simple_repository_generator import generate_simple_repository
+from tools_src.simple_repository_generator import (
+    generate_simple_repository,
+    generate_simple_repository_from_dir,
+)
+from tools_src.gh_releases import DEFAULT_CONCURRENCY, GH_API_URL
 from tools_src import package_creator as pc
+from tools_src import download_cache
+from tools_src import hashing
+from tools_src import build_state
+from tools_src import cleaner
+from tools_src import benchmarks
+from tools_src import dedup as dedup_tools
+from tools_src import release_cache
+from tools_src.extraction_profiles import DEFAULT_PROFILE, PROFILES
+from tools_src.compression_policies import DEFAULT_POLICY, POLICIES
 from tools_src.package_creator import (
     PROJECT_NAME,
     PACKAGE_NAME,
     PACKAGE_ROOT,
     PACKAGE_PATH,
+    STAGING_ROOT,
 )
 
 
 app = typer.Typer()
+cache_app = typer.Typer(help="Manage the toolchain archives download cache.")
+app.add_typer(cache_app, name="cache")
+benchmark_app = typer.Typer(help="Measure the performance of the package.")
+app.add_typer(benchmark_app, name="benchmark")
 err_console = console.Console(stderr=True)
 PROJECT_ROOT = Path(__file__).resolve().parents[0]
 PACKAGE_PYPI_ROOT = PROJECT_ROOT / f"{PROJECT_NAME}-pypi"
 SIMPLE_REPO_DEFAULT_GH_REPO = "carlosperate/arm-none-eabi-gcc-py-package"
 SIMPLE_REPO_DEFAULT_OP_PATH = PROJECT_ROOT / "simple_repository_static"
+CACHE_DEFAULT_MAX_SIZE_MB = download_cache.DEFAULT_CACHE_MAX_SIZE // (1024 * 1024)
+# Deep enough for the package src folder: <package root>/src/<package>/__pycache__
+CLEAN_MAX_DEPTH = 4
 
 
 def error_exit(message: str, exit_code: int = 1):
@@ -36,7 +60,11 @@ def error_exit(message: str, exit_code: int = 1):
 def package_clean():
     """
     Cleans the project from any build artifacts.
+
+    Only the locations where the builds create files are searched, at a
+    bounded depth, and folders are deleted in the background.
     """
+    start_time = time.perf_counter()
     files = [
         PACKAGE_ROOT / "MANIFEST.in",
         PACKAGE_ROOT / "pyproject.toml",
@@ -45,53 +73,47 @@ def package_clean():
         PROJECT_ROOT / ".mypy_cache",
         PACKAGE_ROOT / "build",
         PACKAGE_ROOT / "src" / f"{PACKAGE_NAME}.egg-info",
+        STAGING_ROOT,
         SIMPLE_REPO_DEFAULT_OP_PATH,
     ]
 
-    print("\nDeleting explicitly files and folders...")
-    for file in files:
-        if file.exists():
-            file.unlink()
-            print(f"\tDeleted file: {file.relative_to(PROJECT_ROOT)}")
-    for folder in folders:
-        if folder.exists():
-            shutil.rmtree(folder)
-            print(f"\tDeleted folder: {folder.relative_to(PROJECT_ROOT)}")
-
-    # All autogenerated "run_*.py" files
-    print("\nFinding run_*.py files...")
-    for run_file in (PACKAGE_PATH).rglob("run_*.py"):
-        run_file.unlink()
-        print(f"\tDeleted file: {run_file.relative_to(PROJECT_ROOT)}")
-
-    # Find all __pycache__ folders and delete them, excluding directories starting with a dot
-    print("\nFinding __pycache__ folders...")
-    for folder in PROJECT_ROOT.rglob("__pycache__"):
-        if not folder.relative_to(PROJECT_ROOT).parts[0].startswith("."):
-            shutil.rmtree(folder)
-            print(f"\tDeleted folder: {folder.relative_to(PROJECT_ROOT)}")
+    def delete(path: Path) -> None:
+        path_type = "folder" if path.is_dir() else "file"
+        cleaner.remove_path(path, PROJECT_ROOT)
+        print(f"\tDeleted {path_type}: {path.relative_to(PROJECT_ROOT)}")
 
-    # Find any GCC folders or compressed files and delete them
-    print("\nFinding GCC folders and compressed files...")
+    print("\nDeleting explicitly files and folders...")
+    cleaner.empty_trash(PROJECT_ROOT)
+    for path in files + folders:
+        if path.exists():
+            delete(path)
+
+    # The toolchain is downloaded into the project root and extracted into the
+    # package folder, where the launcher module is generated as well
+    print("\nFinding GCC folders, compressed files and launchers...")
+    gcc_patterns = ("gcc-arm-*", "arm-gnu-toolchain*")
+    package_patterns = gcc_patterns + ("arm_none_eabi_*", "run_*.py")
+    package_patterns += (pc.LAUNCHER_FILE_NAME, pc.INDEX_FILE_NAME)
     gcc_files = itertools.chain(
-        PROJECT_ROOT.rglob("gcc-arm-*"),
-        PROJECT_ROOT.rglob("arm-gnu-toolchain*"),
-        PACKAGE_PATH.rglob("arm_none_eabi_*"),
+        cleaner.find_paths(PROJECT_ROOT, gcc_patterns),
+        cleaner.find_paths(PACKAGE_PATH, package_patterns),
     )
-    for file in gcc_files:
-        # Don't delete files or folders in dot directories
-        if file.relative_to(PROJECT_ROOT).parts[0].startswith("."):
-            continue
-        # Delete compressed files
-        if file.is_file() and str(file).endswith((".zip", ".tar.bz2", ".tar.xz")):
-            file.unlink()
-            print(f"\tDeleted file: {file.relative_to(PROJECT_ROOT)}")
-        # Delete folders that start with these names
-        elif file.is_dir():
-            shutil.rmtree(file)
-            print(f"\tDeleted folder: {file.relative_to(PROJECT_ROOT)}")
+    for path in gcc_files:
+        # Delete compressed files, launchers, and folders with these names
+        if path.is_dir() or path.name.endswith((".zip", ".tar.bz2", ".tar.xz", ".py")):
+            delete(path)
 
-    print("\nCleaning done!")
+    # Find all __pycache__ folders and delete them, excluding directories
+    # starting with a dot and the build output folders
+    print("\nFinding __pycache__ folders...")
+    skip_dirs = ("dist", STAGING_ROOT.name, SIMPLE_REPO_DEFAULT_OP_PATH.name)
+    for folder in cleaner.find_paths(
+        PROJECT_ROOT, ("__pycache__",), CLEAN_MAX_DEPTH, skip_dirs
+    ):
+        delete(folder)
+
+    elapsed = time.perf_counter() - start_time
+    print(f"\nCleaning done in {elapsed:.3f}s! (folders deleted in the background)")
 
 
 @app.command()
@@ -113,12 +135,55 @@ def package_creator(
         Optional[str],
         typer.Option(help="Specify CPU architecture (x86_64, arm64, aarch64)"),
     ] = None,
+    jobs: int = typer.Option(
+        1,
+        min=1,
+        help="Number of platforms to build in parallel, each one in its own "
+        "staging directory.",
+    ),
+    cache: bool = typer.Option(
+        True, help="Use the download cache for the toolchain archives."
+    ),
+    stream: bool = typer.Option(
+        False,
+        help="Build the wheels directly from the compressed toolchain files, "
+        "without extracting them.",
+    ),
+    force: bool = typer.Option(
+        False, help="Rebuild all the wheels, even if they are up to date in dist."
+    ),
+    profile: str = typer.Option(
+        DEFAULT_PROFILE,
+        help=f"Toolchain files to package: {', '.join(PROFILES)}.",
+    ),
+    dedup: str = typer.Option(
+        "off",
+        help="'report' prints the duplicated toolchain files, 'bin' also "
+        "packages each duplicated executable once, restored on first use.",
+    ),
+    strip_host_binaries: bool = typer.Option(
+        False,
+        help="Strip the ELF host executables and libraries with the local "
+        "'strip' (or $STRIP), the Arm target files are not modified.",
+    ),
+    compression: str = typer.Option(
+        DEFAULT_POLICY,
+        help=f"Wheel compression policy: {', '.join(POLICIES)}. 'fast' for "
+        "local builds, 'release' for the smallest wheels to publish.",
+    ),
 ):
     """
     Generates and builds the Python package/s with the selected GCC release.
 
     If os and arch are not set it will build all versions of the release.
     Otherwise, it will build the specified os and arch (both must be set).
+
+    Wheels already in the dist folder built from the same toolchain, package
+    templates and package_creator version are not rebuilt.
+
+    Profiles other than 'full' are built as a package of their own, with the
+    profile added to the name, e.g. arm-none-eabi-gcc-toolchain-cortex-m4f,
+    and don't have a source distribution for PyPI.
     """
     print("\n[green]Start building Python package/s[/green]")
 
@@ -132,6 +197,20 @@ def package_creator(
         error_exit("Both --os and --arch must be set if one of them is set.")
     if all and (os or arch):
         error_exit("Cannot use --all with --os or --arch.")
+    if profile not in PROFILES:
+        error_exit(f"Unknown profile '{profile}', options: {', '.join(PROFILES)}")
+    if compression not in POLICIES:
+        error_exit(
+            f"Unknown compression policy '{compression}', "
+            f"options: {', '.join(POLICIES)}"
+        )
+    if dedup not in dedup_tools.DEDUP_MODES:
+        error_exit(f"Unknown dedup mode '{dedup}', options: {dedup_tools.DEDUP_MODES}")
+    if stream and (dedup != "off" or strip_host_binaries):
+        error_exit(
+            "Cannot use --dedup or --strip-host-binaries with --stream, "
+            "they need the extracted files."
+        )
 
     if all:
         os_arch = None
@@ -141,43 +220,130 @@ def package_creator(
         os_arch = (None, None)
 
     selected_gcc_releases = pc.get_gcc_releases(release, os_arch)
+    cache_dir = download_cache.DEFAULT_CACHE_DIR if cache else None
+    dist_folder = PROJECT_ROOT / "dist"
+    release_name = selected_gcc_releases[0].release_name
+
+    # Only build the platforms that are not up to date in the dist folder
+    state = build_state.load_build_state(dist_folder)
+    build_inputs = {}
+    stale_gcc_releases = []
     for gcc_release in selected_gcc_releases:
-        # Perform a clean build for each release
-        clean()
-
-        release_name = f"{gcc_release.release_name} ({gcc_release.os_arch}"
-        print(f"\n[green]Building GCC release: {release_name})[/green]")
-
-        # Get the GCC release and uncompress it in the package directory
-        print("\n[green]Downloading and uncompressing GCC toolchain[/green]")
-        gcc_zip_file = pc.download_toolchain(gcc_release.files["url"])
-        gcc_path = pc.uncompress_toolchain(gcc_zip_file, PACKAGE_PATH)
-
-        # Create the package files with the GCC toolchain folder inside
-        print("\n[green]Creating Python package files[/green]")
-        package_version = pc.generate_package_version(gcc_release.release_name)
-        pc.create_package_files(PACKAGE_ROOT, PACKAGE_PATH, gcc_path, package_version)
-
-        print("\n[green]Building Python wheel[/green]")
-        dist_folder = PROJECT_ROOT / "dist"
-        dist_folder.mkdir(exist_ok=True)
-        wheel_path = pc.build_wheel(
-            PACKAGE_ROOT, dist_folder, gcc_release.files["wheel_plat"]
+        inputs = build_state.get_build_inputs(
+            gcc_release,
+            PACKAGE_ROOT,
+            profile,
+            dedup,
+            strip_host_binaries,
+            compression,
         )
+        wheel_name = build_state.get_expected_wheel_name(gcc_release, profile)
+        build_inputs[gcc_release.os_arch] = inputs
+        if not force and build_state.is_build_up_to_date(
+            state, dist_folder, wheel_name, inputs
+        ):
+            print(f"Up to date ({gcc_release.os_arch}): {wheel_name}")
+            continue
+        build_state.remove_build_outputs(state, dist_folder / wheel_name)
+        stale_gcc_releases.append(gcc_release)
+    build_state.save_build_state(dist_folder, state)
+    wheel_path = dist_folder / build_state.get_expected_wheel_name(
+        selected_gcc_releases[0], profile
+    )
 
-        print("\n[green]Producing metadata files[/green]")
-        metadata_file = wheel_path.with_suffix(f"{wheel_path.suffix}.metadata")
-        metadata_file.write_text(pc.get_package_metadata(PACKAGE_PATH))
-        pc.create_sha256_hash(metadata_file)
-        pc.create_sha256_hash(wheel_path)
-        print("Done.")
+    if not stale_gcc_releases:
+        print(f"\n[green]All {release_name} wheels are up to date[/green]")
+    elif jobs > 1 and len(stale_gcc_releases) > 1:
+        # Each platform is built in its own staging directory and process
+        clean()
+        # The worker processes are forked, so no deletion threads can be running
+        cleaner.wait_for_removals()
+        print(f"\n[green]Building GCC release: {release_name} ({jobs} jobs)[/green]")
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {
+                executor.submit(
+                    pc.build_gcc_release_isolated,
+                    gcc_release,
+                    dist_folder,
+                    cache_dir,
+                    stream,
+                    profile,
+                    dedup,
+                    strip_host_binaries,
+                    compression,
+                ): gcc_release
+                for gcc_release in stale_gcc_releases
+            }
+            for future in as_completed(futures):
+                wheel_path, stats = future.result()
+                os_arch_built = futures[future].os_arch
+                build_state.record_build(
+                    state, wheel_path, build_inputs[os_arch_built], stats
+                )
+                build_state.save_build_state(dist_folder, state)
+                print(f"\n[green]Built {os_arch_built}:[/green] {wheel_path.name}")
+    else:
+        for gcc_release in stale_gcc_releases:
+            # Perform a clean build for each release
+            clean()
+
+            print(
+                f"\n[green]Building GCC release: {release_name} ({gcc_release.os_arch})[/green]"
+            )
+            wheel_path, stats = pc.build_gcc_release(
+                gcc_release,
+                PACKAGE_ROOT,
+                dist_folder,
+                cache_dir=cache_dir,
+                stream=stream,
+                profile=profile,
+                dedup=dedup,
+                strip=strip_host_binaries,
+                compression=compression,
+            )
+            build_state.record_build(
+                state, wheel_path, build_inputs[gcc_release.os_arch], stats
+            )
+            build_state.save_build_state(dist_folder, state)
+            print("Done.")
 
-    print("\n[green]Building source distribution for PyPI[/green]")
     # Only need to build the source distribution once, as it'a single tar file
     # for all the wheels built and it only uses their metadata
-    pc.build_pypi_source_dist(PACKAGE_PYPI_ROOT, dist_folder, wheel_path)
+    # Only the full toolchain package is published to PyPI
+    source_dist_path = dist_folder / pc.get_source_dist_name(wheel_path.name)
+    if profile != DEFAULT_PROFILE:
+        print(f"\nNo source distribution for PyPI with the '{profile}' profile")
+    elif stale_gcc_releases or not source_dist_path.is_file():
+        print("\n[green]Building source distribution for PyPI[/green]")
+        source_dist_sha256 = hashing.get_sha256_file_path(source_dist_path)
+        for source_dist_file in (source_dist_path, source_dist_sha256):
+            if source_dist_file.exists():
+                source_dist_file.unlink()
+        pc.build_pypi_source_dist(PACKAGE_PYPI_ROOT, dist_folder, wheel_path)
+
+    print(f"\n[green]Package {release_name} created![/green]\n")
 
-    print(f"\n[green]Package {release_name}) created![/green]\n")
+
+@app.command()
+def dedup_report(
+    path: Annotated[
+        Path,
+        typer.Argument(exists=True, help="Extracted toolchain folder or archive"),
+    ],
+    top: Annotated[int, typer.Option(help="Number of largest groups to list")] = 10,
+):
+    """
+    Report the byte-identical files in a toolchain and the space they use.
+    """
+    if path.is_dir():
+        groups = dedup_tools.find_duplicates(path)
+        dedup_tools.print_dedup_report(path, groups, top)
+        return
+    STAGING_ROOT.mkdir(exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=STAGING_ROOT) as temp_dir:
+        gcc_path = pc.uncompress_toolchain(path.resolve(), Path(temp_dir))
+        groups = dedup_tools.find_duplicates(gcc_path)
+        dedup_tools.print_dedup_report(gcc_path, groups, top)
 
 
 @app.command()
@@ -225,20 +391,216 @@ def package_gcc_versions():
     # print('["13.3.Rel1", "13.2.Rel1", "12.3.Rel1", "9-2019-q4"]')
 
 
+@app.command()
+def hash_dist(
+    dist: Annotated[Path, typer.Argument()] = PROJECT_ROOT / "dist",
+    jobs: Annotated[
+        Optional[int],
+        typer.Option(min=1, help="Files to hash in parallel (default: CPU count)."),
+    ] = None,
+    overwrite: bool = typer.Option(
+        False, help="Recreate the SHA-256 files that already exist."
+    ),
+):
+    """
+    Create the SHA-256 files for all the files in the dist folder that don't
+    have one, e.g. for artifacts built elsewhere.
+    """
+    sha256_files = hashing.hash_dist_folder(dist, jobs, overwrite)
+    for sha256_file in sha256_files:
+        print(f"\tCreated: {sha256_file.name}")
+    print(f"Created {len(sha256_files)} SHA-256 files in: {dist}")
+
+
+@cache_app.command("list")
+def cache_list(
+    cache_dir: Annotated[Path, typer.Option()] = download_cache.DEFAULT_CACHE_DIR,
+):
+    """
+    List the toolchain archives in the download cache, most recently used last.
+    """
+    print(f"Download cache directory: {cache_dir}")
+    entries = download_cache.get_cache_entries(cache_dir)
+    for entry in entries:
+        print(f"\t{entry.size / 1024 / 1024:8.1f} MB  {entry.path.name}")
+    total_size = sum(entry.size for entry in entries)
+    print(f"{len(entries)} archives, {total_size / 1024 / 1024:.1f} MB in total.")
+
+
+@cache_app.command("prune")
+def cache_prune(
+    max_size: Annotated[
+        int, typer.Option(help="Maximum cache size in MB, 0 to empty it.")
+    ] = CACHE_DEFAULT_MAX_SIZE_MB,
+    cache_dir: Annotated[Path, typer.Option()] = download_cache.DEFAULT_CACHE_DIR,
+):
+    """
+    Evict the least recently used toolchain archives above the maximum size.
+    """
+    evicted = download_cache.prune_cache(cache_dir, max_size * 1024 * 1024)
+    for entry in evicted:
+        print(f"\tEvicted: {entry.path.name}")
+    print(f"Evicted {len(evicted)} archives from: {cache_dir}")
+
+
+@cache_app.command("prewarm")
+def cache_prewarm(
+    release: Annotated[str, typer.Argument(help="GCC release name (can be 'latest')")],
+    os: Annotated[
+        Optional[str], typer.Option(help="Specify Operating System (mac/win/linux)")
+    ] = None,
+    arch: Annotated[
+        Optional[str],
+        typer.Option(help="Specify CPU architecture (x86_64, arm64, aarch64)"),
+    ] = None,
+    cache_dir: Annotated[Path, typer.Option()] = download_cache.DEFAULT_CACHE_DIR,
+):
+    """
+    Download the toolchain archives of a release into the cache, all platforms
+    unless --os and --arch are set.
+    """
+    if not (os and arch) and (os or arch):
+        error_exit("Both --os and --arch must be set if one of them is set.")
+    os_arch = (os, arch) if os and arch else None
+    for gcc_release in pc.get_gcc_releases(release, os_arch):
+        url, md5 = gcc_release.files["url"], gcc_release.files["md5"]
+        cached_file = download_cache.get_cached_toolchain(url, md5, cache_dir)
+        if cached_file is not None:
+            print(f"Already cached ({gcc_release.os_arch}): {cached_file.name}")
+            continue
+        pc.download_to_cache(url, md5, cache_dir)
+    download_cache.prune_cache(cache_dir)
+
+
+@benchmark_app.command("launcher")
+def benchmark_launcher(
+    iterations: Annotated[int, typer.Option(min=1)] = 200,
+):
+    """
+    Measure the overhead added by the Python launchers to each invocation of
+    a toolchain executable.
+    """
+    results = benchmarks.benchmark_launcher(iterations)
+    direct_time = results["direct"]
+    print(f"Average time per invocation ({iterations} runs):")
+    for name, run_time in results.items():
+        overhead = run_time - direct_time
+        print(f"\t{name:>16}: {run_time * 1000:7.2f} ms (+{overhead * 1000:.2f} ms)")
+
+
+@benchmark_app.command("decompress")
+def benchmark_decompress(
+    file_path: Annotated[
+        Path, typer.Argument(exists=True, dir_okay=False, help=".tar.xz/.tar.bz2 file")
+    ],
+    backend: Annotated[
+        Optional[List[str]],
+        typer.Option(help="Decompressor to measure, all available by default"),
+    ] = None,
+):
+    """
+    Compare the time to decompress a toolchain archive with each decompressor,
+    e.g. with a file from the download cache (see `cache list`).
+    """
+    results = benchmarks.benchmark_decompression(file_path, backend)
+    slowest_time = max(results.values())
+    print(f"Time to decompress and read: {file_path.name}")
+    for name, run_time in sorted(results.items(), key=lambda item: item[1]):
+        print(f"\t{name:>8}: {run_time:7.2f} s (x{slowest_time / run_time:.2f})")
+
+
+@benchmark_app.command("compress")
+def benchmark_compress(
+    path: Annotated[
+        Path,
+        typer.Argument(exists=True, help="Extracted toolchain folder or archive"),
+    ],
+    policy: Annotated[
+        Optional[List[str]],
+        typer.Option(help="Compression policy to measure, all by default"),
+    ] = None,
+):
+    """
+    Compare the time to build a toolchain wheel against the wheel size with
+    each compression policy.
+    """
+    if policy and not set(policy).issubset(POLICIES):
+        error_exit(f"Unknown compression policy, options: {', '.join(POLICIES)}")
+    STAGING_ROOT.mkdir(exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=STAGING_ROOT) as temp_dir:
+        if path.is_dir():
+            gcc_path = path
+        else:
+            gcc_path = pc.uncompress_toolchain(path.resolve(), Path(temp_dir))
+        results = benchmarks.benchmark_compression(gcc_path, policy)
+    print(f"\nTime to build the wheel and its size: {path.name}")
+    for name, (run_time, size) in results.items():
+        print(f"\t{name:>8}: {run_time:7.2f} s, {size / 1024 / 1024:8.1f} MB")
+
+
 @app.command()
 def repo_generator(
     repo: Annotated[Optional[str], typer.Option()] = SIMPLE_REPO_DEFAULT_GH_REPO,
     output: Annotated[Optional[Path], typer.Option()] = SIMPLE_REPO_DEFAULT_OP_PATH,
     overwrite: bool = True,
+    api_url: Annotated[
+        str, typer.Option(help="GitHub API URL, e.g. a local stand-in to test")
+    ] = GH_API_URL,
+    jobs: Annotated[
+        int,
+        typer.Option(
+            min=1,
+            help="Maximum concurrent HTTP requests, or files hashed with --from-dir",
+        ),
+    ] = DEFAULT_CONCURRENCY,
+    incremental: Annotated[
+        bool,
+        typer.Option(
+            help="Only crawl the new or modified releases (with a local release "
+            "cache) and update the changed pages in the output folder."
+        ),
+    ] = True,
+    dist: Annotated[
+        Optional[List[Path]],
+        typer.Option(
+            help="Folder with local copies of the wheels, to hash the wheels "
+            "without a SHA-256 file instead of downloading them (default: dist)."
+        ),
+    ] = None,
+    from_dir: Annotated[
+        Optional[Path],
+        typer.Option(
+            help="Generate it from a local folder of wheels instead of the GH "
+            "Releases, without any network requests (needs --base-url)."
+        ),
+    ] = None,
+    base_url: Annotated[
+        Optional[str],
+        typer.Option(help="URL the files in the --from-dir folder are served from."),
+    ] = None,
+    write_sha256: bool = typer.Option(
+        False, help="Create the missing SHA-256 files in the --from-dir folder."
+    ),
 ):
     """
-    Generate a simple repository from wheels found in a GH repository Releases.
+    Generate a simple repository from wheels found in a GH repository Releases,
+    or in a local folder with --from-dir.
 
     :param repo: The GitHub repository to generate the repository from.
-    :param overwrite: Overwrite the output folder if it exists.
+    :param overwrite: Overwrite the output folder if it exists, if not
+        incremental.
     """
-    print(f"Generating simple repository from GH Releases in: {repo}")
-    if overwrite:
+    if (from_dir is None) != (base_url is None):
+        error_exit("The --from-dir and --base-url options must be used together.")
+    if from_dir:
+        print(f"Generating simple repository from the wheels in: {from_dir}")
+    else:
+        print(f"Generating simple repository from GH Releases in: {repo}")
+    if incremental:
+        # The pages are updated in place
+        if output.exists() and not output.is_dir():
+            raise NotADirectoryError(f"Output path '{output}' is not a directory.")
+    elif overwrite:
         if output.exists():
             if not output.is_dir():
                 raise NotADirectoryError(f"Output path '{output}' is not a directory.")
@@ -248,7 +610,21 @@ def repo_generator(
             f"Output path {output} already exists, delete it or use --overwrite."
         )
     print(f"Output path: {output.relative_to(Path.cwd())}")
-    generate_simple_repository(repo, output)
+    if from_dir and base_url:
+        generate_simple_repository_from_dir(
+            from_dir, base_url, output, jobs, write_sha256
+        )
+        return
+    cache_dir = release_cache.DEFAULT_CACHE_DIR if incremental else None
+    generate_simple_repository(
+        repo,
+        output,
+        api_url,
+        jobs,
+        cache_dir,
+        release_cache.DEFAULT_CACHE_DIR,
+        dist or [PROJECT_ROOT / "dist"],
+    )
 
 
 def main():
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+import os
+import sys
+import time
+import shutil
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from tools_src.wheel_writer import WheelWriter
+from tools_src.compression_policies import POLICIES
+from tools_src.decompressors import get_decompressors, open_tar_stream
+from tools_src.package_creator import (
+    PACKAGE_NAME,
+    PACKAGE_PATH,
+    LAUNCHER_FILE_NAME,
+    generate_launcher_files,
+)
+
+# The launcher module per executable used before, as the baseline
+SUBPROCESS_LAUNCHER_TEMPLATE = """\
+import os
+import sys
+import subprocess
+
+
+def {func_name}():
+    argv = [
+        os.path.join(
+            os.path.abspath(os.path.dirname(__file__)),
+            "{gcc_folder}",
+            "bin",
+            "{bin}"
+        ),
+        *sys.argv[1:]
+    ]
+    exit_code = subprocess.call(argv)
+    sys.exit(exit_code)
+"""
+# Same as the script pip creates for each [project.scripts] entry
+CONSOLE_SCRIPT_TEMPLATE = """\
+import sys
+sys.path.insert(0, {path!r})
+from {package}.{module} import {func_name}
+sys.exit({func_name}())
+"""
+WARMUP_RUNS = 5
+
+
+def time_command(command: List[str], iterations: int) -> float:
+    """
+    Measure the average wall time to run a command to completion.
+
+    :param command: The command and its arguments.
+    :param iterations: Number of times to run it.
+    :return: Average time in seconds per run.
+    """
+    for _ in range(WARMUP_RUNS):
+        subprocess.run(command, check=True)
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        subprocess.run(command, check=True)
+    return (time.perf_counter() - start_time) / iterations
+
+
+def benchmark_launcher(iterations: int = 200) -> Dict[str, float]:
+    """
+    Measure the per-invocation time of the executable launchers, with a
+    no-op executable so only the launcher overhead is measured.
+
+    Runs the executable directly, through the subprocess.call() launcher
+    used before, and through the current launcher module.
+
+    :param iterations: Number of invocations to average.
+    :return: Dictionary of launcher name to average seconds per invocation.
+    """
+    true_bin = shutil.which("true")
+    if true_bin is None:
+        raise FileNotFoundError("The 'true' executable is needed to benchmark")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # Same package name, as the launcher imports the index from it
+        package_path = Path(temp_dir) / PACKAGE_NAME
+        bin_path = package_path / "gcc" / "bin" / "arm-none-eabi-true"
+        bin_path.parent.mkdir(parents=True)
+        shutil.copy2(true_bin, bin_path)
+        shutil.copy2(PACKAGE_PATH / "__init__.py", package_path / "__init__.py")
+
+        func_name = "run_true"
+        (package_path / f"{func_name}.py").write_text(
+            SUBPROCESS_LAUNCHER_TEMPLATE.format(
+                func_name=func_name, gcc_folder="gcc", bin=bin_path.name
+            )
+        )
+        launcher_files = generate_launcher_files(
+            PACKAGE_PATH, Path("gcc"), [(bin_path.name, func_name)]
+        )
+        for file_name, launcher_code in launcher_files.items():
+            (package_path / file_name).write_text(launcher_code)
+
+        commands = {"direct": [str(bin_path)]}
+        launcher_modules = {
+            "subprocess.call": func_name,
+            "current": Path(LAUNCHER_FILE_NAME).stem,
+        }
+        for name, module in launcher_modules.items():
+            script_path = Path(temp_dir) / f"{module}_script.py"
+            script_path.write_text(
+                CONSOLE_SCRIPT_TEMPLATE.format(
+                    path=temp_dir,
+                    package=PACKAGE_NAME,
+                    module=module,
+                    func_name=func_name,
+                )
+            )
+            commands[name] = [sys.executable, str(script_path)]
+
+        return {
+            name: time_command(command, iterations)
+            for name, command in commands.items()
+        }
+
+
+def read_tar_stream(file_path: Path, backend: str) -> int:
+    """
+    Decompress a tar file and read all its members data, without writing it.
+
+    :param file_path: Path to the compressed tar file.
+    :param backend: Decompressor backend name.
+    :return: Total size in bytes of the files in the archive.
+    """
+    total_size = 0
+    with open_tar_stream(file_path, backend) as tar_ref:
+        for member in tar_ref:
+            if member.isfile():
+                fileobj = tar_ref.extractfile(member)
+                assert fileobj is not None
+                while True:
+                    chunk = fileobj.read(1024 * 1024)
+                    if not chunk:
+                        break
+                    total_size += len(chunk)
+    return total_size
+
+
+def benchmark_decompression(
+    file_path: Path, backends: Optional[List[str]] = None
+) -> Dict[str, float]:
+    """
+    Measure the time to decompress and read a tar toolchain archive with each
+    of the decompressor backends available in this machine.
+
+    :param file_path: Path to the .tar.xz or .tar.bz2 file.
+    :param backends: Backend names to compare, defaults to all available.
+    :return: Dictionary of backend name to seconds to read the archive.
+    """
+    results = {}
+    expected_size = None
+    for backend in backends or list(get_decompressors(file_path)):
+        start_time = time.perf_counter()
+        total_size = read_tar_stream(file_path, backend)
+        results[backend] = time.perf_counter() - start_time
+        if expected_size is None:
+            expected_size = total_size
+        elif total_size != expected_size:
+            raise ValueError(
+                f"Backend '{backend}' read {total_size} bytes, expected {expected_size}"
+            )
+    return results
+
+
+def write_folder_wheel(folder: Path, wheel_path: Path, compression: str) -> None:
+    """
+    Write all the files in a folder into a wheel, the same way build_wheel()
+    writes the toolchain folder.
+
+    :param folder: Path to the folder to package, e.g. an extracted toolchain.
+    :param wheel_path: Path to the wheel file to create.
+    :param compression: Compression policy name.
+    """
+    with WheelWriter(
+        wheel_path, "benchmark", "0.0.0", "py3-none-any", compression
+    ) as wheel:
+        for root, dirs, files in os.walk(folder, followlinks=True):
+            dirs.sort()
+            for file in sorted(files):
+                file_path = Path(root) / file
+                arcname = file_path.relative_to(folder.parent).as_posix()
+                wheel.add_file(arcname, file_path)
+
+
+def benchmark_compression(
+    folder: Path, policies: Optional[List[str]] = None
+) -> Dict[str, Tuple[float, int]]:
+    """
+    Measure the time to write a toolchain folder into a wheel, and the size of
+    the wheel, with each compression policy.
+
+    :param folder: Path to the extracted toolchain folder.
+    :param policies: Compression policy names to compare, defaults to all.
+    :return: Dictionary of policy name to seconds to build and wheel size.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for policy in policies or list(POLICIES):
+            wheel_path = Path(temp_dir) / f"{policy}.whl"
+            start_time = time.perf_counter()
+            write_folder_wheel(folder, wheel_path, policy)
+            results[policy] = (
+                time.perf_counter() - start_time,
+                wheel_path.stat().st_size,
+            )
+            wheel_path.unlink()
+    return results
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+import os
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from tools_src.compression_policies import DEFAULT_POLICY
+from tools_src.extraction_profiles import DEFAULT_PROFILE
+from tools_src.hashing import get_sha256_file_path, sha256_file_hash
+from tools_src.package_creator import (
+    GccInfo,
+    PACKAGE_CREATOR_VERSION,
+    PACKAGE_NAME,
+    generate_package_version,
+    get_wheel_file_name,
+    is_template_file,
+)
+
+# Saved in the dist folder, as a dot file so it's not treated as an artifact
+BUILD_STATE_FILE = ".build-state.json"
+
+
+def get_template_hashes(package_root: Path) -> Dict[str, str]:
+    """
+    Hash the package template files that end up in the wheel, which are all
+    the project and package files that are not generated by a build.
+
+    :param package_root: Path to the package project directory.
+    :return: Dictionary of template file path (relative to the project
+        directory) to its SHA-256 hash.
+    """
+    package_path = package_root / "src" / PACKAGE_NAME
+    template_files = [
+        file
+        for folder in (package_root, package_path)
+        for file in sorted(folder.iterdir())
+        if file.is_file() and is_template_file(file.name)
+    ]
+    return {
+        file.relative_to(package_root).as_posix(): sha256_file_hash(file)
+        for file in template_files
+    }
+
+
+def get_build_inputs(
+    gcc_release: GccInfo,
+    package_root: Path,
+    profile: str = DEFAULT_PROFILE,
+    dedup: str = "off",
+    strip: bool = False,
+    compression: str = DEFAULT_POLICY,
+) -> dict:
+    """
+    Collect everything the wheel of a GCC release platform is built from.
+    If any of it changes the wheel has to be rebuilt.
+
+    :param gcc_release: GCC release info for a single OS/arch.
+    :param package_root: Path to the package project directory.
+    :param profile: Extraction profile name.
+    :param dedup: Deduplication mode.
+    :param strip: If the host binaries are stripped.
+    :param compression: Wheel compression policy name.
+    :return: Dictionary with the build inputs, JSON serialisable.
+    """
+    return {
+        "release_name": gcc_release.release_name,
+        "os_arch": gcc_release.os_arch,
+        "url": gcc_release.files["url"],
+        "md5": gcc_release.files["md5"].lower(),
+        "wheel_plat": gcc_release.files["wheel_plat"],
+        "package_creator_version": PACKAGE_CREATOR_VERSION,
+        "profile": profile,
+        "dedup": dedup,
+        "strip_host_binaries": strip,
+        "compression": compression,
+        "templates": get_template_hashes(package_root),
+    }
+
+
+def get_expected_wheel_name(
+    gcc_release: GccInfo, profile: str = DEFAULT_PROFILE
+) -> str:
+    """File name of the wheel built for a GCC release platform and profile."""
+    package_version = generate_package_version(gcc_release.release_name)
+    return get_wheel_file_name(
+        package_version, gcc_release.files["wheel_plat"], profile
+    )
+
+
+def get_build_outputs(wheel_path: Path) -> List[Path]:
+    """
+    :param wheel_path: Path to a wheel in the dist folder.
+    :return: Paths to the wheel and all the files created with it.
+    """
+    metadata_path = wheel_path.with_suffix(f"{wheel_path.suffix}.metadata")
+    return [
+        wheel_path,
+        get_sha256_file_path(wheel_path),
+        metadata_path,
+        get_sha256_file_path(metadata_path),
+    ]
+
+
+def load_build_state(dist_path: Path) -> Dict[str, dict]:
+    """
+    Load the build-state manifest from the dist folder.
+
+    :param dist_path: Path to the dist folder.
+    :return: Dictionary of wheel file name to its build info, empty if the
+        manifest doesn't exist or can't be read.
+    """
+    state_file = dist_path / BUILD_STATE_FILE
+    try:
+        return json.loads(state_file.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_build_state(dist_path: Path, state: Dict[str, dict]) -> None:
+    """
+    Save the build-state manifest in the dist folder, replacing it atomically
+    so an interrupted build never leaves a corrupted manifest.
+
+    :param dist_path: Path to the dist folder.
+    :param state: Dictionary of wheel file name to its build info.
+    """
+    dist_path.mkdir(exist_ok=True)
+    state_file = dist_path / BUILD_STATE_FILE
+    tmp_file = state_file.with_name(f"{state_file.name}.{os.getpid()}.tmp")
+    tmp_file.write_text(json.dumps(state, indent=2, sort_keys=True) + "\n")
+    tmp_file.replace(state_file)
+
+
+def is_build_up_to_date(
+    state: Dict[str, dict], dist_path: Path, wheel_name: str, inputs: dict
+) -> bool:
+    """
+    Check if a wheel in the dist folder was built from the same inputs, and
+    that it and its files are still there and unmodified.
+
+    :param state: The build-state manifest.
+    :param dist_path: Path to the dist folder.
+    :param wheel_name: File name of the wheel.
+    :param inputs: The current build inputs from get_build_inputs().
+    :return: True if the wheel doesn't need to be rebuilt.
+    """
+    build_info = state.get(wheel_name)
+    if build_info is None or build_info["inputs"] != inputs:
+        return False
+    wheel_path = dist_path / wheel_name
+    if not all(output.is_file() for output in get_build_outputs(wheel_path)):
+        return False
+    # A cheap check that the wheel hasn't been replaced, without hashing it
+    sha256_file_contents = get_sha256_file_path(wheel_path).read_text().split()
+    return (
+        wheel_path.stat().st_size == build_info["size"]
+        and sha256_file_contents[0] == build_info["sha256"]
+    )
+
+
+def record_build(
+    state: Dict[str, dict],
+    wheel_path: Path,
+    inputs: dict,
+    stats: Optional[dict] = None,
+) -> None:
+    """
+    Add a freshly built wheel to the build-state manifest.
+
+    :param state: The build-state manifest to update.
+    :param wheel_path: Path to the built wheel.
+    :param inputs: The build inputs from get_build_inputs().
+    :param stats: Information about the build to keep with it.
+    """
+    sha256_file_contents = get_sha256_file_path(wheel_path).read_text().split()
+    state[wheel_path.name] = {
+        "inputs": inputs,
+        "size": wheel_path.stat().st_size,
+        "sha256": sha256_file_contents[0],
+        "stats": stats or {},
+    }
+
+
+def remove_build_outputs(state: Dict[str, dict], wheel_path: Path) -> None:
+    """
+    Delete a stale wheel and its files, and its build-state manifest entry.
+
+    :param state: The build-state manifest to update.
+    :param wheel_path: Path to the wheel in the dist folder.
+    """
+    for output in get_build_outputs(wheel_path):
+        if output.exists():
+            output.unlink()
+            print(f"\tDeleted stale file: {output.name}")
+    state.pop(wheel_path.name, None)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+import os
+import uuid
+import shutil
+import fnmatch
+from pathlib import Path
+from typing import Iterable, List, Optional, Set
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+# Folders are moved in here to be deleted in the background, it needs to be
+# in the same file system as the folders, so it's inside the project folder
+TRASH_DIR_NAME = ".clean-trash"
+REMOVAL_WORKERS = 4
+
+# Only created with the first background deletion, so importing this module
+# doesn't start any threads
+_removal_executor: Optional[ThreadPoolExecutor] = None
+_removals: List[Future] = []
+_removing: Set[Path] = set()
+
+
+def find_paths(
+    root: Path,
+    patterns: Iterable[str],
+    max_depth: int = 1,
+    skip_dirs: Iterable[str] = (),
+) -> List[Path]:
+    """
+    Find the files and folders matching the name patterns, only looking up
+    to max_depth levels deep, instead of walking the whole tree.
+    Matched folders, dot folders and skipped folders are not looked into.
+
+    :param root: Path to the folder to search.
+    :param patterns: fnmatch patterns for the file or folder names.
+    :param max_depth: Folder levels to search, 1 is only the root contents.
+    :param skip_dirs: Names of folders not to search.
+    :return: List of the matching paths.
+    """
+    patterns = tuple(patterns)
+    skip_dirs = set(skip_dirs)
+    found = []  # type: List[Path]
+    try:
+        entries = list(os.scandir(root))
+    except FileNotFoundError:
+        return found
+    for entry in entries:
+        if entry.name.startswith("."):
+            continue
+        if any(fnmatch.fnmatch(entry.name, pattern) for pattern in patterns):
+            found.append(Path(entry.path))
+        elif (
+            max_depth > 1
+            and entry.name not in skip_dirs
+            and entry.is_dir(follow_symlinks=False)
+        ):
+            found += find_paths(Path(entry.path), patterns, max_depth - 1, skip_dirs)
+    return found
+
+
+def remove_path(path: Path, trash_root: Path, background: bool = True) -> None:
+    """
+    Delete a file or folder. Folders are moved into the trash folder and
+    deleted in a background thread, so large trees like an extracted toolchain
+    don't block the caller, and multiple trees are deleted in parallel.
+
+    :param path: Path to the file or folder to delete.
+    :param trash_root: Folder to create the trash folder in, in the same file
+        system as the path.
+    :param background: Delete folders in the background.
+    """
+    if path.is_symlink() or not path.is_dir():
+        path.unlink()
+        return
+    if not background:
+        shutil.rmtree(path)
+        return
+    trash_dir = trash_root / TRASH_DIR_NAME
+    trash_dir.mkdir(exist_ok=True)
+    trash_path = trash_dir / f"{path.name}-{uuid.uuid4().hex}"
+    try:
+        path.rename(trash_path)
+    except OSError:
+        # E.g. in a different file system, delete it in place instead
+        trash_path = path
+    _remove_in_background(trash_path)
+
+
+def _remove_in_background(path: Path) -> None:
+    global _removal_executor
+    if _removal_executor is None:
+        _removal_executor = ThreadPoolExecutor(max_workers=REMOVAL_WORKERS)
+    if path not in _removing:
+        _removing.add(path)
+        _removals.append(
+            _removal_executor.submit(shutil.rmtree, path, ignore_errors=True)
+        )
+
+
+def empty_trash(trash_root: Path) -> None:
+    """
+    Delete in the background anything left in the trash folder, e.g. from a
+    previous run that was interrupted.
+
+    :param trash_root: Folder containing the trash folder.
+    """
+    trash_dir = trash_root / TRASH_DIR_NAME
+    if trash_dir.is_dir():
+        for item in trash_dir.iterdir():
+            _remove_in_background(item)
+
+
+def wait_for_removals() -> None:
+    """
+    Block until all the background deletions have finished, e.g. before
+    forking worker processes, which is not safe with threads running.
+    """
+    wait(_removals)
+    _removals.clear()
+    _removing.clear()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+import zipfile
+from collections import namedtuple
+from typing import Optional, Tuple
+
+# NamedTuple with the deflate levels used for the files written into a wheel,
+# "level" for most files and "binary_level" for the executables, libraries
+# and objects, and if the already compressed files are stored uncompressed
+CompressionPolicy = namedtuple(
+    "CompressionPolicy", ["name", "description", "level", "binary_level", "store"]
+)
+
+DEFAULT_POLICY = "default"
+# The same level zlib uses by default
+DEFAULT_LEVEL = 6
+# Host executables have no suffix on Linux/macOS, so they are found by mode
+BINARY_SUFFIXES = (".a", ".o", ".so", ".dll", ".dylib", ".exe", ".lib", ".obj")
+# Files deflate can't reduce, it only spends time on them
+INCOMPRESSIBLE_SUFFIXES = (
+    ".gz",
+    ".tgz",
+    ".bz2",
+    ".xz",
+    ".lzma",
+    ".zst",
+    ".zip",
+    ".whl",
+    ".jar",
+    ".7z",
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".gif",
+)
+
+POLICIES = {
+    policy.name: policy
+    for policy in (
+        CompressionPolicy(
+            "default",
+            "Deflate level 6 for all files",
+            DEFAULT_LEVEL,
+            DEFAULT_LEVEL,
+            False,
+        ),
+        CompressionPolicy(
+            "fast",
+            "Deflate level 1, compressed files stored, for local builds",
+            1,
+            1,
+            True,
+        ),
+        CompressionPolicy(
+            "release",
+            "Deflate level 9 for the binaries, compressed files stored",
+            DEFAULT_LEVEL,
+            9,
+            True,
+        ),
+    )
+}
+
+
+def get_policy(name: str) -> CompressionPolicy:
+    if name not in POLICIES:
+        raise ValueError(
+            f"Unknown compression policy '{name}', options: {', '.join(POLICIES)}"
+        )
+    return POLICIES[name]
+
+
+def is_binary(arcname: str, mode: int) -> bool:
+    """
+    :param arcname: Path of the file inside the wheel.
+    :param mode: File permission bits.
+    :return: True for executables, libraries and object files.
+    """
+    name = arcname.rsplit("/", 1)[-1].lower()
+    if name.endswith(BINARY_SUFFIXES) or ".so." in name:
+        return True
+    return not name.endswith(".py") and bool(mode & 0o111)
+
+
+def get_compression(
+    policy: CompressionPolicy, arcname: str, mode: int
+) -> Tuple[int, Optional[int]]:
+    """
+    :param policy: The compression policy.
+    :param arcname: Path of the file inside the wheel.
+    :param mode: File permission bits.
+    :return: The zip compression type and level to write the file with.
+    """
+    if policy.store and arcname.lower().endswith(INCOMPRESSIBLE_SUFFIXES):
+        return zipfile.ZIP_STORED, None
+    if is_binary(arcname, mode):
+        return zipfile.ZIP_DEFLATED, policy.binary_level
+    return zipfile.ZIP_DEFLATED, policy.level
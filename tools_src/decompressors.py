@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+import shutil
+import tarfile
+import subprocess
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Backend name for the Python tarfile built-in decompression
+STDLIB_BACKEND = "stdlib"
+# External multi-threaded decompressors, in order of preference, writing the
+# uncompressed tar stream to stdout to be read through a pipe
+PARALLEL_DECOMPRESSORS = {
+    ".tar.xz": (("xz", ("-d", "-c", "-T0")),),
+    ".tar.bz2": (("lbzip2", ("-d", "-c")), ("pbzip2", ("-d", "-c"))),
+}
+PIPE_BUFFER_SIZE = 1024 * 1024
+
+
+def get_tar_extension(file_path: Path) -> Optional[str]:
+    """:return: The compressed tar extension of the file, or None."""
+    for extension in PARALLEL_DECOMPRESSORS:
+        if str(file_path).endswith(extension):
+            return extension
+    return None
+
+
+def get_decompressors(file_path: Path) -> Dict[str, Optional[List[str]]]:
+    """
+    Find the decompressors available in this machine for a tar file.
+
+    :param file_path: Path to the compressed tar file.
+    :return: Dictionary of backend name to its command line to decompress
+        the file (None for the stdlib), in order of preference.
+    """
+    decompressors = {}  # type: Dict[str, Optional[List[str]]]
+    extension = get_tar_extension(file_path)
+    if extension is None:
+        raise ValueError(f"Unsupported file extension: {file_path}")
+    for name, args in PARALLEL_DECOMPRESSORS[extension]:
+        executable = shutil.which(name)
+        if executable:
+            decompressors[name] = [executable, *args, str(file_path)]
+    decompressors[STDLIB_BACKEND] = None
+    return decompressors
+
+
+def select_decompressor(
+    file_path: Path, backend: str = "auto"
+) -> Tuple[str, Optional[List[str]]]:
+    """
+    :param file_path: Path to the compressed tar file.
+    :param backend: "auto" for the fastest available, or a backend name.
+    :return: The backend name and its command line (None for the stdlib).
+    """
+    decompressors = get_decompressors(file_path)
+    if backend == "auto":
+        backend = next(iter(decompressors))
+    if backend not in decompressors:
+        raise ValueError(
+            f"Decompressor '{backend}' not available for {file_path.name}, "
+            f"options: {', '.join(decompressors)}"
+        )
+    return backend, decompressors[backend]
+
+
+@contextmanager
+def open_tar_stream(
+    file_path: Path, backend: str = "auto"
+) -> Iterator[tarfile.TarFile]:
+    """
+    Open a compressed tar file to read its members sequentially ("r|" mode),
+    decompressed by an external multi-threaded decompressor if available,
+    or by the Python tarfile module otherwise.
+
+    :param file_path: Path to the .tar.xz or .tar.bz2 file.
+    :param backend: "auto" for the fastest available, or a backend name.
+    :return: Context manager with the tarfile in stream mode.
+    """
+    backend, command = select_decompressor(file_path, backend)
+    if command is None:
+        with tarfile.open(file_path, "r|*") as tar_ref:
+            yield tar_ref
+        return
+
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        bufsize=PIPE_BUFFER_SIZE,
+    )
+    assert process.stdout is not None and process.stderr is not None
+    try:
+        with tarfile.open(fileobj=process.stdout, mode="r|") as tar_ref:
+            yield tar_ref
+        # Read the padding after the end of the archive, otherwise the
+        # decompressor could fail writing to a closed pipe
+        while process.stdout.read(PIPE_BUFFER_SIZE):
+            pass
+    except BaseException:
+        process.kill()
+        raise
+    finally:
+        process.stdout.close()
+        stderr = process.stderr.read()
+        process.stderr.close()
+        return_code = process.wait()
+    if return_code != 0:
+        raise subprocess.CalledProcessError(
+            return_code, command, stderr=stderr.decode(errors="replace")
+        )
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+import os
+from pathlib import Path
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from tools_src.hashing import sha256_file_hash
+
+# NamedTuple with byte-identical files, paths are POSIX and relative to the
+# analysed folder, sorted with the one to keep first
+DuplicateGroup = namedtuple("DuplicateGroup", ["size", "paths"])
+# "report" prints the duplicated files, "bin" also packages the duplicated
+# executables once, to be restored by the package on first use
+DEDUP_MODES = ("off", "report", "bin")
+# Folders to keep the executables in, before any other copy of them
+PREFERRED_FOLDERS = ("bin/",)
+# Shared libraries can have the executable permission too
+LIBRARY_SUFFIXES = (".so", ".dll", ".dylib", ".pyd")
+
+
+def _sort_key(path: str) -> tuple:
+    return (not path.startswith(PREFERRED_FOLDERS), path.count("/"), len(path), path)
+
+
+def find_duplicates(folder: Path, jobs: Optional[int] = None) -> List[DuplicateGroup]:
+    """
+    Find the byte-identical files in a folder, hashing in parallel only the
+    files with the same size as another file. Symlinks and empty files are
+    ignored.
+
+    :param folder: Path to the folder to analyse, e.g. the extracted toolchain.
+    :param jobs: Number of hashing threads, defaults to the number of CPUs.
+    :return: List of duplicate groups, the largest savings first.
+    """
+    files_by_size = defaultdict(list)  # type: Dict[int, List[Path]]
+    for root, _, files in os.walk(folder):
+        for file_name in files:
+            file_path = Path(root) / file_name
+            if file_path.is_symlink():
+                continue
+            size = file_path.stat().st_size
+            if size:
+                files_by_size[size].append(file_path)
+
+    candidates = [
+        (size, file_path)
+        for size, file_paths in files_by_size.items()
+        if len(file_paths) > 1
+        for file_path in file_paths
+    ]
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+        hashes = executor.map(sha256_file_hash, (path for _, path in candidates))
+        files_by_hash = defaultdict(list)  # type: Dict[tuple, List[str]]
+        for (size, file_path), file_hash in zip(candidates, hashes):
+            relative_path = file_path.relative_to(folder).as_posix()
+            files_by_hash[(size, file_hash)].append(relative_path)
+
+    groups = [
+        DuplicateGroup(size, sorted(paths, key=_sort_key))
+        for (size, _), paths in files_by_hash.items()
+        if len(paths) > 1
+    ]
+    return sorted(groups, key=lambda group: group.size * len(group.paths), reverse=True)
+
+
+def get_saved_size(groups: List[DuplicateGroup]) -> int:
+    """:return: Bytes saved by keeping a single copy of each duplicated file."""
+    return sum(group.size * (len(group.paths) - 1) for group in groups)
+
+
+def print_dedup_report(folder: Path, groups: List[DuplicateGroup], top: int = 10):
+    """Print a summary of the duplicated files and the largest groups."""
+    total_size = sum(
+        file_path.stat().st_size
+        for file_path in folder.rglob("*")
+        if file_path.is_file() and not file_path.is_symlink()
+    )
+    saved_size = get_saved_size(groups)
+    duplicate_files = sum(len(group.paths) - 1 for group in groups)
+    print(f"\nDuplicated files in: {folder.name}")
+    print(f"\t{len(groups)} groups, {duplicate_files} files could be removed")
+    print(
+        f"\t{saved_size / 1024 / 1024:.1f} MB of {total_size / 1024 / 1024:.1f} MB "
+        f"could be saved ({100 * saved_size / max(total_size, 1):.1f}%)"
+    )
+    for group in groups[:top]:
+        print(f"\t- {group.size / 1024:.0f} KB x{len(group.paths)}: {group.paths[0]}")
+        for path in group.paths[1:]:
+            print(f"\t\t{path}")
+
+
+def is_executable(file_path: Path) -> bool:
+    """Check a file is an executable, including Windows ones on any host."""
+    if file_path.name.endswith(".exe"):
+        return True
+    is_library = file_path.suffix in LIBRARY_SUFFIXES or ".so." in file_path.name
+    return not is_library and os.access(file_path, os.X_OK)
+
+
+def get_executable_duplicates(
+    folder: Path, groups: List[DuplicateGroup]
+) -> Dict[str, str]:
+    """
+    :param folder: Path to the analysed folder.
+    :param groups: Duplicate groups found in the folder.
+    :return: Dictionary of each duplicated executable path to the path of the
+        copy to keep, only for the groups where all the files are executables.
+    """
+    duplicates = {}
+    for group in groups:
+        if all(is_executable(folder / path) for path in group.paths):
+            for path in group.paths[1:]:
+                duplicates[path] = group.paths[0]
+    return duplicates
+
+
+def remove_duplicates(folder: Path, duplicates: Dict[str, str]) -> int:
+    """
+    Delete the duplicated files, leaving the copy to keep of each one.
+
+    :param folder: Path to the folder the duplicate paths are relative to.
+    :param duplicates: Dictionary of duplicated path to the path to keep.
+    :return: Total size of the deleted files.
+    """
+    removed_size = 0
+    for path in duplicates:
+        file_path = folder / path
+        removed_size += file_path.stat().st_size
+        file_path.unlink()
+    return removed_size
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+import os
+import json
+import time
+import shutil
+import hashlib
+from pathlib import Path
+from typing import Iterator, List, Optional
+from contextlib import contextmanager
+from collections import namedtuple
+
+# The cache directory can be moved with this environmental variable (e.g. to a
+# folder persisted between CI runs), by default it is in the user cache folder
+CACHE_DIR_ENV_VAR = "ARM_GCC_PACKAGE_CACHE_DIR"
+DEFAULT_CACHE_DIR = Path(
+    os.environ.get(
+        CACHE_DIR_ENV_VAR,
+        Path.home() / ".cache" / "arm-none-eabi-gcc-py-package" / "toolchains",
+    )
+)
+# Enough for all the platforms of a few GCC releases
+DEFAULT_CACHE_MAX_SIZE = 10 * 1024 * 1024 * 1024
+# Temporary download folders older than this are leftovers from failed runs,
+# until then an interrupted download can be resumed
+STALE_DOWNLOAD_SECONDS = 24 * 60 * 60
+# A download folder is claimed with a lock file next to it
+LOCK_SUFFIX = ".lock"
+LOCK_POLL_SECONDS = 1
+ENTRY_INFO_FILE = "entry.json"
+
+# NamedTuple with the info of a cached toolchain archive
+CacheEntry = namedtuple(
+    "CacheEntry", ["key", "url", "md5", "path", "size", "last_used"]
+)
+
+
+def cache_key(url: str, md5: str) -> str:
+    """
+    Generate the cache key for a toolchain archive.
+
+    :param url: URL the toolchain archive is downloaded from.
+    :param md5: Expected MD5 hash of the archive (from gcc_releases.py).
+    :return: Hex string key, which is also the entry folder name.
+    """
+    return hashlib.sha256(f"{url}\n{md5.lower()}".encode()).hexdigest()
+
+
+def md5_file_hash(file_path: Path) -> str:
+    """
+    Calculate the MD5 hash of a file.
+
+    :param file_path: Path to the file to hash.
+    :return: Hex string of the MD5 hash.
+    """
+    md5_hash = hashlib.md5()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            md5_hash.update(chunk)
+    return md5_hash.hexdigest()
+
+
+def _read_entry(entry_path: Path) -> Optional[CacheEntry]:
+    info_file = entry_path / ENTRY_INFO_FILE
+    if not info_file.is_file():
+        return None
+    info = json.loads(info_file.read_text())
+    archive_path = entry_path / info["file_name"]
+    if not archive_path.is_file():
+        return None
+    return CacheEntry(
+        key=entry_path.name,
+        url=info["url"],
+        md5=info["md5"],
+        path=archive_path,
+        size=archive_path.stat().st_size,
+        last_used=info_file.stat().st_mtime,
+    )
+
+
+def get_cache_entries(cache_dir: Path = DEFAULT_CACHE_DIR) -> List[CacheEntry]:
+    """
+    Get all the complete entries in the cache, least recently used first.
+
+    :param cache_dir: Path to the cache directory.
+    :return: List of cache entries.
+    """
+    if not cache_dir.is_dir():
+        return []
+    entries = []
+    for entry_path in cache_dir.iterdir():
+        if entry_path.is_dir() and not entry_path.name.startswith("tmp-"):
+            entry = _read_entry(entry_path)
+            if entry is not None:
+                entries.append(entry)
+    return sorted(entries, key=lambda entry: entry.last_used)
+
+
+def get_cached_toolchain(
+    url: str, md5: str, cache_dir: Path = DEFAULT_CACHE_DIR
+) -> Optional[Path]:
+    """
+    Find a toolchain archive in the cache and mark it as recently used.
+
+    :param url: URL the toolchain archive is downloaded from.
+    :param md5: Expected MD5 hash of the archive.
+    :param cache_dir: Path to the cache directory.
+    :return: Path to the cached archive, or None if it is not cached.
+    """
+    entry = _read_entry(cache_dir / cache_key(url, md5))
+    if entry is None:
+        return None
+    os.utime(entry.path.parent / ENTRY_INFO_FILE)
+    return entry.path
+
+
+def _try_lock(lock_path: Path) -> bool:
+    """Create the lock file with this process ID, if it doesn't exist yet."""
+    try:
+        fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return False
+    with os.fdopen(fd, "w") as lock_file:
+        lock_file.write(str(os.getpid()))
+    return True
+
+
+def _is_stale_lock(lock_path: Path) -> bool:
+    """
+    :return: True if the process holding the lock is gone, e.g. it was killed
+        during the download, or if the lock is older than a stale download.
+    """
+    try:
+        pid = int(lock_path.read_text())
+        lock_age = time.time() - lock_path.stat().st_mtime
+    except (OSError, ValueError):
+        # Being created or released right now
+        return False
+    if lock_age > STALE_DOWNLOAD_SECONDS:
+        return True
+    if os.name == "nt":
+        # os.kill() terminates the process on Windows, so only the age is used
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        pass
+    return False
+
+
+@contextmanager
+def claim_download_dir(
+    url: str, md5: str, cache_dir: Path = DEFAULT_CACHE_DIR
+) -> Iterator[Path]:
+    """
+    Claim the temporary directory inside the cache to download a toolchain
+    archive into, before it is added with add_to_cache().
+
+    The directory is the same for every run, so the partial download of an
+    interrupted run is resumed. It's locked while claimed, waiting for any
+    other process downloading the same archive (which might add it to the
+    cache in the meantime, so check the cache again after claiming it).
+
+    :param url: URL the toolchain archive is downloaded from.
+    :param md5: Expected MD5 hash of the archive.
+    :param cache_dir: Path to the cache directory.
+    :return: Context manager with the path to the download directory.
+    """
+    key = cache_key(url, md5)
+    download_dir = cache_dir / f"tmp-{key}"
+    lock_path = cache_dir / f"tmp-{key}{LOCK_SUFFIX}"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    waiting = False
+    while not _try_lock(lock_path):
+        if _is_stale_lock(lock_path):
+            lock_path.unlink(missing_ok=True)
+            continue
+        if not waiting:
+            print(f"Waiting for another process downloading: {url}")
+            waiting = True
+        time.sleep(LOCK_POLL_SECONDS)
+    try:
+        download_dir.mkdir(exist_ok=True)
+        yield download_dir
+    finally:
+        lock_path.unlink(missing_ok=True)
+
+
+def add_to_cache(
+    file_path: Path,
+    url: str,
+    md5: str,
+    cache_dir: Path = DEFAULT_CACHE_DIR,
+    verify: bool = True,
+) -> Path:
+    """
+    Move a downloaded toolchain archive into the cache.
+
+    :param file_path: Path to the downloaded archive, ideally in a directory
+        from claim_download_dir() so it can be moved without a copy.
+    :param url: URL the toolchain archive was downloaded from.
+    :param md5: Expected MD5 hash of the archive.
+    :param cache_dir: Path to the cache directory.
+    :param verify: Check the archive MD5 before adding it to the cache.
+    :return: Path to the archive in the cache.
+    """
+    if verify:
+        file_md5 = md5_file_hash(file_path)
+        if file_md5 != md5.lower():
+            raise ValueError(
+                f"MD5 mismatch for {file_path.name}:\n"
+                f"\tExpected: {md5}\n\tActual:   {file_md5}"
+            )
+    download_dir = file_path.parent
+    in_download_dir = download_dir.name.startswith("tmp-") and (
+        download_dir.parent.resolve() == cache_dir.resolve()
+    )
+    if not in_download_dir:
+        download_dir = cache_dir / f"tmp-{cache_key(url, md5)}-{os.getpid()}"
+        if download_dir.exists():
+            shutil.rmtree(download_dir)
+        download_dir.mkdir(parents=True)
+        shutil.move(str(file_path), str(download_dir / file_path.name))
+    (download_dir / ENTRY_INFO_FILE).write_text(
+        json.dumps({"url": url, "md5": md5.lower(), "file_name": file_path.name})
+    )
+
+    # Renaming the whole folder makes the entry appear atomically, so parallel
+    # builds never see a partial archive
+    entry_path = cache_dir / cache_key(url, md5)
+    try:
+        download_dir.rename(entry_path)
+    except OSError:
+        # Another process added the same archive first
+        shutil.rmtree(download_dir)
+    return entry_path / file_path.name
+
+
+def link_from_cache(cached_file: Path, save_path: Path) -> Path:
+    """
+    Make a cached archive available in the given directory, as a hard link
+    when possible, so that deleting it does not remove it from the cache.
+
+    :param cached_file: Path to the archive in the cache.
+    :param save_path: Directory to place the archive in.
+    :return: Path to the archive in the save directory.
+    """
+    file_path = save_path / cached_file.name
+    if file_path.exists():
+        raise FileExistsError(f"Toolchain file already exists: {file_path}")
+    try:
+        os.link(cached_file, file_path)
+    except OSError:
+        shutil.copy2(cached_file, file_path)
+    return file_path
+
+
+def prune_cache(
+    cache_dir: Path = DEFAULT_CACHE_DIR, max_size: int = DEFAULT_CACHE_MAX_SIZE
+) -> List[CacheEntry]:
+    """
+    Evict the least recently used entries until the cache fits in max_size.
+    Stale temporary download directories are deleted as well.
+
+    :param cache_dir: Path to the cache directory.
+    :param max_size: Maximum size in bytes of all the cached archives.
+    :return: List of evicted entries.
+    """
+    if not cache_dir.is_dir():
+        return []
+    for item in cache_dir.iterdir():
+        if item.is_dir() and item.name.startswith("tmp-"):
+            if (cache_dir / f"{item.name}{LOCK_SUFFIX}").exists():
+                # Being downloaded right now
+                continue
+            # Resuming a download only writes to the files inside
+            last_modified = max(
+                [item.stat().st_mtime] + [f.stat().st_mtime for f in item.iterdir()]
+            )
+            if time.time() - last_modified > STALE_DOWNLOAD_SECONDS:
+                shutil.rmtree(item, ignore_errors=True)
+
+    entries = get_cache_entries(cache_dir)
+    total_size = sum(entry.size for entry in entries)
+    evicted = []
+    for entry in entries:
+        if total_size <= max_size:
+            break
+        shutil.rmtree(entry.path.parent)
+        total_size -= entry.size
+        evicted.append(entry)
+    return evicted
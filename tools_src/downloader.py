@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+import json
+import time
+import hashlib
+from pathlib import Path
+from typing import Deque, Optional, Tuple, TypedDict
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+
+import requests
+from requests.adapters import HTTPAdapter
+from rich.progress import (
+    Progress,
+    BarColumn,
+    DownloadColumn,
+    TransferSpeedColumn,
+    TimeRemainingColumn,
+)
+
+DEFAULT_SEGMENTS = 4
+# Each worker fetches one range at a time, in order, so the file can be
+# written and hashed sequentially with at most (segments * 2) ranges in memory
+DEFAULT_RANGE_SIZE = 8 * 1024 * 1024
+DEFAULT_RETRIES = 3
+READ_CHUNK_SIZE = 1024 * 1024
+PART_SUFFIX = ".part"
+STATE_SUFFIX = ".part.json"
+
+
+class DownloadState(TypedDict):
+    """Progress of a download, saved in the .part.json file to resume it."""
+
+    url: str
+    size: int
+    validator: str
+    committed: int
+
+
+def create_session(pool_size: int = DEFAULT_SEGMENTS) -> requests.Session:
+    """
+    Create a requests session with a connection pool large enough to keep
+    a persistent connection open for each parallel segment.
+
+    :param pool_size: Maximum number of connections per host.
+    :return: The configured requests session.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _get_remote_info(session: requests.Session, url: str) -> Tuple[str, int, bool, str]:
+    """
+    :return: Tuple with the final URL after redirects, the file size (-1 if
+        unknown), whether the server accepts range requests, and a validator
+        (ETag or Last-Modified) to check a partial download is the same file.
+    """
+    response = session.head(url, allow_redirects=True, timeout=30)
+    response.raise_for_status()
+    size = int(response.headers.get("Content-Length", -1))
+    accepts_ranges = response.headers.get("Accept-Ranges", "").lower() == "bytes"
+    validator = response.headers.get("ETag") or response.headers.get(
+        "Last-Modified", ""
+    )
+    return response.url, size, accepts_ranges and size > 0, validator
+
+
+def _fetch_range(session: requests.Session, url: str, start: int, end: int) -> bytes:
+    """Fetch the inclusive byte range [start, end] of the URL, with retries."""
+    for attempt in range(1, DEFAULT_RETRIES + 1):
+        try:
+            response = session.get(
+                url, headers={"Range": f"bytes={start}-{end}"}, timeout=60
+            )
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise ValueError(f"Server ignored range request for: {url}")
+            data = response.content
+            if len(data) != end - start + 1:
+                raise requests.exceptions.ContentDecodingError(
+                    f"Incomplete range {start}-{end}, got {len(data)} bytes"
+                )
+            return data
+        except (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout,
+            requests.exceptions.ContentDecodingError,
+            requests.exceptions.ChunkedEncodingError,
+            requests.exceptions.HTTPError,
+        ) as e:
+            server_error = getattr(e.response, "status_code", 500) >= 500
+            if attempt == DEFAULT_RETRIES or not server_error:
+                raise
+            time.sleep(attempt)
+    raise RuntimeError("Unreachable")
+
+
+def _hash_existing(file_path: Path, hash_obj, length: int) -> None:
+    """Hash the first length bytes of a file, to resume a partial download."""
+    with open(file_path, "rb") as file:
+        while length > 0:
+            chunk = file.read(min(READ_CHUNK_SIZE, length))
+            if not chunk:
+                raise ValueError(f"Partial file shorter than expected: {file_path}")
+            hash_obj.update(chunk)
+            length -= len(chunk)
+
+
+def download_file(
+    url: str,
+    file_path: Path,
+    expected_hash: Optional[str] = None,
+    hash_name: str = "md5",
+    segments: int = DEFAULT_SEGMENTS,
+    range_size: int = DEFAULT_RANGE_SIZE,
+    show_progress: bool = True,
+    session: Optional[requests.Session] = None,
+) -> str:
+    """
+    Download a file, fetching multiple ranges in parallel when the server
+    supports it, and resuming a previous partial download if there is one.
+
+    The data is written to <file_path>.part and hashed in order in the same
+    pass, then renamed to file_path once complete and verified.
+    The download progress is saved in <file_path>.part.json, so an
+    interrupted download can continue from the last written range.
+
+    :param url: URL of the file to download.
+    :param file_path: Path to save the file into.
+    :param expected_hash: Hex digest the file must match, if provided.
+    :param hash_name: hashlib algorithm for the hash, e.g. "md5" or "sha256".
+    :param segments: Number of ranges to download in parallel.
+    :param range_size: Size in bytes of each range request.
+    :param show_progress: Display a progress bar in the terminal.
+    :param session: Requests session to reuse, a new one is created otherwise.
+    :return: Hex digest of the downloaded file.
+    """
+    session = session or create_session(segments)
+    part_path = file_path.with_name(file_path.name + PART_SUFFIX)
+    state_path = file_path.with_name(file_path.name + STATE_SUFFIX)
+    hash_obj = hashlib.new(hash_name)
+
+    final_url, size, accepts_ranges, validator = _get_remote_info(session, url)
+    state = DownloadState(url=url, size=size, validator=validator, committed=0)
+    if accepts_ranges and part_path.is_file() and state_path.is_file():
+        saved_state = json.loads(state_path.read_text())
+        same_file = (saved_state["url"], saved_state["size"]) == (url, size)
+        if same_file and saved_state["validator"] == validator:
+            state["committed"] = int(saved_state["committed"])
+            print(f"Resuming download from {state['committed']} bytes")
+    committed = state["committed"]
+
+    progress = Progress(
+        "[progress.description]{task.description}",
+        BarColumn(),
+        "[progress.percentage]{task.percentage:>3.0f}%",
+        DownloadColumn(),
+        TransferSpeedColumn(),
+        TimeRemainingColumn(),
+        disable=not show_progress,
+    )
+    task_id = progress.add_task(
+        "Downloading...", total=size if size > 0 else None, completed=committed
+    )
+    with progress, open(part_path, "ab" if committed else "wb") as out_file:
+        if committed:
+            out_file.truncate(committed)
+            _hash_existing(part_path, hash_obj, committed)
+
+        if accepts_ranges:
+            ranges = deque(
+                (start, min(start + range_size, size) - 1)
+                for start in range(committed, size, range_size)
+            )
+            in_flight: Deque[Future] = deque()
+            with ThreadPoolExecutor(max_workers=segments) as executor:
+
+                def submit_next():
+                    start, end = ranges.popleft()
+                    in_flight.append(
+                        executor.submit(_fetch_range, session, final_url, start, end)
+                    )
+
+                for _ in range(min(segments * 2, len(ranges))):
+                    submit_next()
+                while in_flight:
+                    # Ranges are consumed in order, so the hash can be updated
+                    # from memory while the next ranges are still downloading
+                    data = in_flight.popleft().result()
+                    out_file.write(data)
+                    hash_obj.update(data)
+                    committed += len(data)
+                    out_file.flush()
+                    state["committed"] = committed
+                    state_path.write_text(json.dumps(state))
+                    progress.update(task_id, advance=len(data))
+                    if ranges:
+                        submit_next()
+        else:
+            with session.get(final_url, stream=True, timeout=60) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=READ_CHUNK_SIZE):
+                    out_file.write(chunk)
+                    hash_obj.update(chunk)
+                    progress.update(task_id, advance=len(chunk))
+
+    digest = hash_obj.hexdigest()
+    if expected_hash is not None and digest != expected_hash.lower():
+        part_path.unlink()
+        if state_path.exists():
+            state_path.unlink()
+        raise ValueError(
+            f"{hash_name.upper()} mismatch for {url}:\n"
+            f"\tExpected: {expected_hash}\n\tActual:   {digest}"
+        )
+    part_path.replace(file_path)
+    if state_path.exists():
+        state_path.unlink()
+    return digest
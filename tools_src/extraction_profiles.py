@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+import fnmatch
+import posixpath
+from collections import namedtuple
+from typing import Iterable, Iterator, Optional, Tuple
+
+# NamedTuple with the toolchain files to leave out of a package, the exclude
+# patterns are paths relative to the toolchain top folder, and multilibs are
+# the multilib folders to keep, e.g. "thumb/v7e-m+fp/hard" (None for all)
+ExtractionProfile = namedtuple(
+    "ExtractionProfile", ["name", "description", "exclude", "multilibs"]
+)
+
+DEFAULT_PROFILE = "full"
+DOCS_PATTERNS = ("share/doc/*", "share/info/*", "share/man/*")
+# Documentation files to keep anyway, as the toolchain is distributed with them
+KEEP_PATTERNS = ("*license*", "*copying*")
+# Folders containing a folder per multilib, inside the toolchain top folder
+MULTILIB_ROOTS = (
+    "arm-none-eabi/lib",
+    "lib/gcc/arm-none-eabi/*",
+    "arm-none-eabi/include/c++/*/arm-none-eabi",
+)
+# Multilib folders start with the instruction set, e.g. "thumb/v6-m/nofp"
+MULTILIB_ISAS = ("thumb", "arm")
+MULTILIB_DEPTH = 3
+
+PROFILES = {
+    profile.name: profile
+    for profile in (
+        ExtractionProfile("full", "The complete toolchain", (), None),
+        ExtractionProfile("nodocs", "Without the documentation", DOCS_PATTERNS, None),
+        ExtractionProfile(
+            "cortex-m",
+            "Without docs, only the Cortex-M multilibs",
+            DOCS_PATTERNS,
+            (
+                "thumb/v6-m/*",
+                "thumb/v7-m/*",
+                "thumb/v7e-m*/*",
+                "thumb/v8-m*/*",
+                "thumb/v8.1-m*/*",
+            ),
+        ),
+        ExtractionProfile(
+            "cortex-m0",
+            "Without docs, only the Cortex-M0/M0+/M1 multilibs",
+            DOCS_PATTERNS,
+            ("thumb/v6-m/nofp",),
+        ),
+        ExtractionProfile(
+            "cortex-m3",
+            "Without docs, only the Cortex-M3 multilibs",
+            DOCS_PATTERNS,
+            ("thumb/v7-m/nofp",),
+        ),
+        ExtractionProfile(
+            "cortex-m4",
+            "Without docs, only the Cortex-M4 (no FPU) multilibs",
+            DOCS_PATTERNS,
+            ("thumb/v7e-m/nofp",),
+        ),
+        ExtractionProfile(
+            "cortex-m4f",
+            "Without docs, only the Cortex-M4 with FPU multilibs",
+            DOCS_PATTERNS,
+            ("thumb/v7e-m+fp/hard", "thumb/v7e-m+fp/softfp"),
+        ),
+        ExtractionProfile(
+            "cortex-m7",
+            "Without docs, only the Cortex-M7 with FPU multilibs",
+            DOCS_PATTERNS,
+            ("thumb/v7e-m+fp/*", "thumb/v7e-m+dp/*"),
+        ),
+        ExtractionProfile(
+            "cortex-m33",
+            "Without docs, only the Cortex-M33 multilibs",
+            DOCS_PATTERNS,
+            ("thumb/v8-m.main/nofp", "thumb/v8-m.main+fp/*"),
+        ),
+    )
+}
+
+
+def get_profile(name: str) -> ExtractionProfile:
+    if name not in PROFILES:
+        raise ValueError(
+            f"Unknown extraction profile '{name}', options: {', '.join(PROFILES)}"
+        )
+    return PROFILES[name]
+
+
+def get_distribution_name(project_name: str, name: str) -> str:
+    """
+    The wheels of the profiles other than the default are a distribution of
+    their own, e.g. "arm-none-eabi-gcc-toolchain-cortex-m4f", so installing or
+    pinning the full toolchain never resolves to a profile wheel, as it would
+    with a local version label ("13.3.1+cortex.m4f" sorts above "13.3.1" and
+    matches "==13.3.1").
+
+    :param project_name: Distribution name of the full toolchain package.
+    :param name: Extraction profile name.
+    :return: The distribution name for the wheels of the profile.
+    """
+    get_profile(name)
+    if name == DEFAULT_PROFILE:
+        return project_name
+    return f"{project_name}-{name}"
+
+
+def get_multilib(path: str) -> Optional[Tuple[str, ...]]:
+    """
+    :param path: Path relative to the toolchain top folder.
+    :return: The path components after a multilib root (up to the multilib
+        folder depth) if the path is inside a multilib folder, None otherwise.
+    """
+    parts = path.split("/")
+    for root in MULTILIB_ROOTS:
+        root_depth = root.count("/") + 1
+        if (
+            len(parts) > root_depth
+            and parts[root_depth] in MULTILIB_ISAS
+            and fnmatch.fnmatchcase("/".join(parts[:root_depth]), root)
+        ):
+            return tuple(parts[root_depth : root_depth + MULTILIB_DEPTH])
+    return None
+
+
+def is_path_included(profile: ExtractionProfile, path: str) -> bool:
+    """
+    :param profile: The extraction profile.
+    :param path: Path relative to the toolchain top folder.
+    :return: True if the profile keeps the file or folder.
+    """
+    if any(fnmatch.fnmatchcase(path, pattern) for pattern in profile.exclude):
+        name = path.rsplit("/", 1)[-1].lower()
+        return any(fnmatch.fnmatchcase(name, pattern) for pattern in KEEP_PATTERNS)
+    if profile.multilibs is None:
+        return True
+    multilib = get_multilib(path)
+    if multilib is None or len(multilib) < MULTILIB_DEPTH:
+        # Not a multilib, or one of the folders containing them
+        return True
+    multilib_path = "/".join(multilib)
+    return any(
+        fnmatch.fnmatchcase(multilib_path, pattern) for pattern in profile.multilibs
+    )
+
+
+def filter_members(members: Iterable, name: str) -> Iterator:
+    """
+    Filter the members of a toolchain archive with an extraction profile.
+
+    :param members: ArchiveMember tuples, as yielded by iter_archive_members().
+    :param name: Extraction profile name.
+    :return: Iterator of the archive members the profile keeps.
+    """
+    profile = get_profile(name)
+    for member in members:
+        # Skip the toolchain top folder, the same in all the member paths
+        path = posixpath.normpath(member.name).partition("/")[2]
+        if not path or is_path_included(profile, path):
+            yield member
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+import os
+import shutil
+import posixpath
+from pathlib import Path
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Files up to this size are read into memory and written by the thread pool,
+# bigger files are streamed to disk by the archive reading thread
+MAX_BUFFERED_FILE_SIZE = 16 * 1024 * 1024
+# Maximum pending writes per thread, to limit the memory used by the buffers
+MAX_PENDING_PER_JOB = 8
+
+
+def get_default_jobs() -> int:
+    """:return: Default number of write threads, the writes are I/O bound."""
+    return min(32, (os.cpu_count() or 1) * 2)
+
+
+def _check_member_name(name: str) -> str:
+    """:return: Normalised member name, if it stays inside the destination."""
+    name = posixpath.normpath(name)
+    if name.startswith(("/", "../")) or name == ".." or ":" in name.split("/")[0]:
+        raise ValueError(f"Archive member outside the destination: {name}")
+    return name
+
+
+def _write_file(path: str, data: bytes, mode: int, mtime: float) -> None:
+    with open(path, "wb") as f:
+        f.write(data)
+    os.chmod(path, mode)
+    os.utime(path, (mtime, mtime))
+
+
+def _create_link(path: str, link_path: str, target_path: str, is_symlink: bool):
+    """
+    Create a link to a file extracted before, or a copy of it if the file
+    system doesn't support links (e.g. symlinks on Windows without privileges).
+    """
+    if os.path.lexists(path):
+        os.unlink(path)
+    try:
+        if is_symlink:
+            os.symlink(link_path, path)
+        else:
+            os.link(target_path, path)
+    except OSError:
+        if os.path.isdir(target_path):
+            shutil.copytree(target_path, path, symlinks=True)
+        elif os.path.exists(target_path):
+            shutil.copy2(target_path, path)
+        else:
+            print(f"Skipping broken link: {path} -> {link_path}")
+
+
+def extract_members(
+    members: Iterable, destination: Path, jobs: Optional[int] = None
+) -> int:
+    """
+    Extract archive members into a directory, reading them sequentially and
+    writing the files with a thread pool, as creating tens of thousands of
+    small files one by one is slower than the decompression.
+
+    Folders are created once before their files are written, links are created
+    after all the files, and the permissions and modification times of the
+    files and folders are preserved.
+
+    :param members: ArchiveMember tuples, as yielded by iter_archive_members(),
+        with the paths of the link targets relative to the archive root.
+    :param destination: Path to the directory to extract into.
+    :param jobs: Number of write threads, defaults to get_default_jobs().
+    :return: Number of extracted files.
+    """
+    jobs = jobs or get_default_jobs()
+    destination_dir = str(destination)
+    created_dirs = {destination_dir}  # type: Set[str]
+    dir_times = []  # type: List[Tuple[str, int, float]]
+    links = []  # type: List[Tuple[str, str, str, bool]]
+    pending = {}  # type: Dict[str, Future]
+    file_count = 0
+
+    def make_dirs(path: str) -> None:
+        if path not in created_dirs:
+            os.makedirs(path, exist_ok=True)
+            created_dirs.add(path)
+
+    def wait_pending(max_pending: int) -> None:
+        while len(pending) > max_pending:
+            done, _ = wait(pending.values(), return_when=FIRST_COMPLETED)
+            for path in [path for path, future in pending.items() if future in done]:
+                # Raises any exception from the write thread
+                pending.pop(path).result()
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        try:
+            for member in members:
+                name = _check_member_name(member.name)
+                path = os.path.join(destination_dir, *name.split("/"))
+                if member.type == "dir":
+                    make_dirs(path)
+                    dir_times.append((path, member.mode & 0o7777, member.mtime))
+                    continue
+                make_dirs(os.path.dirname(path))
+                if member.type in ("link", "hardlink"):
+                    try:
+                        target_name = _check_member_name(member.link)
+                    except ValueError:
+                        print(f"Skipping link outside the destination: {name}")
+                        continue
+                    target_path = os.path.join(destination_dir, *target_name.split("/"))
+                    # Symlinks are created relative to their own folder
+                    link_path = posixpath.relpath(target_name, posixpath.dirname(name))
+                    is_symlink = member.type == "link"
+                    links.append((path, link_path, target_path, is_symlink))
+                    continue
+
+                # An archive can contain the same file more than once
+                if path in pending:
+                    pending.pop(path).result()
+                data = member.fileobj.read(MAX_BUFFERED_FILE_SIZE + 1)
+                if len(data) > MAX_BUFFERED_FILE_SIZE:
+                    with open(path, "wb") as f:
+                        f.write(data)
+                        shutil.copyfileobj(member.fileobj, f)
+                    os.chmod(path, member.mode & 0o7777)
+                    os.utime(path, (member.mtime, member.mtime))
+                else:
+                    pending[path] = executor.submit(
+                        _write_file, path, data, member.mode & 0o7777, member.mtime
+                    )
+                    wait_pending(jobs * MAX_PENDING_PER_JOB)
+                file_count += 1
+            wait_pending(0)
+        finally:
+            for future in pending.values():
+                future.cancel()
+
+    for path, link_path, target_path, is_symlink in links:
+        _create_link(path, link_path, target_path, is_symlink)
+    # Deepest folders first, as setting a folder time is undone by writing
+    # into it, and a read-only parent folder would block its children
+    for path, mode, mtime in sorted(dir_times, reverse=True):
+        os.chmod(path, mode)
+        os.utime(path, (mtime, mtime))
+    return file_count
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+GH_API_URL = "https://api.github.com"
+# Maximum number of requests in flight, also the size of the connection pool
+DEFAULT_CONCURRENCY = 8
+# The maximum page size, so most repositories need a single request
+RELEASES_PER_PAGE = 100
+REQUEST_TIMEOUT = 60
+
+
+def create_session(
+    token: Optional[str] = None, concurrency: int = DEFAULT_CONCURRENCY
+) -> requests.Session:
+    """
+    Create an HTTP session to reuse the connections to the GitHub API and the
+    release assets host, with a connection pool for the concurrent requests.
+
+    :param token: GitHub token for the API requests, optional.
+    :param concurrency: Maximum number of concurrent requests.
+    :return: The session.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["Accept"] = "application/vnd.github+json"
+    if token:
+        session.headers["Authorization"] = f"Bearer {token}"
+    return session
+
+
+def _summarise_release(release: dict) -> dict:
+    """:return: Only the release fields used, to keep them in the cache."""
+    asset_keys = ("id", "name", "size", "updated_at", "browser_download_url")
+    return {
+        "id": release["id"],
+        "tag_name": release["tag_name"],
+        "assets": [
+            # GitHub only provides the "sha256:<hash>" digest for newer assets
+            dict({key: asset[key] for key in asset_keys}, digest=asset.get("digest"))
+            for asset in release["assets"]
+        ],
+    }
+
+
+def get_releases(
+    session: requests.Session,
+    repo_name: str,
+    api_url: str = GH_API_URL,
+    pages_cache: Optional[Dict[str, dict]] = None,
+) -> List[dict]:
+    """
+    Get all the releases of a GitHub repository, each one already includes
+    the list of its assets.
+
+    With a pages cache the requests are conditional, so the unchanged pages
+    are not downloaded again (and don't count towards the API rate limit).
+
+    :param session: HTTP session from create_session().
+    :param repo_name: Repository name, e.g. "carlosperate/arm-none-eabi-gcc-py-package".
+    :param api_url: Base URL of the GitHub API, or a local stand-in for it.
+    :param pages_cache: Dictionary of page URL to its ETag, next page URL and
+        releases, updated with the pages fetched.
+    :return: List of the release objects from the GitHub API, newest first,
+        with only the fields of the release and assets needed.
+    """
+    releases = []
+    releases_url = f"{api_url.rstrip('/')}/repos/{repo_name}/releases"
+    url = f"{releases_url}?per_page={RELEASES_PER_PAGE}"  # type: Optional[str]
+    fetched_pages = {}  # type: Dict[str, dict]
+    while url:
+        cached_page = (pages_cache or {}).get(url)
+        headers = {}
+        if cached_page and cached_page.get("etag"):
+            headers["If-None-Match"] = cached_page["etag"]
+        response = session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        if response.status_code == 304 and cached_page:
+            page = cached_page
+        else:
+            response.raise_for_status()
+            page = {
+                "etag": response.headers.get("ETag"),
+                # The next page URL already includes the query parameters
+                "next": response.links.get("next", {}).get("url"),
+                "releases": [_summarise_release(r) for r in response.json()],
+            }
+        fetched_pages[url] = page
+        releases.extend(page["releases"])
+        url = page["next"]
+    if pages_cache is not None:
+        # Only keep the current pages
+        pages_cache.clear()
+        pages_cache.update(fetched_pages)
+    return releases
+
+
+def index_assets(release: dict) -> Dict[str, dict]:
+    """:return: Dictionary of asset name to asset object for a release."""
+    return {asset["name"]: asset for asset in release["assets"]}
+
+
+def fetch_text(session: requests.Session, url: str) -> str:
+    """:return: The contents of a text file, e.g. a .sha256 file."""
+    response = session.get(url, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return response.text
+
+
+def fetch_all_text(
+    session: requests.Session,
+    urls: Iterable[str],
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> Dict[str, str]:
+    """
+    Fetch multiple small text files concurrently.
+
+    :param session: HTTP session from create_session().
+    :param urls: URLs of the files.
+    :param concurrency: Maximum number of requests at the same time.
+    :return: Dictionary of URL to file contents.
+    """
+    urls = list(dict.fromkeys(urls))
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        contents = executor.map(lambda url: fetch_text(session, url), urls)
+        return dict(zip(urls, contents))
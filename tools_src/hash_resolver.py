@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+import os
+import json
+import tempfile
+from pathlib import Path
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import requests
+
+from tools_src import downloader
+from tools_src.hashing import get_sha256_file_path, sha256_file_hash
+from tools_src.release_cache import DEFAULT_CACHE_DIR
+
+HASH_CACHE_FILE = "sha256.json"
+# Partial downloads are kept here, to resume them in the next run
+DOWNLOADS_FOLDER = "downloads"
+# The end of a zip file has the central directory, with the CRC-32, size and
+# timestamp of each file, so a local wheel with the same size and tail as the
+# remote file is the same wheel (wheels are not reproducible builds)
+TAIL_CHECK_SIZE = 64 * 1024
+REQUEST_TIMEOUT = 60
+
+# NamedTuple with a file to find the SHA-256 of, the size is -1 if unknown.
+# The GitHub asset ID and last update time identify the file contents, as an
+# asset can be replaced with another file with the same name and size
+HashRequest = namedtuple(
+    "HashRequest",
+    ["url", "name", "size", "asset_id", "updated_at"],
+    defaults=(None, None),
+)
+
+
+def load_hash_cache(cache_dir: Path = DEFAULT_CACHE_DIR) -> Dict[str, dict]:
+    """
+    :param cache_dir: Path to the cache directory.
+    :return: Dictionary of URL to the file size, asset ID, last update time
+        and SHA-256, empty if the cache doesn't exist or can't be read.
+    """
+    try:
+        return json.loads((cache_dir / HASH_CACHE_FILE).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_hash_cache(hashes: Dict[str, dict], cache_dir: Path = DEFAULT_CACHE_DIR):
+    """Save the hash cache, replacing it atomically."""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    cache_file = cache_dir / HASH_CACHE_FILE
+    tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    tmp_file.write_text(json.dumps(hashes, indent=2, sort_keys=True) + "\n")
+    tmp_file.replace(cache_file)
+
+
+def _get_cached_hash(hashes: Dict[str, dict], request: HashRequest) -> Optional[str]:
+    cached = hashes.get(request.url)
+    if cached is None or (request.size >= 0 and cached["size"] != request.size):
+        return None
+    # Entries from before the asset was replaced (or without its details)
+    if (cached.get("asset_id"), cached.get("updated_at")) != (
+        request.asset_id,
+        request.updated_at,
+    ):
+        return None
+    return cached["sha256"]
+
+
+def _remote_tail_matches(
+    session: requests.Session, url: str, file_path: Path, size: int
+) -> bool:
+    """Check the end of a local file is the same as the end of the remote file."""
+    length = min(TAIL_CHECK_SIZE, size)
+    response = session.get(
+        url,
+        headers={"Range": f"bytes={size - length}-{size - 1}"},
+        timeout=REQUEST_TIMEOUT,
+    )
+    if response.status_code != 206:
+        return False
+    with open(file_path, "rb") as file:
+        file.seek(size - length)
+        return response.content == file.read(length)
+
+
+def get_local_hash(
+    session: requests.Session, request: HashRequest, dist_paths: List[Path]
+) -> Optional[str]:
+    """
+    Find the SHA-256 of a remote file from a local copy of it, e.g. the wheels
+    in the dist folder, using its .sha256 file if it has one.
+
+    :param session: HTTP session, to compare the end of the files.
+    :param request: The file to find the hash of.
+    :param dist_paths: Folders to look for the file in.
+    :return: The SHA-256 hex digest, or None if there isn't a local copy.
+    """
+    for dist_path in dist_paths:
+        file_path = dist_path / request.name
+        if not file_path.is_file():
+            continue
+        size = file_path.stat().st_size
+        if size != request.size or not _remote_tail_matches(
+            session, request.url, file_path, size
+        ):
+            print(f"\tLocal file is different to the remote file: {file_path}")
+            continue
+        sha256_file = get_sha256_file_path(file_path)
+        if sha256_file.is_file():
+            # In the format "<sha256 hash> filename.whl\n"
+            sha256_file_contents = sha256_file.read_text().split()
+            if sha256_file_contents[1:] == [request.name]:
+                return sha256_file_contents[0]
+        return sha256_file_hash(file_path)
+    return None
+
+
+def resolve_sha256s(
+    files: List[HashRequest],
+    cache_dir: Optional[Path] = DEFAULT_CACHE_DIR,
+    dist_paths: Optional[List[Path]] = None,
+    jobs: int = downloader.DEFAULT_SEGMENTS,
+    session: Optional[requests.Session] = None,
+) -> Dict[str, str]:
+    """
+    Find the SHA-256 of the remote files without a .sha256 file, trying:
+    1. The hash cache, with the files hashed before.
+    2. A local copy of the file, e.g. in the dist folder.
+    3. Downloading the file with parallel range requests, hashing it as it's
+       written, resuming the partial download from a previous run if any.
+
+    All the hashes found are saved in the hash cache, so each file is only
+    hashed once.
+
+    :param files: The files to find the hashes of.
+    :param cache_dir: Path to the cache directory, or None to disable it.
+    :param dist_paths: Folders with local copies of the files.
+    :param jobs: Number of parallel local hashes and range requests.
+    :param session: Requests session to reuse, a new one is created otherwise.
+    :return: Dictionary of URL to SHA-256 hex digest.
+    """
+    session = session or downloader.create_session(jobs)
+    hashes = load_hash_cache(cache_dir) if cache_dir else {}
+    results = {}
+    missing = []
+    for request in files:
+        cached_hash = _get_cached_hash(hashes, request)
+        if cached_hash:
+            results[request.url] = cached_hash
+        else:
+            missing.append(request)
+
+    def add_result(request: HashRequest, sha256: str) -> None:
+        results[request.url] = sha256
+        hashes[request.url] = {
+            "size": request.size,
+            "asset_id": request.asset_id,
+            "updated_at": request.updated_at,
+            "sha256": sha256,
+        }
+        if cache_dir:
+            save_hash_cache(hashes, cache_dir)
+
+    if dist_paths:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            local_hashes = list(
+                executor.map(
+                    lambda request: get_local_hash(session, request, dist_paths),
+                    missing,
+                )
+            )
+        for request, local_hash in zip(missing, local_hashes):
+            if local_hash:
+                print(f"\tHashed local copy of: {request.name}")
+                add_result(request, local_hash)
+        missing = [request for request in missing if request.url not in results]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        download_path = cache_dir / DOWNLOADS_FOLDER if cache_dir else Path(temp_dir)
+        download_path.mkdir(parents=True, exist_ok=True)
+        for request in missing:
+            print(f"\tDownloading & hashing: {request.name}")
+            file_path = download_path / request.name
+            sha256 = downloader.download_file(
+                request.url,
+                file_path,
+                hash_name="sha256",
+                segments=jobs,
+                session=session,
+            )
+            file_path.unlink()
+            add_result(request, sha256)
+    return results
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+import os
+import hashlib
+from pathlib import Path
+from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+
+SHA256_SUFFIX = ".sha256"
+# hashlib releases the GIL for large buffers, so threads hash files in parallel
+BULK_READ_SIZE = 4 * 1024 * 1024
+
+
+def get_sha256_file_path(file_path: Path) -> Path:
+    """Path of the SHA-256 sidecar file for the given file."""
+    return file_path.with_suffix(f"{file_path.suffix}{SHA256_SUFFIX}")
+
+
+def write_sha256_file(file_path: Path, sha256_hex: str) -> Path:
+    """
+    Write the SHA-256 sidecar file for a file, in the same directory.
+
+    :param file_path: Path to the hashed file.
+    :param sha256_hex: Hex digest of the file contents.
+    :return: SHA-256 hash file path.
+    """
+    sha256_file_path = get_sha256_file_path(file_path)
+    sha256_file_path.write_text(f"{sha256_hex} {file_path.name}\n")
+    return sha256_file_path
+
+
+def write_bytes_with_sha256(file_path: Path, data: bytes) -> Path:
+    """
+    Write a file and its SHA-256 sidecar file, hashing the data in memory.
+
+    :param file_path: Path to the file to write.
+    :param data: The file contents.
+    :return: SHA-256 hash file path.
+    """
+    file_path.write_bytes(data)
+    return write_sha256_file(file_path, hashlib.sha256(data).hexdigest())
+
+
+def sha256_file_hash(file_path: Path, chunk_size: int = BULK_READ_SIZE) -> str:
+    """
+    Calculate the SHA-256 hash of a file.
+
+    :param file_path: Path to the file to hash.
+    :param chunk_size: Size in bytes of each read.
+    :return: Hex string of the SHA-256 hash.
+    """
+    sha256_hash = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            sha256_hash.update(chunk)
+    return sha256_hash.hexdigest()
+
+
+def hash_dist_folder(
+    dist_path: Path, jobs: Optional[int] = None, overwrite: bool = False
+) -> List[Path]:
+    """
+    Create the SHA-256 sidecar files for all the (not hidden) files in a
+    folder, hashing them in parallel, for artifacts not created by these tools.
+
+    :param dist_path: Path to the folder with the files to hash.
+    :param jobs: Number of files to hash in parallel, defaults to the CPUs.
+    :param overwrite: Recreate the sidecar files that already exist.
+    :return: List of the SHA-256 hash file paths created.
+    """
+    if not dist_path.is_dir():
+        raise FileNotFoundError(f"Folder to hash not found: {dist_path}")
+    files = [
+        file
+        for file in sorted(dist_path.iterdir())
+        if file.is_file()
+        and not file.name.startswith(".")
+        and file.suffix != SHA256_SUFFIX
+        and (overwrite or not get_sha256_file_path(file).exists())
+    ]
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+        hashes = executor.map(sha256_file_hash, files)
+        return [write_sha256_file(file, sha256) for file, sha256 in zip(files, hashes)]
+
+
+class HashingFile:
+    """
+    Binary file opened for writing that calculates its SHA-256 hash as the
+    data is written, so it doesn't have to be read again afterwards.
+
+    Writers like zipfile go back to update a header after writing the data
+    following it, so the bytes written since the last commit() are kept in
+    memory and only hashed once commit() confirms they won't change.
+    """
+
+    def __init__(self, file_path: Path) -> None:
+        """
+        :param file_path: Path to the file to create.
+        """
+        self._file = open(file_path, "w+b")
+        self._sha256 = hashlib.sha256()
+        self._hashed_size = 0
+        self._pending = bytearray()
+
+    def write(self, data: bytes) -> int:
+        offset = self._file.tell() - self._hashed_size
+        if offset < 0:
+            raise ValueError("Can't modify data already hashed")
+        if offset > len(self._pending):
+            self._pending.extend(bytes(offset - len(self._pending)))
+        self._pending[offset : offset + len(data)] = data
+        return self._file.write(data)
+
+    def commit(self) -> None:
+        """Hash all the data written so far, which can't be modified after."""
+        self._sha256.update(self._pending)
+        self._hashed_size += len(self._pending)
+        self._pending = bytearray()
+
+    def hexdigest(self) -> str:
+        """Commit and return the SHA-256 hex digest of the file contents."""
+        self.commit()
+        return self._sha256.hexdigest()
+
+    def read(self, size: int = -1) -> bytes:
+        return self._file.read(size)
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        return self._file.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def seekable(self) -> bool:
+        return True
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
@@ -3,25 +3,47 @@
 import os
 import re
 import sys
+import shutil
+import fnmatch
 import hashlib
-import tarfile
+import time
+import posixpath
 import zipfile
 import platform
 import subprocess
-import urllib.request
 from pathlib import Path
-from typing import Optional, List, Tuple
+from typing import Optional, Dict, Iterator, List, Tuple
 from collections import namedtuple
 
 import tomli
-from rich.progress import (
-    Progress,
-    BarColumn,
-    DownloadColumn,
-    TransferSpeedColumn,
-    TimeRemainingColumn,
+from tools_src import download_cache
+from tools_src.dedup import (
+    DEDUP_MODES,
+    find_duplicates,
+    get_executable_duplicates,
+    print_dedup_report,
+    remove_duplicates,
+)
+from tools_src.decompressors import open_tar_stream, select_decompressor
+from tools_src.extractor import extract_members
+from tools_src.strip_binaries import strip_host_binaries
+from tools_src.compression_policies import DEFAULT_POLICY
+from tools_src.extraction_profiles import (
+    DEFAULT_PROFILE,
+    filter_members,
+    get_distribution_name,
+)
+from tools_src.hashing import (
+    sha256_file_hash,
+    write_bytes_with_sha256,
+    write_sha256_file,
+)
+from tools_src.downloader import download_file
+from tools_src.wheel_writer import (
+    WheelWriter,
+    generate_core_metadata,
+    generate_entry_points,
 )
-
 from tools_src.gcc_releases import gcc_releases, gcc_short_versions
 
 # The project README contains information about the versioning
@@ -31,20 +53,49 @@ PROJECT_NAME = "arm-none-eabi-gcc-toolchain"
 PACKAGE_NAME = "arm_none_eabi_gcc_toolchain"
 PACKAGE_ROOT = Path(__file__).resolve().parents[1] / PROJECT_NAME
 PACKAGE_PATH = PACKAGE_ROOT / "src" / PACKAGE_NAME
+# Single module with the entry points for all the toolchain executables
+LAUNCHER_FILE_NAME = "launcher.py"
+# Module with the toolchain paths, used by the launcher and the package API
+INDEX_FILE_NAME = "_index.py"
+# Each isolated (parallel) build gets its own copy of the package in here
+STAGING_ROOT = Path(__file__).resolve().parents[1] / "staging"
+# Files generated by a build, not to be copied from the package template
+PACKAGE_TEMPLATE_GENERATED = (
+    "__pycache__",
+    "build",
+    "*.egg-info",
+    "MANIFEST.in",
+    "pyproject.toml",
+    LAUNCHER_FILE_NAME,
+    INDEX_FILE_NAME,
+    "run_*.py",
+    "gcc-arm-*",
+    "arm-gnu-toolchain*",
+    "arm_none_eabi_gcc_*",
+)
 
 # NameTuple with the GCC info
 GccInfo = namedtuple("GccInfo", ["files", "release_name", "os_arch"])
+# NamedTuple with the wheel built for a GCC release platform, and a dictionary
+# with stats about the build to record, e.g. the bytes saved by stripping
+BuildResult = namedtuple("BuildResult", ["wheel_path", "stats"])
+# NamedTuple for a file, folder ("dir"), symlink ("link") or "hardlink" inside
+# a toolchain archive, the link targets are relative to the archive root
+ArchiveMember = namedtuple(
+    "ArchiveMember", ["name", "type", "mode", "mtime", "link", "fileobj"]
+)
 
 
 def get_gcc_releases(
-    release_name: str, os_arch: Optional[Tuple[str, str]]
+    release_name: str, os_arch: Optional[Tuple[Optional[str], Optional[str]]]
 ) -> List[GccInfo]:
     """
     Get the GCC release information based on the release name, OS type and
     CPU architecture.
 
     :param release_name: GCC release name.
-    :param os_arch: Tuple with the Operating System and architecture info.
+    :param os_arch: Tuple with the Operating System and architecture info,
+        each of them can be None to use the current machine value.
         If set to None, it will return all the available builds for the release.
     :return: List of GCC releases.
     """
@@ -126,13 +177,24 @@ def get_gcc_release_names() -> List[str]:
     return list(gcc_releases.keys())
 
 
-def download_toolchain(file_url: str, save_path: Path = Path.cwd()) -> Path:
+def download_toolchain(
+    file_url: str,
+    save_path: Path = Path.cwd(),
+    show_progress: bool = True,
+    md5: Optional[str] = None,
+) -> Path:
     """
     Download the toolchain from the given URL into the given path.
     Displays a progress bar in the terminal.
 
+    The download uses parallel range requests when the server supports them,
+    resumes a previous interrupted download, and verifies the MD5 hash.
+
     :param file_url: URL to download the toolchain from.
     :param save_path: Path to save the downloaded file.
+    :param show_progress: Display the progress bar, disable it for parallel
+        builds as multiple live displays would garble the terminal output.
+    :param md5: Expected MD5 hash of the file, if provided.
     :return: Full path to the downloaded file.
     """
     print(f"Downloading toolchain from:\n\t{file_url}")
@@ -140,34 +202,109 @@ def download_toolchain(file_url: str, save_path: Path = Path.cwd()) -> Path:
         raise FileNotFoundError(f"Toolchain save path not found: {save_path}")
     url_file_name = os.path.basename(file_url)
     file_path = save_path / url_file_name
-    print(f"Into: ./{Path(file_path).absolute().relative_to(Path.cwd())}")
+    if file_path.absolute().is_relative_to(Path.cwd()):
+        print(f"Into: ./{file_path.absolute().relative_to(Path.cwd())}")
+    else:
+        print(f"Into: {file_path.absolute()}")
     if file_path.is_file():
         raise FileExistsError(f"Toolchain file already exists: {file_path}")
 
-    response = urllib.request.urlopen(file_url)
-    total_length = int(response.getheader("Content-Length"))
-    chunk_size = 8192
-
-    progress = Progress(
-        "[progress.description]{task.description}",
-        BarColumn(),
-        "[progress.percentage]{task.percentage:>3.0f}%",
-        DownloadColumn(),
-        TransferSpeedColumn(),
-        TimeRemainingColumn(),
-    )
-    task_id = progress.add_task("Downloading...", total=total_length)
-    with progress, open(file_path, "wb") as out_file:
-        while True:
-            chunk = response.read(chunk_size)
-            if not chunk:
-                break
-            out_file.write(chunk)
-            progress.update(task_id, advance=len(chunk))
+    download_file(file_url, file_path, md5, show_progress=show_progress)
     return file_path
 
 
-def uncompress_toolchain(file_path: Path, destination: Path = Path.cwd()) -> Path:
+def get_toolchain(
+    release_files: dict,
+    save_path: Path = Path.cwd(),
+    show_progress: bool = True,
+    cache_dir: Optional[Path] = download_cache.DEFAULT_CACHE_DIR,
+) -> Path:
+    """
+    Get the toolchain archive into the given path, from the download cache if
+    it's already there, or downloading it (and adding it to the cache).
+
+    :param release_files: The gcc_releases dictionary entry for a platform,
+        with the "url" and "md5" keys.
+    :param save_path: Path to save the toolchain file.
+    :param show_progress: Display the download progress bar.
+    :param cache_dir: Path to the download cache, or None to always download.
+    :return: Full path to the toolchain file in the save path.
+    """
+    if cache_dir is None:
+        return download_toolchain(
+            release_files["url"], save_path, show_progress, release_files["md5"]
+        )
+
+    url, md5 = release_files["url"], release_files["md5"]
+    cached_file = download_cache.get_cached_toolchain(url, md5, cache_dir)
+    if cached_file is None:
+        cached_file = download_to_cache(url, md5, cache_dir, show_progress)
+        download_cache.prune_cache(cache_dir)
+    else:
+        print(f"Toolchain found in the download cache:\n\t{cached_file}")
+    return download_cache.link_from_cache(cached_file, save_path)
+
+
+def download_to_cache(
+    url: str,
+    md5: str,
+    cache_dir: Path = download_cache.DEFAULT_CACHE_DIR,
+    show_progress: bool = True,
+) -> Path:
+    """
+    Download a toolchain archive into the download cache, resuming the partial
+    download of a previous interrupted run.
+
+    :param url: URL to download the toolchain from.
+    :param md5: Expected MD5 hash of the file.
+    :param cache_dir: Path to the download cache.
+    :param show_progress: Display the download progress bar.
+    :return: Path to the toolchain file in the cache.
+    """
+    with download_cache.claim_download_dir(url, md5, cache_dir) as download_dir:
+        # Another process might have downloaded it while waiting for the claim
+        cached_file = download_cache.get_cached_toolchain(url, md5, cache_dir)
+        if cached_file is not None:
+            return cached_file
+        file_path = download_dir / os.path.basename(url)
+        if file_path.is_file():
+            # Completed by a run interrupted before adding it to the cache
+            try:
+                return download_cache.add_to_cache(file_path, url, md5, cache_dir)
+            except ValueError:
+                file_path.unlink()
+        downloaded_file = download_toolchain(url, download_dir, show_progress, md5)
+        return download_cache.add_to_cache(
+            downloaded_file, url, md5, cache_dir, verify=False
+        )
+
+
+def get_zip_missing_top_folder(file_path: Path) -> Optional[str]:
+    """
+    Special case the 14.2.Rel1, 9-2020-q2 and 9-2019-q4 windows zip files,
+    because they don't have a top folder.
+
+    :param file_path: Path to the compressed toolchain file.
+    :return: The name of the top folder to add, or None if it has one.
+    """
+    bad_zip_filenames = (
+        os.path.basename(gcc_releases["9-2020-q2"]["win32"]["url"]),
+        os.path.basename(gcc_releases["9-2019-q4"]["win32"]["url"]),
+        os.path.basename(gcc_releases["14.2.Rel1"]["win32"]["url"]),
+    )
+    for bad_zip_filename in bad_zip_filenames:
+        if str(file_path).endswith(bad_zip_filename):
+            return bad_zip_filename.replace(".zip", "")
+    return None
+
+
+def uncompress_toolchain(
+    file_path: Path,
+    destination: Path = Path.cwd(),
+    decompressor: str = "auto",
+    jobs: Optional[int] = None,
+    profile: str = DEFAULT_PROFILE,
+) -> Path:
     """
     Uncompress the given compressed file into the provided directory.
 
@@ -176,11 +313,19 @@ def uncompress_toolchain(file_path: Path, destination: Path = Path.cwd()) -> Pat
     - .tar.bz2
     - .tar.xz
 
+    The tar files are decompressed with a multi-threaded decompressor (xz,
+    lbzip2 or pbzip2) if one is installed, or with the Python tarfile module.
+    The archive is read sequentially and the files written by a thread pool.
+
     :param file_path: Path to the file to uncompress.
     :param destination: Path to uncompress the file into.
+    :param decompressor: Tar decompressor backend, "auto" for the fastest.
+    :param jobs: Number of threads writing the files, defaults to 2 per CPU.
+    :param profile: Extraction profile with the toolchain files to skip.
     :return: Full path to the uncompressed directory.
     """
-    print(f"\nUncompressing toolchain file: ./{file_path.relative_to(Path.cwd())}")
+    # The archive can be outside the working directory, e.g. in the cache
+    print(f"\nUncompressing toolchain file: {os.path.relpath(file_path)}")
     print(f"Into: {destination.resolve().relative_to(Path.cwd())}/")
     if not destination.is_dir():
         raise FileNotFoundError(f"Destination directory not found: {destination}")
@@ -200,35 +345,15 @@ def uncompress_toolchain(file_path: Path, destination: Path = Path.cwd()) -> Pat
                 f"Uncompressed folder already exists: {os.path.join(destination, item)}"
             )
 
-    if str(file_path).endswith(".zip"):
-        # Special case the 14.2.Rel1, 9-2020-q2 and 9-2019-q4 windows zip because they don't have a top folder
-        bad_zip_filename1 = os.path.basename(gcc_releases["9-2020-q2"]["win32"]["url"])
-        bad_zip_filename2 = os.path.basename(gcc_releases["9-2019-q4"]["win32"]["url"])
-        bad_zip_filename3 = os.path.basename(gcc_releases["14.2.Rel1"]["win32"]["url"])
-        if str(file_path).endswith(bad_zip_filename1):
-            final_destination = destination / bad_zip_filename1.replace(".zip", "")
-            final_destination.mkdir(exist_ok=False)
-        elif str(file_path).endswith(bad_zip_filename2):
-            final_destination = destination / bad_zip_filename2.replace(".zip", "")
-            final_destination.mkdir(exist_ok=False)
-        elif str(file_path).endswith(bad_zip_filename3):
-            final_destination = destination / bad_zip_filename3.replace(".zip", "")
-            final_destination.mkdir(exist_ok=False)
-        else:
-            final_destination = destination
-        with zipfile.ZipFile(file_path, "r") as zip_ref:
-            zip_ref.extractall(path=final_destination)
-
-    elif str(file_path).endswith(".tar.bz2"):
-        with tarfile.open(file_path, "r:bz2") as tar_ref:
-            tar_ref.extractall(path=destination)
-
-    elif str(file_path).endswith(".tar.xz"):
-        with tarfile.open(file_path, "r:xz") as tar_ref:
-            tar_ref.extractall(path=destination)
-
-    else:
+    if str(file_path).endswith((".tar.bz2", ".tar.xz")):
+        decompressor, _ = select_decompressor(file_path, decompressor)
+        print(f"Decompressing with: {decompressor}")
+    elif not str(file_path).endswith(".zip"):
         raise ValueError(f"Unsupported file extension: {file_path}")
+    # The zip files without a top folder get it added to the member paths
+    members = iter_archive_members(file_path, decompressor)
+    file_count = extract_members(filter_members(members, profile), destination, jobs)
+    print(f"Extracted {file_count} files")
 
     # Get the full name of the uncompressed folder
     for item in destination.iterdir():
@@ -240,6 +365,32 @@ def uncompress_toolchain(file_path: Path, destination: Path = Path.cwd()) -> Pat
     )
 
 
+def get_wheel_file_name(
+    package_version: str, wheel_plat: str, profile: str = DEFAULT_PROFILE
+) -> str:
+    """
+    Generate the wheel file name for a package version and platform.
+
+    :param package_version: Package version string.
+    :param wheel_plat: Wheel platform tag.
+    :param profile: Extraction profile, which sets the distribution name.
+    :return: The wheel file name.
+    """
+    project_name = get_distribution_name(PROJECT_NAME, profile).replace("-", "_")
+    return f"{project_name}-{package_version}-py3-none-{wheel_plat}.whl"
+
+
+def get_source_dist_name(wheel_name: str) -> str:
+    """
+    Generate the PyPI source distribution file name from a wheel file name,
+    as it's the same for all the platforms.
+
+    :param wheel_name: File name of any of the wheels.
+    :return: The source distribution file name.
+    """
+    return wheel_name.split("-py3-none-")[0] + ".tar.gz"
+
+
 def generate_package_version(gcc_release_name: str) -> str:
     """
     Generate a package version based on the GCC release and this package version.
@@ -250,8 +401,134 @@ def generate_package_version(gcc_release_name: str) -> str:
     return gcc_short_versions[gcc_release_name] + "." + PACKAGE_CREATOR_VERSION
 
 
+def get_bin_launchers(bin_files: List[str]) -> List[Tuple[str, str]]:
+    """
+    Get the launcher function name for each executable in the GCC toolchain
+    bin folder.
+
+    :param bin_files: File names of the executables in the bin folder.
+    :return: List of tuples with the executable file name and function name.
+    """
+    bin_launchers = []
+    print("Found executables:")
+    for bin_file in sorted(bin_files):
+        if bin_file.startswith("arm-none-eabi-"):
+            func_name = bin_file.replace("arm-none-eabi-", "run_")
+        else:
+            func_name = "run_" + bin_file
+        func_name = func_name.replace(".exe", "")
+        func_name = re.sub("[^0-9a-zA-Z_]", "_", func_name)
+        bin_launchers.append((bin_file, func_name))
+        print(f"- {bin_file} ({func_name})")
+    if not bin_launchers:
+        raise FileNotFoundError("No executables found in the GCC toolchain bin folder")
+    return bin_launchers
+
+
+def get_gcc_version(bin_files: List[str]) -> Optional[str]:
+    """
+    Get the GCC version from the versioned gcc executable in the bin folder,
+    e.g. "arm-none-eabi-gcc-13.3.1".
+
+    :param bin_files: File names of the executables in the bin folder.
+    :return: The GCC version string, or None if it's not found.
+    """
+    for bin_file in bin_files:
+        match = re.fullmatch(r"arm-none-eabi-gcc-(\d+(\.\d+)+)(\.exe)?", bin_file)
+        if match:
+            return match.group(1)
+    return None
+
+
+def generate_launcher_files(
+    package_path: Path,
+    gcc_folder: Path,
+    bin_launchers: List[Tuple[str, str]],
+    duplicates: Optional[Dict[str, str]] = None,
+) -> Dict[str, str]:
+    """
+    Generate the Python launcher module for the executables, with an entry
+    point function for each of them, and the tool index module with the
+    toolchain paths, from the package launcher.py.txt and _index.py.txt
+    templates.
+
+    :param package_path: Path to the package directory with the templates.
+    :param gcc_folder: GCC toolchain folder, relative to the package path.
+    :param bin_launchers: Executable file names and launcher function names.
+    :param duplicates: Files removed from the toolchain folder to the file to
+        restore them from, both relative to the toolchain folder.
+    :return: Dictionary of module file name to its Python code.
+    """
+    bin_folder = (gcc_folder / "bin").as_posix()
+    tools_table = []
+    tool_functions = []
+    for bin_file, func_name in bin_launchers:
+        script_name = bin_file.replace(".exe", "")
+        tools_table.append(f'    "{script_name}": "{bin_folder}/{bin_file}",')
+        tool_functions.append(
+            f'\n\ndef {func_name}():\n    run_tool("{script_name}")\n'
+        )
+    duplicates_table = [
+        f'    "{(gcc_folder / path).as_posix()}": "{(gcc_folder / source).as_posix()}",'
+        for path, source in sorted((duplicates or {}).items())
+    ]
+    duplicates_table_code = "\n".join(duplicates_table)
+    # Saved in the restore marker, so an upgrade restores its own duplicates
+    duplicates_hash = hashlib.sha256(duplicates_table_code.encode()).hexdigest()
+    gcc_version = get_gcc_version([bin_file for bin_file, _ in bin_launchers])
+    index_code = (package_path / "_index.py.txt").read_text()
+    launcher_code = (package_path / "launcher.py.txt").read_text()
+    return {
+        INDEX_FILE_NAME: index_code.format(
+            gcc_folder=gcc_folder.as_posix(),
+            bin_folder=bin_folder,
+            gcc_version=f'"{gcc_version}"' if gcc_version else "None",
+            tools_table="\n".join(tools_table),
+            duplicates_hash=duplicates_hash[:16],
+            duplicates_table=duplicates_table_code,
+        ),
+        LAUNCHER_FILE_NAME: launcher_code.format(
+            tool_functions="".join(tool_functions).lstrip("\n"),
+        ),
+    }
+
+
+def generate_pyproject_toml(
+    project_path: Path,
+    package_version: str,
+    bin_launchers: List[Tuple[str, str]],
+    profile: str = DEFAULT_PROFILE,
+) -> str:
+    """
+    Generate the package pyproject.toml contents from the project
+    pyproject.toml.txt template, with a script entry per executable.
+
+    :param project_path: Path to the project directory with the template.
+    :param package_version: Package version string.
+    :param bin_launchers: Executable file names and launcher function names.
+    :param profile: Extraction profile, which sets the distribution name.
+    :return: The pyproject.toml file contents.
+    """
+    pyproject_scripts = []
+    for bin_file, func_name in bin_launchers:
+        pyproject_scripts.append(
+            f'"{bin_file.replace(".exe", "")}" = "{PACKAGE_NAME}.launcher:{func_name}"'
+        )
+    pyproject_toml_template = (project_path / "pyproject.toml.txt").read_text()
+    return pyproject_toml_template.format(
+        name=get_distribution_name(PROJECT_NAME, profile),
+        version=package_version,
+        bin_scripts="\n".join(pyproject_scripts),
+    )
+
+
 def create_package_files(
-    project_path: Path, package_path: Path, gcc_path: Path, package_version: str
+    project_path: Path,
+    package_path: Path,
+    gcc_path: Path,
+    package_version: str,
+    duplicates: Optional[Dict[str, str]] = None,
+    profile: str = DEFAULT_PROFILE,
 ) -> None:
     """
     Create the package files with the provided GCC toolchain folder and
@@ -259,6 +536,9 @@ def create_package_files(
 
     :param package_path: Path to the package directory.
     :param gcc_folder: Path to the GCC toolchain folder.
+    :param duplicates: Files to be removed from the toolchain folder, to the
+        file to restore them from on first use, relative to the folder.
+    :param profile: Extraction profile, which sets the distribution name.
     """
     project_path = project_path.resolve()
     package_path = package_path.resolve()
@@ -283,39 +563,22 @@ def create_package_files(
 
     # Iterate through all the bin files to figure out which executables are available
     bin_files = []
-    print("Found executables:")
     for root, _, files in os.walk(gcc_path / "bin"):
         for file in files:
-            bin_file = os.path.basename(file)
-            if bin_file.startswith("arm-none-eabi-"):
-                func_name = bin_file.replace("arm-none-eabi-", "run_")
-            else:
-                func_name = "run_" + bin_file
-            func_name = func_name.replace(".exe", "")
-            func_name = re.sub("[^0-9a-zA-Z_]", "_", func_name)
-            bin_files.append((bin_file, func_name))
-            print(f"- {bin_file} ({func_name}.py)")
-    if not bin_files:
-        raise FileNotFoundError("No executables found in the GCC toolchain bin folder")
+            bin_files.append(os.path.basename(file))
+    bin_launchers = get_bin_launchers(bin_files)
 
     # Create a python file per executable to launch it
-    py_code = (package_path / "executable_launcher.py.txt").read_text()
-    for bin_file, func_name in bin_files:
-        (package_path / f"{func_name}.py").write_text(
-            py_code.format(bin=bin_file, func_name=func_name, gcc_folder=gcc_folder)
-        )
+    launcher_files = generate_launcher_files(
+        package_path, gcc_folder, bin_launchers, duplicates
+    )
+    for file_name, launcher_code in launcher_files.items():
+        (package_path / file_name).write_text(launcher_code)
 
     # Create the project pyproject.toml file from template pyproject.toml.txt
-    pyproject_scripts = []
-    for bin_file, func_name in bin_files:
-        pyproject_scripts.append(
-            f'"{bin_file.replace(".exe", "")}" = "{PACKAGE_NAME}.{func_name}:{func_name}"'
-        )
-    pyproject_toml_template = (project_path / "pyproject.toml.txt").read_text()
-    pyproject_toml_str = pyproject_toml_template.format(
-        version=package_version, bin_scripts="\n".join(pyproject_scripts)
+    (project_path / "pyproject.toml").write_text(
+        generate_pyproject_toml(project_path, package_version, bin_launchers, profile)
     )
-    (project_path / "pyproject.toml").write_text(pyproject_toml_str)
 
     # Read the template MANIFEST.in.txt file and create the final MANIFEST.in
     manifest_in_template = (project_path / "MANIFEST.in.txt").read_text()
@@ -324,74 +587,262 @@ def create_package_files(
     )
 
 
-def build_wheel(package_path: Path, dist_path: Path, wheel_plat: str) -> None:
+def iter_archive_members(
+    file_path: Path, decompressor: str = "auto"
+) -> Iterator[ArchiveMember]:
     """
-    Create a Python wheel from the package directory.
+    Iterate through the members of a compressed toolchain file one at a time,
+    without extracting it.
+    The file object of each member must be read before getting the next one.
 
-    :param package_path: Path to the package directory.
+    Current extensions supported:
+    - .zip
+    - .tar.bz2
+    - .tar.xz
+
+    :param file_path: Path to the compressed file.
+    :param decompressor: Tar decompressor backend, "auto" for the fastest.
+    :return: Iterator of archive members, with paths including the top folder.
+    """
+    if str(file_path).endswith(".zip"):
+        missing_top_folder = get_zip_missing_top_folder(file_path)
+        prefix = f"{missing_top_folder}/" if missing_top_folder else ""
+        with zipfile.ZipFile(file_path, "r") as zip_ref:
+            for info in zip_ref.infolist():
+                name = prefix + info.filename
+                mtime = time.mktime(info.date_time + (0, 0, -1))
+                if info.is_dir():
+                    yield ArchiveMember(name, "dir", 0o755, mtime, None, None)
+                    continue
+                # Zip files created on Windows don't have the Unix permissions
+                mode = (info.external_attr >> 16) & 0o777 or 0o644
+                with zip_ref.open(info) as fileobj:
+                    yield ArchiveMember(name, "file", mode, mtime, None, fileobj)
+
+    elif str(file_path).endswith((".tar.bz2", ".tar.xz")):
+        with open_tar_stream(file_path, decompressor) as tar_ref:
+            for member in tar_ref:
+                if member.isdir():
+                    member_type, link = "dir", None
+                elif member.issym():
+                    # Symlink targets are relative to the link location
+                    member_type = "link"
+                    link = posixpath.join(
+                        posixpath.dirname(member.name), member.linkname
+                    )
+                elif member.islnk():
+                    member_type, link = "hardlink", member.linkname
+                elif member.isfile():
+                    member_type, link = "file", None
+                else:
+                    continue
+                yield ArchiveMember(
+                    member.name,
+                    member_type,
+                    member.mode,
+                    member.mtime,
+                    link and posixpath.normpath(link),
+                    tar_ref.extractfile(member) if member_type == "file" else None,
+                )
+    else:
+        raise ValueError(f"Unsupported file extension: {file_path}")
+
+
+def close_wheel(
+    wheel: WheelWriter, project_path: Path, pyproject: dict
+) -> Tuple[str, str]:
+    """
+    Write the wheel dist-info files generated from the package pyproject.toml
+    and close the wheel.
+
+    :param wheel: The wheel being written.
+    :param project_path: Path to the project directory with the README.
+    :param pyproject: The parsed package pyproject.toml contents.
+    :return: Tuple with the wheel METADATA file contents and the SHA-256 hex
+        digest of the wheel file.
+    """
+    readme = (project_path / pyproject["project"]["readme"]).read_text()
+    metadata = generate_core_metadata(pyproject, readme)
+    wheel_sha256 = wheel.close(
+        metadata=metadata,
+        entry_points=generate_entry_points(pyproject["project"]["scripts"]),
+        top_level=f"{PACKAGE_NAME}\n",
+    )
+    return metadata, wheel_sha256
+
+
+def build_wheel_from_archive(
+    file_path: Path,
+    project_path: Path,
+    dist_path: Path,
+    package_version: str,
+    wheel_plat: str,
+    profile: str = DEFAULT_PROFILE,
+    compression: str = DEFAULT_POLICY,
+) -> Path:
+    """
+    Create the Python wheel directly from the compressed toolchain file,
+    streaming each archive member into the wheel without extracting it, and
+    adding the launchers and metadata generated from the project templates.
+
+    The wheel metadata file is saved next to the wheel as well, and the
+    SHA-256 files for both are created from the data as it's written.
+
+    :param file_path: Path to the compressed toolchain file.
+    :param project_path: Path to the project directory with the templates.
+    :param dist_path: Path to the directory to save the wheel.
+    :param package_version: Package version string.
+    :param wheel_plat: Wheel platform tag.
+    :param profile: Extraction profile with the toolchain files to skip.
+    :param compression: Compression policy for the wheel files.
+    :return: Path to the created wheel file.
+    """
+    print(f"\nStreaming toolchain file into a wheel: {file_path.name}")
+    package_path = project_path / "src" / PACKAGE_NAME
+    if not package_path.is_dir():
+        raise FileNotFoundError(f"Package directory not found: {package_path}")
+    if not file_path.is_file():
+        raise FileNotFoundError(f"File to uncompress not found: {file_path}")
+
+    project_name = get_distribution_name(PROJECT_NAME, profile).replace("-", "_")
+    wheel_path = dist_path / get_wheel_file_name(package_version, wheel_plat, profile)
+    with WheelWriter(
+        wheel_path,
+        project_name,
+        package_version,
+        f"py3-none-{wheel_plat}",
+        compression,
+    ) as wheel:
+        gcc_folder = None
+        bin_files = []
+        links = []
+        members = iter_archive_members(file_path)
+        for member in filter_members(members, profile):
+            name = posixpath.normpath(member.name)
+            if name.startswith(("/", "../")) or name == "..":
+                raise ValueError(f"Archive member outside the toolchain folder: {name}")
+            top_folder = name.split("/")[0]
+            if gcc_folder is None:
+                gcc_folder = top_folder
+            elif top_folder != gcc_folder:
+                raise ValueError(f"Archive has more than one top folder: {top_folder}")
+            if member.type == "dir" or name == gcc_folder:
+                continue
+
+            # Same executables discovery as create_package_files()
+            if name.split("/")[1] == "bin":
+                bin_files.append(posixpath.basename(name))
+
+            arcname = f"{PACKAGE_NAME}/{name}"
+            if member.type in ("link", "hardlink"):
+                # Wheels can't contain links, so they are added as file copies
+                links.append((arcname, f"{PACKAGE_NAME}/{member.link}"))
+            else:
+                wheel.add_stream(arcname, member.fileobj, member.mode, member.mtime)
+        if gcc_folder is None:
+            raise FileNotFoundError(f"No files found in the archive: {file_path}")
+
+        # Symlinks can point to files later in the archive, or other links
+        while links:
+            pending_links = []
+            for arcname, target in links:
+                if target in wheel:
+                    wheel.copy_entry(target, arcname)
+                elif any(name.startswith(f"{target}/") for name in wheel.names):
+                    # A symlink to a folder
+                    for name in wheel.names:
+                        if name.startswith(f"{target}/"):
+                            wheel.copy_entry(name, arcname + name[len(target) :])
+                else:
+                    pending_links.append((arcname, target))
+            if len(pending_links) == len(links):
+                for arcname, target in pending_links:
+                    print(f"Skipping broken link: {arcname} -> {target}")
+                break
+            links = pending_links
+
+        # Add the package Python files and the generated launchers
+        bin_launchers = get_bin_launchers(bin_files)
+        launcher_files = generate_launcher_files(
+            package_path, Path(gcc_folder), bin_launchers
+        )
+        for py_file in sorted(package_path.glob("*.py")):
+            if is_template_file(py_file.name):
+                wheel.add_bytes(f"{PACKAGE_NAME}/{py_file.name}", py_file.read_bytes())
+        for file_name, launcher_code in launcher_files.items():
+            wheel.add_bytes(f"{PACKAGE_NAME}/{file_name}", launcher_code.encode())
+
+        pyproject = tomli.loads(
+            generate_pyproject_toml(
+                project_path, package_version, bin_launchers, profile
+            )
+        )
+        metadata, wheel_sha256 = close_wheel(wheel, project_path, pyproject)
+
+    write_sha256_file(wheel_path, wheel_sha256)
+    metadata_file = wheel_path.with_suffix(f"{wheel_path.suffix}.metadata")
+    write_bytes_with_sha256(metadata_file, metadata.encode())
+    return wheel_path
+
+
+def build_wheel(
+    package_path: Path,
+    dist_path: Path,
+    wheel_plat: str,
+    compression: str = DEFAULT_POLICY,
+) -> Path:
+    """
+    Create a Python wheel from the package directory, with the platform tag,
+    written directly instead of building it with pip and retagging it.
+
+    The wheel includes the package Python files and the GCC toolchain folder,
+    the same files as the MANIFEST.in. The wheel metadata file and the
+    SHA-256 files for both are saved next to the wheel as well.
+
+    :param package_path: Path to the project directory with pyproject.toml.
+    :param dist_path: Path to the directory to save the wheel.
+    :param wheel_plat: Wheel platform tag.
+    :param compression: Compression policy for the wheel files, see
+        compression_policies.POLICIES.
     :return: Path to the created wheel file.
     """
     print(f"\nCreating Python wheel from: {package_path.relative_to(Path.cwd())}")
     if not package_path.is_dir():
         raise FileNotFoundError(f"Package directory not found: {package_path}")
+    src_path = package_path / "src" / PACKAGE_NAME
 
-    # Generate the expected wheel file name from the pyproject.toml
     with open(package_path / "pyproject.toml", "rb") as file:
         pyproject_toml = tomli.load(file)
     project_name = pyproject_toml["project"]["name"].replace("-", "_")
     project_version = pyproject_toml["project"]["version"]
-    wheel_path = dist_path / f"{project_name}-{project_version}-py3-none-any.whl"
-    if wheel_path.is_file():
-        raise FileExistsError(
-            f"Wheel file about to be created already exists: {wheel_path}"
-        )
-
-    subprocess.run(
-        [
-            sys.executable,
-            "-m",
-            "pip",
-            "wheel",
-            "--wheel-dir",
-            str(dist_path),
-            ".",
-        ],
-        check=True,
-        cwd=package_path,
-    )
-
-    if not wheel_path.is_file():
-        raise FileNotFoundError(f"Wheel file not created: {wheel_path}")
-
-    new_wheel_path = (
+    wheel_path = (
         dist_path / f"{project_name}-{project_version}-py3-none-{wheel_plat}.whl"
     )
-    if new_wheel_path.is_file():
-        raise FileExistsError(
-            f"Wheel file with the platform tag already exists: {new_wheel_path}"
-        )
-
-    subprocess.run(
-        [
-            sys.executable,
-            "-m",
-            "wheel",
-            "tags",
-            "--platform-tag",
-            wheel_plat,
-            wheel_path.name,
-        ],
-        check=True,
-        cwd=dist_path,
-    )
-    wheel_path.unlink()
-
-    if not new_wheel_path.is_file():
-        raise FileNotFoundError(
-            f"Wheel file with the platform tag not created: {new_wheel_path}"
-        )
-
-    return new_wheel_path
+    with WheelWriter(
+        wheel_path,
+        project_name,
+        project_version,
+        f"py3-none-{wheel_plat}",
+        compression,
+    ) as wheel:
+        for item in sorted(src_path.iterdir()):
+            if item.is_file() and item.suffix == ".py":
+                wheel.add_file(f"{PACKAGE_NAME}/{item.name}", item)
+            elif item.is_dir() and item.name != "__pycache__":
+                # The toolchain folder, symlinks are stored as file copies
+                for root, dirs, files in os.walk(item, followlinks=True):
+                    dirs.sort()
+                    root_path = Path(root)
+                    for file_name in sorted(files):
+                        file_path = root_path / file_name
+                        arcname = file_path.relative_to(src_path).as_posix()
+                        wheel.add_file(f"{PACKAGE_NAME}/{arcname}", file_path)
+        metadata, wheel_sha256 = close_wheel(wheel, package_path, pyproject_toml)
+
+    write_sha256_file(wheel_path, wheel_sha256)
+    metadata_file = wheel_path.with_suffix(f"{wheel_path.suffix}.metadata")
+    write_bytes_with_sha256(metadata_file, metadata.encode())
+    return wheel_path
 
 
 def create_sha256_hash(file_path: Path) -> str:
@@ -401,42 +852,7 @@ def create_sha256_hash(file_path: Path) -> str:
     :param file_path: Path to the file to hash.
     :return: SHA256 hash file path.
     """
-    sha256_hash = hashlib.sha256()
-    with open(file_path, "rb") as file:
-        for chunk in iter(lambda: file.read(4096), b""):
-            sha256_hash.update(chunk)
-    sha256_file_path = file_path.with_suffix(f"{file_path.suffix}.sha256")
-    with open(sha256_file_path, "w") as file:
-        file.write(f"{sha256_hash.hexdigest()} {file_path.name}\n")
-    return sha256_file_path
-
-
-def get_package_metadata(package_path: Path) -> str:
-    """
-    Gets the package metadata created during the wheel creation.
-
-    It will be in the same directory where the package folder is, as the
-    <package>.egg-info folder.
-
-    :param package_path: Path to the package directory.
-    :return: The contents of the <package>.egg-info/PKG-INFO file.
-    """
-    package_path = package_path.resolve()
-    if not package_path.is_dir():
-        raise FileNotFoundError(f"Package directory not found: {package_path}")
-    egg_info_folder = None
-    for item in package_path.parent.iterdir():
-        if item.is_dir() and item.name.endswith(".egg-info"):
-            egg_info_folder = item
-            break
-    if egg_info_folder is None:
-        raise FileNotFoundError(f"Package metadata folder not found in: {package_path}")
-    pkg_info_file = egg_info_folder / "PKG-INFO"
-    if not pkg_info_file.is_file():
-        raise FileNotFoundError(
-            f"Package metadata file not found in: {egg_info_folder}"
-        )
-    return pkg_info_file.read_text()
+    return write_sha256_file(file_path, sha256_file_hash(file_path))
 
 
 def build_pypi_source_dist(
@@ -461,9 +877,7 @@ def build_pypi_source_dist(
     wheel_path = wheel_path.resolve()
 
     # Generate the expected source distribution file name from wheel filename
-    wheel_name = wheel_path.name
-    source_dist_name = wheel_name.split("-py3-none-")[0] + ".tar.gz"
-    source_dist_path = dist_path / source_dist_name
+    source_dist_path = dist_path / get_source_dist_name(wheel_path.name)
     if source_dist_path.is_file():
         raise FileExistsError(
             f"Source distribution file about to be created already exists: {source_dist_path}"
@@ -488,10 +902,190 @@ def build_pypi_source_dist(
         raise FileNotFoundError(
             f"Source distribution file not created: {source_dist_path}"
         )
+    # It's created by a separate process, but it's only a few KBs to hash
+    create_sha256_hash(source_dist_path)
 
     return source_dist_path
 
 
+def build_gcc_release(
+    gcc_release: GccInfo,
+    package_root: Path,
+    dist_path: Path,
+    download_path: Path = Path.cwd(),
+    show_progress: bool = True,
+    cache_dir: Optional[Path] = download_cache.DEFAULT_CACHE_DIR,
+    stream: bool = False,
+    profile: str = DEFAULT_PROFILE,
+    dedup: str = "off",
+    strip: bool = False,
+    compression: str = DEFAULT_POLICY,
+) -> BuildResult:
+    """
+    Download and uncompress the GCC release, create the package files and
+    build the wheel, metadata and hash files for it.
+
+    :param gcc_release: GCC release info for a single OS/arch.
+    :param package_root: Path to the package project directory.
+    :param dist_path: Path to the directory to save the wheel and metadata.
+    :param download_path: Path to save the downloaded toolchain file.
+    :param show_progress: Display the download progress bar.
+    :param cache_dir: Path to the download cache, or None to disable it.
+    :param stream: Build the wheel directly from the compressed toolchain,
+        instead of extracting it first.
+    :param profile: Extraction profile with the toolchain files to package.
+    :param dedup: Deduplication mode, "report" to print the duplicated files,
+        or "bin" to also package each duplicated executable only once.
+    :param strip: Strip the host executables and libraries.
+    :param compression: Compression policy for the wheel files.
+    :return: Path to the created wheel file and the build stats.
+    """
+    if dedup not in DEDUP_MODES:
+        raise ValueError(f"Unknown dedup mode '{dedup}', options: {DEDUP_MODES}")
+    if stream and (dedup != "off" or strip):
+        raise ValueError("The dedup and strip modes need the extracted toolchain")
+    stats = {}
+    package_path = package_root / "src" / PACKAGE_NAME
+    package_version = generate_package_version(gcc_release.release_name)
+
+    print("\nDownloading GCC toolchain")
+    gcc_zip_file = get_toolchain(
+        gcc_release.files, download_path, show_progress, cache_dir
+    )
+    dist_path.mkdir(exist_ok=True)
+    if stream:
+        print("\nBuilding Python wheel from the compressed toolchain")
+        wheel_path = build_wheel_from_archive(
+            gcc_zip_file,
+            package_root,
+            dist_path,
+            package_version,
+            gcc_release.files["wheel_plat"],
+            profile,
+            compression,
+        )
+    else:
+        # Uncompress the GCC release in the package directory
+        print("\nUncompressing GCC toolchain")
+        gcc_path = uncompress_toolchain(gcc_zip_file, package_path, profile=profile)
+
+        # Before finding duplicates, as only identical files strip the same
+        if strip:
+            print("\nStripping host binaries")
+            strip_result = strip_host_binaries(gcc_path)
+            saved_size = strip_result.size_before - strip_result.size_after
+            print(
+                f"Stripped {strip_result.files} host binaries, "
+                f"{strip_result.size_before / 1024 / 1024:.1f} MB -> "
+                f"{strip_result.size_after / 1024 / 1024:.1f} MB "
+                f"({strip_result.failed} could not be stripped)"
+            )
+            stats["stripped_files"] = strip_result.files
+            stats["strip_saved_bytes"] = saved_size
+
+        duplicates = None
+        if dedup != "off":
+            print("\nFinding duplicated files")
+            duplicate_groups = find_duplicates(gcc_path)
+            print_dedup_report(gcc_path, duplicate_groups)
+            if dedup == "bin":
+                duplicates = get_executable_duplicates(gcc_path, duplicate_groups)
+
+        # Create the package files with the GCC toolchain folder inside
+        print("\nCreating Python package files")
+        create_package_files(
+            package_root, package_path, gcc_path, package_version, duplicates, profile
+        )
+        if duplicates:
+            removed_size = remove_duplicates(gcc_path, duplicates)
+            print(
+                f"\nRemoved {len(duplicates)} duplicated executables "
+                f"({removed_size / 1024 / 1024:.1f} MB), restored on first use"
+            )
+
+        print("\nBuilding Python wheel")
+        wheel_path = build_wheel(
+            package_root, dist_path, gcc_release.files["wheel_plat"], compression
+        )
+    return BuildResult(wheel_path, stats)
+
+
+def is_template_file(name: str) -> bool:
+    """Check a project file name is part of the package template."""
+    if name == PACKAGE_NAME:
+        return True
+    return not any(
+        fnmatch.fnmatch(name, pattern) for pattern in PACKAGE_TEMPLATE_GENERATED
+    )
+
+
+def _ignore_generated_files(directory: str, names: List[str]) -> List[str]:
+    """shutil.copytree() ignore function to skip generated package files."""
+    return [name for name in names if not is_template_file(name)]
+
+
+def build_gcc_release_isolated(
+    gcc_release: GccInfo,
+    dist_path: Path,
+    cache_dir: Optional[Path] = download_cache.DEFAULT_CACHE_DIR,
+    stream: bool = False,
+    profile: str = DEFAULT_PROFILE,
+    dedup: str = "off",
+    strip: bool = False,
+    compression: str = DEFAULT_POLICY,
+) -> BuildResult:
+    """
+    Build a GCC release wheel in its own staging directory, so that multiple
+    platforms can be built at the same time in different processes.
+
+    The package template is copied into STAGING_ROOT/<os_arch>/, the build
+    runs in there, and the final files are moved into the dist directory.
+
+    :param gcc_release: GCC release info for a single OS/arch.
+    :param dist_path: Path to the directory to move the built files into.
+    :param cache_dir: Path to the download cache, or None to disable it.
+    :param stream: Build the wheel directly from the compressed toolchain.
+    :param profile: Extraction profile with the toolchain files to package.
+    :param dedup: Deduplication mode, "off", "report" or "bin".
+    :param strip: Strip the host executables and libraries.
+    :param compression: Compression policy for the wheel files.
+    :return: Path to the wheel file in the dist directory and the build stats.
+    """
+    staging_path = STAGING_ROOT / gcc_release.os_arch
+    if staging_path.exists():
+        shutil.rmtree(staging_path)
+    staging_path.mkdir(parents=True)
+    package_root = staging_path / PROJECT_NAME
+    shutil.copytree(PACKAGE_ROOT, package_root, ignore=_ignore_generated_files)
+
+    # Each staging directory has its own dist folder, so only this build
+    # files are moved into the final dist directory
+    staging_dist = staging_path / "dist"
+    staging_wheel, stats = build_gcc_release(
+        gcc_release,
+        package_root,
+        staging_dist,
+        staging_path,
+        show_progress=False,
+        cache_dir=cache_dir,
+        stream=stream,
+        profile=profile,
+        dedup=dedup,
+        strip=strip,
+        compression=compression,
+    )
+
+    dist_path.mkdir(exist_ok=True)
+    for file in staging_dist.iterdir():
+        if file.name.startswith(staging_wheel.name):
+            destination = dist_path / file.name
+            if destination.exists():
+                raise FileExistsError(f"File already exists in dist: {destination}")
+            shutil.move(str(file), str(destination))
+    shutil.rmtree(staging_path)
+    return BuildResult(dist_path / staging_wheel.name, stats)
+
+
 def build_package_for_local_machine() -> None:
     print(f"Project directory: {PACKAGE_ROOT.relative_to(Path.cwd())}")
     if not PACKAGE_ROOT.is_dir() or not PACKAGE_PATH.is_dir():
@@ -499,26 +1093,10 @@ def build_package_for_local_machine() -> None:
             f"Project/Package directory not found:\n\t{PACKAGE_ROOT}\n\t{PACKAGE_PATH}"
         )
 
-    gcc_releases_list = get_gcc_releases()
+    gcc_releases_list = get_gcc_releases("latest", (None, None))
     for gcc_release in gcc_releases_list:
-        print(f"GCC release: {gcc_release.release_name} ({gcc_release.arch})\n")
-
-        gcc_zip_file = download_toolchain(gcc_release.files["url"])
-        gcc_path = uncompress_toolchain(gcc_zip_file, PACKAGE_PATH)
-        create_package_files(
-            PACKAGE_ROOT,
-            PACKAGE_PATH,
-            gcc_path,
-            generate_package_version(gcc_release.release_name),
-        )
-        wheel_path = build_wheel(
-            PACKAGE_ROOT, PACKAGE_ROOT / "dist", gcc_release.files["wheel_plat"]
-        )
-        metadata = get_package_metadata(PACKAGE_PATH)
-        metadata_file = wheel_path.with_suffix(f"{wheel_path.suffix}.metadata")
-        metadata_file.write_text(metadata)
-        create_sha256_hash(metadata_file)
-        create_sha256_hash(wheel_path)
+        print(f"GCC release: {gcc_release.release_name} ({gcc_release.os_arch})\n")
+        build_gcc_release(gcc_release, PACKAGE_ROOT, PACKAGE_ROOT / "dist")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+import os
+import json
+import hashlib
+from pathlib import Path
+from typing import Optional
+
+# The cache directory can be moved with this environmental variable (e.g. to a
+# folder persisted between CI runs), by default it is in the user cache folder
+CACHE_DIR_ENV_VAR = "ARM_GCC_PACKAGE_RELEASE_CACHE_DIR"
+DEFAULT_CACHE_DIR = Path(
+    os.environ.get(
+        CACHE_DIR_ENV_VAR,
+        Path.home() / ".cache" / "arm-none-eabi-gcc-py-package" / "releases",
+    )
+)
+# Increase it when the cached data changes, to discard the old cache files
+CACHE_FORMAT = 1
+
+
+def get_cache_file(repo_name: str, cache_dir: Path = DEFAULT_CACHE_DIR) -> Path:
+    """:return: Path to the release cache file of a GitHub repository."""
+    return cache_dir / f"{repo_name.replace('/', '__')}.json"
+
+
+def load_release_cache(repo_name: str, cache_dir: Path = DEFAULT_CACHE_DIR) -> dict:
+    """
+    Load the cache of a GitHub repository releases, with:
+    - "pages": Release list API URL to its ETag, next page URL and releases,
+      to make conditional requests.
+    - "releases": Release ID to its assets signature and wheels data, as a
+      published release only changes if its assets are modified.
+
+    :param repo_name: GitHub repository name.
+    :param cache_dir: Path to the cache directory.
+    :return: The release cache, empty if it doesn't exist or can't be read.
+    """
+    empty_cache = {"format": CACHE_FORMAT, "pages": {}, "releases": {}}
+    try:
+        cache = json.loads(get_cache_file(repo_name, cache_dir).read_text())
+    except (OSError, ValueError):
+        return empty_cache
+    if cache.get("format") != CACHE_FORMAT:
+        return empty_cache
+    return cache
+
+
+def save_release_cache(
+    repo_name: str, cache: dict, cache_dir: Path = DEFAULT_CACHE_DIR
+) -> None:
+    """
+    Save the release cache, replacing it atomically so an interrupted run
+    never leaves a corrupted cache.
+
+    :param repo_name: GitHub repository name.
+    :param cache: The release cache from load_release_cache().
+    :param cache_dir: Path to the cache directory.
+    """
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    cache_file = get_cache_file(repo_name, cache_dir)
+    tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    tmp_file.write_text(json.dumps(cache, indent=2, sort_keys=True) + "\n")
+    tmp_file.replace(cache_file)
+
+
+def get_assets_signature(release: dict) -> str:
+    """
+    :param release: Release object from the GitHub API.
+    :return: Hash of the ID, name, size and last update of all the release
+        assets, which changes if any asset is added, removed or replaced.
+    """
+    assets = sorted(
+        (asset["id"], asset["name"], asset["size"], asset["updated_at"])
+        for asset in release["assets"]
+    )
+    return hashlib.sha256(json.dumps(assets).encode()).hexdigest()
+
+
+def get_cached_wheels(cache: dict, release: dict) -> Optional[list]:
+    """
+    :param cache: The release cache.
+    :param release: Release object from the GitHub API.
+    :return: The cached wheels data of the release, or None if it's not cached
+        or its assets have changed.
+    """
+    cached_release = cache["releases"].get(str(release["id"]))
+    if cached_release is None:
+        return None
+    if cached_release["signature"] != get_assets_signature(release):
+        return None
+    return cached_release["wheels"]
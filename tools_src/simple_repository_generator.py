@@ -1,16 +1,39 @@
 #!/usr/bin/env python3
 # -*- coding:utf-8 -*-
+import io
+import os
 import re
-import hashlib
+import html
+import gzip
+import json
 from pathlib import Path
-from typing import Dict, List
-from dataclasses import dataclass
-
-import requests
-from github import Github
-from rich.progress import Progress, BarColumn, DownloadColumn, TransferSpeedColumn
+from urllib.parse import quote
+from typing import Dict, List, Optional, Tuple
+from dataclasses import asdict, dataclass
+from concurrent.futures import ThreadPoolExecutor
 
 from tools_src.package_creator import PROJECT_NAME
+from tools_src.gh_releases import (
+    DEFAULT_CONCURRENCY,
+    GH_API_URL,
+    create_session,
+    fetch_all_text,
+    get_releases,
+    index_assets,
+)
+from tools_src.hash_resolver import HashRequest, resolve_sha256s
+from tools_src.hashing import get_sha256_file_path, sha256_file_hash, write_sha256_file
+from tools_src.release_cache import (
+    DEFAULT_CACHE_DIR,
+    get_assets_signature,
+    get_cached_wheels,
+    load_release_cache,
+    save_release_cache,
+)
+
+
+# The PEP 691 JSON API version, the same as the HTML pages
+PEP691_API_VERSION = "1.0"
 
 
 @dataclass
@@ -23,134 +46,313 @@ class WheelData:
     python_requires: str = "&gt;=3.6"  # Default to Python 3.6+
 
 
+# A wheel asset, its metadata file asset (if any) and its SHA-256 file URLs
+WheelAssets = Tuple[dict, Optional[dict], Dict[str, str]]
+
+
 def normalise_project_name(name):
     return re.sub(r"[-_.]+", "-", name).lower()
 
 
+def parse_sha256_file(contents: str, url: str) -> str:
+    """
+    :param contents: SHA-256 file contents, "<sha256 hash> filename\n".
+    :param url: The file URL, for the error message.
+    :return: The SHA-256 hex digest.
+    """
+    sha256 = contents.strip().split()[0] if contents.strip() else ""
+    if len(sha256) != 64:
+        raise ValueError(f"Invalid SHA-256 in {url}:\n{contents.strip()}\n{sha256}")
+    return sha256
+
+
+def get_asset_digest(asset: dict) -> str:
+    """:return: The SHA-256 GitHub calculated for a release asset, if any."""
+    digest = asset.get("digest") or ""
+    return digest[len("sha256:") :] if digest.startswith("sha256:") else ""
+
+
 def get_gh_releases_wheel_urls(
-    repo_name: str, token=None
+    repo_name: str,
+    token=None,
+    api_url: str = GH_API_URL,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    cache: Optional[dict] = None,
+    hash_cache_dir: Optional[Path] = DEFAULT_CACHE_DIR,
+    dist_paths: Optional[List[Path]] = None,
 ) -> Dict[str, List[WheelData]]:
-    """Get wheel URLs from GitHub Releases."""
-    gh = Github(token) if token else Github()
-    repo = gh.get_repo(repo_name)
-    wheel_files = {}
-    for release in repo.get_releases():
-        wheel_files[release.tag_name] = []
-        release_assets = list(release.get_assets())
-        for asset_wheel in release_assets:
-            if not asset_wheel.name.endswith(".whl"):
+    """
+    Get wheel URLs from GitHub Releases.
+
+    The releases are listed with their assets, and the SHA-256 files of all
+    the wheels and metadata files are then fetched concurrently.
+
+    With a release cache only the new releases, or the releases with modified
+    assets, are crawled, and the cache is updated with them.
+
+    Files without a SHA-256 file, or GitHub digest, are hashed only once, from
+    a local copy if possible, see hash_resolver.resolve_sha256s().
+
+    :param repo_name: GitHub repository name.
+    :param token: GitHub token for the API requests, optional.
+    :param api_url: Base URL of the GitHub API, or a local stand-in for it.
+    :param concurrency: Maximum number of requests at the same time.
+    :param cache: Release cache from release_cache.load_release_cache().
+    :param hash_cache_dir: Path to the hash cache, or None to disable it.
+    :param dist_paths: Folders with local copies of the wheels.
+    :return: Dictionary of release tag to the wheels in that release.
+    """
+    session = create_session(token, concurrency)
+    releases = get_releases(
+        session, repo_name, api_url, cache["pages"] if cache else None
+    )
+
+    wheels_by_release = {}  # type: Dict[int, List[WheelData]]
+    releases_to_crawl = []
+    for release in releases:
+        cached_wheels = get_cached_wheels(cache, release) if cache else None
+        if cached_wheels is None:
+            releases_to_crawl.append(release)
+        else:
+            wheels_by_release[release["id"]] = [
+                WheelData(**wheel) for wheel in cached_wheels
+            ]
+    if cache:
+        print(
+            f"\t{len(wheels_by_release)} releases cached, "
+            f"{len(releases_to_crawl)} new or modified"
+        )
+
+    # Find the wheels and their sidecar files in each release
+    release_assets = {}  # type: Dict[int, List[WheelAssets]]
+    sha256_urls = []  # type: List[str]
+    for release in releases_to_crawl:
+        assets = index_assets(release)
+        wheel_assets = []
+        for name, asset_wheel in assets.items():
+            if not name.endswith(".whl"):
                 continue
+            print(f"\tFound wheel: {name}")
+            wheel_url = asset_wheel["browser_download_url"]
+            metadata = assets.get(f"{name}.metadata")
+            if metadata and metadata["browser_download_url"] != f"{wheel_url}.metadata":
+                raise ValueError(
+                    f"Metadata file URL doesn't match the wheel URL:\n"
+                    f"\tWheel:    {wheel_url}\n"
+                    f"\tMetadata: {metadata['browser_download_url']}"
+                )
+            sidecars = {
+                key: assets[f"{name}{suffix}"]["browser_download_url"]
+                for key, suffix in (
+                    ("sha256", ".sha256"),
+                    ("metadata_sha256", ".metadata.sha256"),
+                )
+                if f"{name}{suffix}" in assets
+            }
+            if "metadata_sha256" in sidecars and not metadata:
+                raise ValueError(
+                    f"Metadata SHA-256 found without a metadata file for {name}"
+                )
+            sha256_urls.extend(sidecars.values())
+            wheel_assets.append((asset_wheel, metadata, sidecars))
+        release_assets[release["id"]] = wheel_assets
+
+    if sha256_urls:
+        print(f"\tFetching {len(sha256_urls)} SHA-256 files")
+    sha256_files = fetch_all_text(session, sha256_urls, concurrency)
 
-            print(f"\n\tFound wheel: {asset_wheel.name}")
-            # Look for the respective metadata file and both sha256 files
-            # We don't expect more than 10-20 assets, so fine to iterate again
+    hash_requests = []
+    for release_id, wheel_assets in release_assets.items():
+        wheels_by_release[release_id] = []
+        for asset_wheel, metadata, sidecars in wheel_assets:
+            name = asset_wheel["name"]
+            wheel_url = asset_wheel["browser_download_url"]
             wheel_sha256 = None
-            metadata_url = ""
+            if "sha256" in sidecars:
+                # Only valid if it's the hash for this wheel file name
+                contents = sha256_files[sidecars["sha256"]]
+                if name in contents:
+                    wheel_sha256 = parse_sha256_file(contents, sidecars["sha256"])
+            metadata_url = metadata["browser_download_url"] if metadata else ""
             metadata_sha256 = ""
-            for asset in release_assets:
-                if asset.name == f"{asset_wheel.name}.sha256":
-                    # This file will be in the format "<sha256 hash> filename.whl\n"
-                    with requests.get(asset.browser_download_url) as r:
-                        sha256_file_contents = r.text.strip()
-                    if asset_wheel.name in sha256_file_contents:
-                        wheel_sha256 = sha256_file_contents.split()[0]
-                        if len(wheel_sha256) != 64:
-                            raise ValueError(
-                                f"Invalid SHA-256 in {asset.browser_download_url}: \n"
-                                f"{sha256_file_contents}\n"
-                                f"{wheel_sha256}"
-                            )
-                        print(f"\tFound wheel SHA-256 ({wheel_sha256}) in\n")
-                        print(f"\t\t{asset.name}")
-                elif asset.name == f"{asset_wheel.name}.metadata":
-                    # Ensure the URL is the same as the wheel URL + ".metadata" extension
-                    if (
-                        asset.browser_download_url
-                        != asset_wheel.browser_download_url + ".metadata"
-                    ):
-                        raise ValueError(
-                            f"Metadata file URL doesn't match the wheel URL:\n"
-                            f"\tWheel:    {asset_wheel.browser_download_url}\n"
-                            f"\tMetadata: {asset.browser_download_url}"
-                        )
-                    metadata_url = asset.browser_download_url
-                    print(f"\tFound metadata: {asset.name}")
-                elif asset.name == f"{asset_wheel.name}.metadata.sha256":
-                    with requests.get(asset.browser_download_url) as r:
-                        metadata_sha256_file = r.text.strip()
-                    metadata_sha256 = metadata_sha256_file.split()[0]
-                    if len(metadata_sha256) != 64:
-                        raise ValueError(
-                            f"Invalid SHA-256 in {asset.browser_download_url}:\n"
-                            f"{metadata_sha256_file}\n"
-                            f"{metadata_sha256}"
+            if "metadata_sha256" in sidecars:
+                metadata_sha256 = parse_sha256_file(
+                    sha256_files[sidecars["metadata_sha256"]],
+                    sidecars["metadata_sha256"],
+                )
+
+            if metadata and not metadata_sha256:
+                print(f"\tMetadata file found without a SHA-256 for {name}")
+                metadata_sha256 = get_asset_digest(metadata)
+                if not metadata_sha256:
+                    hash_requests.append(
+                        HashRequest(
+                            metadata_url,
+                            metadata["name"],
+                            metadata["size"],
+                            metadata["id"],
+                            metadata["updated_at"],
                         )
-                    print(
-                        f"\tFound metadata SHA-256 ({metadata_sha256}) in\n\t\t{asset.name}"
                     )
-
-            if not metadata_url and metadata_sha256:
-                raise ValueError(
-                    f"Metadata SHA-256 found without a metadata file for {asset_wheel.name}"
-                )
-            if metadata_url and not metadata_sha256:
-                print(f"\tMetadata file found without a SHA-256 for {asset_wheel.name}")
-                metadata_sha256 = calculate_sha256(metadata_url)
             if wheel_sha256 is None:
-                print(f"\tCouldn't find matching SHA-256 for {asset_wheel.name}")
-                wheel_sha256 = calculate_sha256(asset_wheel.browser_download_url)
+                print(f"\tCouldn't find matching SHA-256 for {name}")
+                wheel_sha256 = get_asset_digest(asset_wheel)
+                if not wheel_sha256:
+                    hash_requests.append(
+                        HashRequest(
+                            wheel_url,
+                            name,
+                            asset_wheel["size"],
+                            asset_wheel["id"],
+                            asset_wheel["updated_at"],
+                        )
+                    )
 
-            wheel_files[release.tag_name].append(
+            wheels_by_release[release_id].append(
                 WheelData(
-                    name=asset_wheel.name,
-                    url=asset_wheel.browser_download_url,
-                    sha256=wheel_sha256,
+                    name=name,
+                    url=wheel_url,
+                    sha256=wheel_sha256 or "",
                     metadata_url=metadata_url,
                     metadata_sha256=metadata_sha256,
                 )
             )
 
-    return wheel_files
+    if hash_requests:
+        print(f"\tResolving {len(hash_requests)} missing SHA-256 hashes")
+        sha256s = resolve_sha256s(
+            hash_requests, hash_cache_dir, dist_paths, concurrency
+        )
+        for wheels in wheels_by_release.values():
+            for wheel in wheels:
+                wheel.sha256 = wheel.sha256 or sha256s[wheel.url]
+                if wheel.metadata_url and not wheel.metadata_sha256:
+                    wheel.metadata_sha256 = sha256s[wheel.metadata_url]
+
+    if cache is not None:
+        # Only keep the current releases
+        cache["releases"] = {
+            str(release["id"]): {
+                "tag_name": release["tag_name"],
+                "signature": get_assets_signature(release),
+                "wheels": [asdict(wheel) for wheel in wheels_by_release[release["id"]]],
+            }
+            for release in releases
+        }
+    return {
+        release["tag_name"]: wheels_by_release[release["id"]] for release in releases
+    }
 
 
-def calculate_sha256(url: str) -> str:
-    """Calculates the SHA-256 hash of a file available at the given URL."""
+def read_sha256_file(file_path: Path) -> Optional[str]:
+    """
+    :param file_path: Path to a file with a SHA-256 sidecar file.
+    :return: The SHA-256 from the sidecar file, or None if it doesn't exist
+        or is for a different file name.
+    """
+    sha256_file = get_sha256_file_path(file_path)
+    if not sha256_file.is_file():
+        return None
+    contents = sha256_file.read_text()
+    if contents.split()[1:] != [file_path.name]:
+        return None
+    return parse_sha256_file(contents, str(sha256_file))
 
-    def _calculate_sha256(url: str) -> str:
-        sha256_hash = hashlib.sha256()
-        response = requests.get(url, stream=True)
-        total_size = int(response.headers.get("content-length", 0))
-        chunk_size = 8192
 
-        print(f"\tDownloading & hashing: {url.split('/')[-1]}")
-        with Progress(
-            "[progress.description]{task.description}",
-            BarColumn(),
-            "[progress.percentage]{task.percentage:>3.0f}%",
-            DownloadColumn(),
-            TransferSpeedColumn(),
-        ) as progress:
-            task = progress.add_task(f"{' ' * 12}", total=total_size)
-            for chunk in response.iter_content(chunk_size=chunk_size):
-                sha256_hash.update(chunk)
-                progress.update(task, advance=len(chunk))
+def get_local_wheels(
+    from_dir: Path,
+    base_url: str,
+    jobs: Optional[int] = None,
+    write_sha256_files: bool = False,
+) -> Dict[str, List[WheelData]]:
+    """
+    Get the wheels from a local folder, e.g. a copy of the files served by a
+    static file server, without any network requests.
 
-        return sha256_hash.hexdigest()
+    The hashes are read from the .sha256 sidecar files, and only the wheels
+    and metadata files without a valid one are hashed, in parallel.
 
-    for i in range(1, 4):
-        try:
-            return _calculate_sha256(url)
-        except requests.exceptions.ConnectionError:
-            print(f"\tFailed attempt {i} to download file at {url}.")
-            if i == 3:
-                raise
-            else:
-                print("\tRetrying...")
+    :param from_dir: Folder with the wheels, .metadata and .sha256 files.
+    :param base_url: URL the files in the folder are served from.
+    :param jobs: Number of files to hash in parallel, defaults to the CPUs.
+    :param write_sha256_files: Create the missing sidecar files in the folder,
+        so the next run doesn't hash the files again.
+    :return: Dictionary of version to the wheels with that version.
+    """
+    if not from_dir.is_dir():
+        raise FileNotFoundError(f"Wheels folder not found: {from_dir}")
+    base_url = base_url.rstrip("/")
+    wheel_paths = sorted(from_dir.glob("*.whl"))
+    metadata_paths = [
+        wheel_path.with_name(f"{wheel_path.name}.metadata")
+        for wheel_path in wheel_paths
+    ]
+    sha256s = {}  # type: Dict[Path, str]
+    files_to_hash = []
+    for path in wheel_paths + [path for path in metadata_paths if path.is_file()]:
+        sha256 = read_sha256_file(path)
+        if sha256 is None:
+            files_to_hash.append(path)
+        else:
+            sha256s[path] = sha256
 
+    if files_to_hash:
+        print(f"\tHashing {len(files_to_hash)} files without a SHA-256 file")
+        with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+            for path, sha256 in zip(
+                files_to_hash, executor.map(sha256_file_hash, files_to_hash)
+            ):
+                sha256s[path] = sha256
+                if write_sha256_files:
+                    print(f"\tCreated: {write_sha256_file(path, sha256).name}")
 
-def gen_repo_html(packages: Dict[str, Dict[str, List[WheelData]]], output: Path) -> str:
-    """Generate HTML files for the simple repository."""
-    output.mkdir(parents=True, exist_ok=False)
+    wheels = {}  # type: Dict[str, List[WheelData]]
+    for wheel_path, metadata_path in zip(wheel_paths, metadata_paths):
+        print(f"\tFound wheel: {wheel_path.name}")
+        wheel_url = f"{base_url}/{quote(wheel_path.name)}"
+        has_metadata = metadata_path in sha256s
+        # Wheel file names are "{name}-{version}-{tags}.whl"
+        version = wheel_path.name.split("-")[1]
+        wheels.setdefault(version, []).append(
+            WheelData(
+                name=wheel_path.name,
+                url=wheel_url,
+                sha256=sha256s[wheel_path],
+                metadata_url=f"{wheel_url}.metadata" if has_metadata else "",
+                metadata_sha256=sha256s[metadata_path] if has_metadata else "",
+            )
+        )
+    return wheels
+
+
+def write_if_changed(file_path: Path, contents: str) -> bool:
+    """
+    Write a file only if its contents are different, so unchanged pages keep
+    their modification time, together with a gzip compressed copy of it
+    (<file>.gz) for web servers that can serve precompressed files.
+
+    :return: True if the file was written.
+    """
+    gz_path = file_path.with_name(f"{file_path.name}.gz")
+    if file_path.is_file() and gz_path.is_file() and file_path.read_text() == contents:
+        return False
+    file_path.write_text(contents)
+    # Without a timestamp the compressed file only changes with the page
+    gz_path.write_bytes(gzip.compress(contents.encode(), compresslevel=9, mtime=0))
+    return True
+
+
+def gen_repo_html(
+    packages: Dict[str, Dict[str, List[WheelData]]], output: Path
+) -> List[Path]:
+    """
+    Generate HTML files for the simple repository, only writing the pages
+    that are new or have changed.
+
+    :return: Paths of the pages written.
+    """
+    output.mkdir(parents=True, exist_ok=True)
+    written_pages = []
 
     # Generate root index.html with links to each package
     package_links = []
@@ -158,7 +360,7 @@ def gen_repo_html(packages: Dict[str, Dict[str, List[WheelData]]], output: Path)
         package_name = normalise_project_name(package)
         href = f"{package_name}/"
         package_links.append(f'<a href="{href}">{package_name}</a>')
-    with open(output / "index.html", "w") as f:
+    with io.StringIO() as f:
         f.write("<!DOCTYPE html>\n<html>\n")
         f.write("<head>\n")
         f.write('\t<meta name="pypi:repository-version" content="1.0">\n')
@@ -170,6 +372,8 @@ def gen_repo_html(packages: Dict[str, Dict[str, List[WheelData]]], output: Path)
         f.write("the arm-none-eabi-gcc toolchain into a Python package.</p>\n\t")
         f.write("\n\t".join(package_links))
         f.write("\n</body>\n</html>\n")
+        if write_if_changed(output / "index.html", f.getvalue()):
+            written_pages.append(output / "index.html")
 
     # Generate file pages
     for package in packages:
@@ -186,7 +390,7 @@ def gen_repo_html(packages: Dict[str, Dict[str, List[WheelData]]], output: Path)
                 )
         package_path = output / f"{package_name}"
         package_path.mkdir(parents=False, exist_ok=True)
-        with open(package_path / "index.html", "w") as f:
+        with io.StringIO() as f:
             title = f"Links for {package_name}"
             f.write(f"<!DOCTYPE html>\n<html>\n")
             f.write("<head>\n")
@@ -197,12 +401,158 @@ def gen_repo_html(packages: Dict[str, Dict[str, List[WheelData]]], output: Path)
             f.write(f"<h1>{title}</h1>\n\t")
             f.write("<br />\n\t".join(version_links))
             f.write("\n</body>\n</html>\n")
+            if write_if_changed(package_path / "index.html", f.getvalue()):
+                written_pages.append(package_path / "index.html")
+    return written_pages
+
+
+def gen_repo_json(
+    packages: Dict[str, Dict[str, List[WheelData]]], output: Path
+) -> List[Path]:
+    """
+    Generate the PEP 691 JSON files for the simple repository, next to the
+    HTML files (index.json), only writing the pages that are new or have
+    changed.
+
+    :return: Paths of the pages written.
+    """
+    output.mkdir(parents=True, exist_ok=True)
+    written_pages = []
+    meta = {"api-version": PEP691_API_VERSION}
+
+    root_index = {
+        "meta": meta,
+        "projects": [{"name": package} for package in packages],
+    }
+    if write_if_changed(output / "index.json", _dump_json(root_index)):
+        written_pages.append(output / "index.json")
+
+    for package in packages:
+        package_name = normalise_project_name(package)
+        files = []
+        for version, wheels in packages[package].items():
+            for wheel in wheels:
+                metadata_hashes = (
+                    {"sha256": wheel.metadata_sha256}
+                    if wheel.metadata_sha256
+                    else False
+                )
+                files.append(
+                    {
+                        "filename": wheel.name,
+                        "url": wheel.url,
+                        "hashes": {"sha256": wheel.sha256},
+                        "requires-python": html.unescape(wheel.python_requires),
+                        "core-metadata": metadata_hashes,
+                        "dist-info-metadata": metadata_hashes,
+                    }
+                )
+        project_page = {"meta": meta, "name": package_name, "files": files}
+        package_path = output / f"{package_name}"
+        package_path.mkdir(parents=False, exist_ok=True)
+        if write_if_changed(package_path / "index.json", _dump_json(project_page)):
+            written_pages.append(package_path / "index.json")
+    return written_pages
+
 
+def _dump_json(data: dict) -> str:
+    # Compact, as the files are only read by the package installers
+    return json.dumps(data, separators=(",", ":")) + "\n"
 
-def generate_simple_repository(repo: str, output: Path) -> None:
+
+def generate_simple_repository(
+    repo: str,
+    output: Path,
+    api_url: str = GH_API_URL,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    cache_dir: Optional[Path] = None,
+    hash_cache_dir: Optional[Path] = DEFAULT_CACHE_DIR,
+    dist_paths: Optional[List[Path]] = None,
+) -> None:
+    """
+    Generate the simple repository from the wheels in a GitHub repo Releases.
+
+    :param repo: GitHub repository name.
+    :param output: Path to the output folder, updated in place.
+    :param api_url: Base URL of the GitHub API.
+    :param concurrency: Maximum number of concurrent HTTP requests.
+    :param cache_dir: Path to the release cache, or None to crawl all the
+        releases.
+    :param hash_cache_dir: Path to the hash cache, or None to disable it.
+    :param dist_paths: Folders with local copies of the wheels, to hash them
+        if they don't have a SHA-256 file in the Release.
+    """
+    cache = load_release_cache(repo, cache_dir) if cache_dir else None
     print(f"Getting wheel URLs from GH Releases in: {repo}")
-    releases_wheels = get_gh_releases_wheel_urls(repo)
+    releases_wheels = get_gh_releases_wheel_urls(
+        repo,
+        api_url=api_url,
+        concurrency=concurrency,
+        cache=cache,
+        hash_cache_dir=hash_cache_dir,
+        dist_paths=dist_paths,
+    )
+    if cache_dir and cache is not None:
+        save_release_cache(repo, cache, cache_dir)
+    print("\tDone.\n")
+    write_repository_pages(releases_wheels, output)
+
+
+def generate_simple_repository_from_dir(
+    from_dir: Path,
+    base_url: str,
+    output: Path,
+    jobs: Optional[int] = None,
+    write_sha256_files: bool = False,
+) -> None:
+    """
+    Generate the simple repository from the wheels in a local folder, for
+    wheels served from a static file server instead of GitHub Releases.
+
+    :param from_dir: Folder with the wheels, .metadata and .sha256 files.
+    :param base_url: URL the files in the folder are served from.
+    :param output: Path to the output folder, updated in place.
+    :param jobs: Number of files to hash in parallel, defaults to the CPUs.
+    :param write_sha256_files: Create the missing SHA-256 files in the folder.
+    """
+    print(f"Getting wheels from: {from_dir}")
+    wheels = get_local_wheels(from_dir, base_url, jobs, write_sha256_files)
     print("\tDone.\n")
-    print(f"Generating HTML file in: {output}")
-    gen_repo_html({PROJECT_NAME: releases_wheels}, output)
+    write_repository_pages(wheels, output)
+
+
+def group_by_project(
+    wheels: Dict[str, List[WheelData]]
+) -> Dict[str, Dict[str, List[WheelData]]]:
+    """
+    Group the wheels by their distribution name, as the wheels of the
+    extraction profiles are separate projects, e.g.
+    "arm-none-eabi-gcc-toolchain-cortex-m4f".
+
+    :param wheels: Dictionary of release or version to its wheels.
+    :return: Dictionary of project name to its releases and wheels, always
+        including this project.
+    """
+    packages = {PROJECT_NAME: {}}  # type: Dict[str, Dict[str, List[WheelData]]]
+    for version, version_wheels in wheels.items():
+        for wheel in version_wheels:
+            # Wheel file names are "{name}-{version}-{tags}.whl"
+            project = normalise_project_name(wheel.name.split("-")[0])
+            packages.setdefault(project, {}).setdefault(version, []).append(wheel)
+    return packages
+
+
+def write_repository_pages(wheels: Dict[str, List[WheelData]], output: Path) -> None:
+    """
+    Write the HTML and JSON pages of the simple repository.
+
+    :param wheels: Dictionary of release or version to its wheels.
+    :param output: Path to the output folder, updated in place.
+    """
+    print(f"Generating HTML and JSON files in: {output}")
+    packages = group_by_project(wheels)
+    written_pages = gen_repo_html(packages, output)
+    written_pages += gen_repo_json(packages, output)
+    for page in written_pages:
+        print(f"\tUpdated: {page.relative_to(output).as_posix()}")
     print("\tDone.")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+import os
+import shutil
+import subprocess
+from pathlib import Path
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+ELF_MAGIC = b"\x7fELF"
+# The toolchain target libraries and objects are ELF files for Arm (EM_ARM)
+ELF_MACHINE_ARM = 40
+# Environment variable to use a different strip, e.g. for a cross host
+STRIP_ENV_VAR = "STRIP"
+
+# NamedTuple with the result of stripping the host binaries of a toolchain
+StripResult = namedtuple(
+    "StripResult", ["files", "size_before", "size_after", "failed"]
+)
+
+
+def get_elf_machine(file_path: Path) -> Optional[int]:
+    """
+    :param file_path: Path to the file to check.
+    :return: The ELF header e_machine value, or None if it's not an ELF file.
+    """
+    with open(file_path, "rb") as f:
+        header = f.read(20)
+    if len(header) < 20 or not header.startswith(ELF_MAGIC):
+        return None
+    if header[5] == 1:
+        return int.from_bytes(header[18:20], "little")
+    return int.from_bytes(header[18:20], "big")
+
+
+def find_host_binaries(folder: Path) -> List[List[Path]]:
+    """
+    Find the ELF executables and libraries for the host in a toolchain folder,
+    skipping the ELF files for the Arm target.
+
+    :param folder: Path to the extracted toolchain folder.
+    :return: List of host binaries, each one as a list of its paths, as
+        several paths can be hard links to the same file.
+    """
+    binaries = {}  # type: Dict[Tuple[int, int], List[Path]]
+    for root, _, files in os.walk(folder):
+        for file_name in files:
+            file_path = Path(root) / file_name
+            if file_path.is_symlink():
+                continue
+            machine = get_elf_machine(file_path)
+            if machine is None or machine == ELF_MACHINE_ARM:
+                continue
+            file_stat = file_path.stat()
+            binaries.setdefault((file_stat.st_dev, file_stat.st_ino), []).append(
+                file_path
+            )
+    return sorted(binaries.values())
+
+
+def get_strip_command() -> List[str]:
+    strip = os.environ.get(STRIP_ENV_VAR) or shutil.which("strip")
+    if not strip:
+        raise FileNotFoundError(
+            f"The 'strip' executable is needed, or set the {STRIP_ENV_VAR} env var"
+        )
+    # Only removes what's not needed to run or link against the file, so
+    # it's valid for executables and shared libraries
+    return [strip, "--strip-unneeded"]
+
+
+def _strip_binary(strip_command: List[str], file_paths: List[Path]) -> bool:
+    """Strip a binary, and link its other paths to the stripped file again."""
+    file_path = file_paths[0]
+    mode = file_path.stat().st_mode
+    process = subprocess.run(
+        strip_command + [str(file_path)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    if process.returncode != 0:
+        print(f"\tCould not strip {file_path.name}: {process.stdout.strip()}")
+        return False
+    os.chmod(file_path, mode)
+    # strip replaces the file, so any hard links still point to the original
+    for link_path in file_paths[1:]:
+        link_path.unlink()
+        os.link(file_path, link_path)
+    return True
+
+
+def strip_host_binaries(folder: Path, jobs: Optional[int] = None) -> StripResult:
+    """
+    Strip the host executables and libraries in a toolchain folder in parallel,
+    leaving the Arm target libraries and objects untouched.
+
+    Files for a different host than the strip executable supports (e.g. when
+    building a wheel for a different architecture) are skipped.
+
+    :param folder: Path to the extracted toolchain folder.
+    :param jobs: Number of files stripped at the same time, defaults to CPUs.
+    :return: Number of binaries stripped, their total size before and after,
+        and the number of binaries that couldn't be stripped.
+    """
+    strip_command = get_strip_command()
+    binaries = find_host_binaries(folder)
+    size_before = sum(paths[0].stat().st_size for paths in binaries)
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+        results = list(
+            executor.map(lambda paths: _strip_binary(strip_command, paths), binaries)
+        )
+    size_after = sum(paths[0].stat().st_size for paths in binaries)
+    return StripResult(
+        results.count(True), size_before, size_after, results.count(False)
+    )
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+import csv
+import io
+import stat
+import time
+import base64
+import hashlib
+import zipfile
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+from tools_src.hashing import HashingFile
+from tools_src.compression_policies import DEFAULT_POLICY, get_compression, get_policy
+
+WHEEL_GENERATOR = "arm-none-eabi-gcc-py-package"
+COPY_CHUNK_SIZE = 1024 * 1024
+# Zip files can't store timestamps before 1980
+ZIP_EPOCH = 315532800
+
+
+def record_hash(digest: bytes) -> str:
+    """Format a SHA-256 digest as a wheel RECORD hash entry."""
+    return "sha256=" + base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def generate_core_metadata(pyproject: dict, readme: str) -> str:
+    """
+    Generate the Core Metadata (METADATA/PKG-INFO) file contents from a
+    pyproject.toml [project] table, with the same fields setuptools uses.
+
+    :param pyproject: The parsed pyproject.toml contents.
+    :param readme: The README contents to use as the long description.
+    :return: The metadata file contents.
+    """
+    project = pyproject["project"]
+    lines = [
+        "Metadata-Version: 2.1",
+        f"Name: {project['name']}",
+        f"Version: {project['version']}",
+    ]
+    if "description" in project:
+        lines.append(f"Summary: {project['description']}")
+    authors = project.get("authors", [])
+    author_names = [author["name"] for author in authors if "email" not in author]
+    author_emails = [
+        f"{author['name']} <{author['email']}>"
+        for author in authors
+        if "email" in author
+    ]
+    if author_names:
+        lines.append(f"Author: {', '.join(author_names)}")
+    if author_emails:
+        lines.append(f"Author-email: {', '.join(author_emails)}")
+    if "text" in project.get("license", {}):
+        lines.append(f"License: {project['license']['text']}")
+    for label, url in project.get("urls", {}).items():
+        lines.append(f"Project-URL: {label}, {url}")
+    if project.get("keywords"):
+        lines.append(f"Keywords: {','.join(project['keywords'])}")
+    for classifier in project.get("classifiers", []):
+        lines.append(f"Classifier: {classifier}")
+    if "requires-python" in project:
+        lines.append(f"Requires-Python: {project['requires-python']}")
+    lines.append("Description-Content-Type: text/markdown")
+    return "\n".join(lines) + "\n\n" + readme
+
+
+def generate_entry_points(scripts: Dict[str, str]) -> str:
+    """
+    Generate the entry_points.txt file contents for console scripts.
+
+    :param scripts: Dictionary of script name to "module:function".
+    :return: The entry points file contents.
+    """
+    lines = ["[console_scripts]"]
+    lines += [f"{name} = {target}" for name, target in sorted(scripts.items())]
+    return "\n".join(lines) + "\n"
+
+
+class WheelWriter:
+    """
+    Writes a wheel file entry by entry, tracking the hash and size of each
+    file for the RECORD, which is written with the dist-info on close().
+    The SHA-256 of the wheel file itself is calculated while it's written.
+    """
+
+    def __init__(
+        self,
+        wheel_path: Path,
+        name: str,
+        version: str,
+        tag: str,
+        compression: str = DEFAULT_POLICY,
+    ) -> None:
+        """
+        :param wheel_path: Path to the wheel file to create.
+        :param name: Normalised distribution name (with underscores).
+        :param version: Distribution version.
+        :param tag: Wheel tag, e.g. "py3-none-manylinux_2_28_x86_64".
+        :param compression: Compression policy name, with the compression level
+            for each type of file.
+        """
+        self.policy = get_policy(compression)
+        if wheel_path.exists():
+            raise FileExistsError(f"Wheel file already exists: {wheel_path}")
+        self.wheel_path = wheel_path
+        self.tag = tag
+        self.dist_info = f"{name}-{version}.dist-info"
+        self._file = HashingFile(wheel_path)
+        self._zip = zipfile.ZipFile(self._file, "w", compression=zipfile.ZIP_DEFLATED)
+        self._records: Dict[str, Tuple[str, int]] = {}
+        self._closed = False
+        self.sha256: Optional[str] = None
+
+    def __enter__(self) -> "WheelWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            if not self._closed:
+                self.close()
+        else:
+            # Don't leave a broken wheel behind
+            self._zip.close()
+            self._file.close()
+            self.wheel_path.unlink()
+
+    def _zip_info(
+        self, arcname: str, mode: int, mtime: Optional[float]
+    ) -> zipfile.ZipInfo:
+        mtime = time.time() if mtime is None else max(mtime, ZIP_EPOCH)
+        zinfo = zipfile.ZipInfo(arcname, date_time=time.localtime(mtime)[:6])
+        zinfo.external_attr = (stat.S_IFREG | (mode & 0o777)) << 16
+        zinfo.compress_type, compress_level = get_compression(
+            self.policy, arcname, mode
+        )
+        # ZipFile.open() only takes the level from the ZipInfo, and the public
+        # compress_level attribute is Python 3.13+, where this is an alias
+        zinfo._compresslevel = compress_level  # type: ignore[attr-defined]
+        return zinfo
+
+    def __contains__(self, arcname: str) -> bool:
+        return arcname in self._records
+
+    @property
+    def names(self) -> List[str]:
+        """The archive names of all the files written so far."""
+        return list(self._records)
+
+    def add_stream(
+        self,
+        arcname: str,
+        fileobj: BinaryIO,
+        mode: int = 0o644,
+        mtime: Optional[float] = None,
+    ) -> None:
+        """
+        Add a file to the wheel, copying it from a readable file object.
+
+        :param arcname: Path of the file inside the wheel.
+        :param fileobj: Readable binary file object with the contents.
+        :param mode: File permission bits, to preserve executables.
+        :param mtime: File modification time, defaults to now.
+        """
+        if arcname in self._records:
+            raise FileExistsError(f"File already in the wheel: {arcname}")
+        sha256_hash = hashlib.sha256()
+        size = 0
+        with self._zip.open(self._zip_info(arcname, mode, mtime), "w") as entry:
+            for chunk in iter(lambda: fileobj.read(COPY_CHUNK_SIZE), b""):
+                sha256_hash.update(chunk)
+                entry.write(chunk)
+                size += len(chunk)
+        # The zip entry header is final once the entry is closed
+        self._file.commit()
+        self._records[arcname] = (record_hash(sha256_hash.digest()), size)
+
+    def add_bytes(
+        self,
+        arcname: str,
+        data: bytes,
+        mode: int = 0o644,
+        mtime: Optional[float] = None,
+    ) -> None:
+        """
+        Add a file to the wheel from its contents in memory.
+
+        :param arcname: Path of the file inside the wheel.
+        :param data: The file contents.
+        :param mode: File permission bits, to preserve executables.
+        :param mtime: File modification time, defaults to now.
+        """
+        self.add_stream(arcname, io.BytesIO(data), mode, mtime)
+
+    def add_file(self, arcname: str, file_path: Path) -> None:
+        """
+        Add a file from disk to the wheel, keeping its permissions and mtime.
+
+        :param arcname: Path of the file inside the wheel.
+        :param file_path: Path to the file to add.
+        """
+        file_stat = file_path.stat()
+        with open(file_path, "rb") as file:
+            self.add_stream(arcname, file, file_stat.st_mode, file_stat.st_mtime)
+
+    def copy_entry(self, src_arcname: str, dst_arcname: str) -> None:
+        """
+        Add a copy of a file already written in the wheel, used for archive
+        links, as wheels can't contain symlinks or hardlinks.
+
+        :param src_arcname: Path of the existing file inside the wheel.
+        :param dst_arcname: Path of the new file inside the wheel.
+        """
+        src_info = self._zip.getinfo(src_arcname)
+        mode = src_info.external_attr >> 16
+        mtime = time.mktime(src_info.date_time + (0, 0, -1))
+        with self._zip.open(src_arcname) as src_file:
+            # Reading the zip while writing needs the data in memory first
+            data = src_file.read()
+        self.add_bytes(dst_arcname, data, mode, mtime)
+
+    def close(
+        self,
+        metadata: Optional[str] = None,
+        entry_points: Optional[str] = None,
+        top_level: Optional[str] = None,
+    ) -> str:
+        """
+        Write the dist-info files and the RECORD and close the wheel.
+
+        :param metadata: Contents of the METADATA file.
+        :param entry_points: Contents of the entry_points.txt file.
+        :param top_level: Contents of the top_level.txt file.
+        :return: SHA-256 hex digest of the wheel file.
+        """
+        dist_info_files = [
+            ("METADATA", metadata),
+            ("WHEEL", self._wheel_file()),
+            ("entry_points.txt", entry_points),
+            ("top_level.txt", top_level),
+        ]
+        for file_name, contents in dist_info_files:
+            if contents is not None:
+                self.add_bytes(f"{self.dist_info}/{file_name}", contents.encode())
+
+        record_name = f"{self.dist_info}/RECORD"
+        record = io.StringIO()
+        writer = csv.writer(record, delimiter=",", quotechar='"', lineterminator="\n")
+        for arcname, (file_hash, size) in self._records.items():
+            writer.writerow((arcname, file_hash, size))
+        writer.writerow((record_name, "", ""))
+        self._zip.writestr(self._zip_info(record_name, 0o644, None), record.getvalue())
+        self._zip.close()
+        self.sha256 = self._file.hexdigest()
+        self._file.close()
+        self._closed = True
+        return self.sha256
+
+    def _wheel_file(self) -> str:
+        return (
+            "Wheel-Version: 1.0\n"
+            f"Generator: {WHEEL_GENERATOR}\n"
+            "Root-Is-Purelib: true\n"
+            f"Tag: {self.tag}\n"
+        )